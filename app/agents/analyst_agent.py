@@ -3,8 +3,9 @@ from dataclasses import dataclass
 from langchain.chat_models import init_chat_model
 from app.utils.model_utils import create_chat_model
 from langchain.agents import create_agent
+from app.agents.registry import lazy_executor_getattr
 from app.tools import execute_python_code
-from langgraph.checkpoint.memory import InMemorySaver
+from app.utils.checkpointer import create_checkpointer
 
 # system prompt tailored for data analysis
 system_prompt = f"""
@@ -28,7 +29,7 @@ system_prompt = f"""
 4. 파일 저장 (매우 중요):
    - **반드시** `plt.savefig()`를 사용하여 파일로 저장합니다.
    - `plt.show()`는 **절대 금지**입니다.
-   - 저장 경로: `/workspaces/AAWS_project/code_artifacts/chart.png`
+   - 저장 경로: 요청에 지정된 경로가 있으면 그 경로를 그대로 사용하고, 없으면 `/workspaces/AAWS_project/code_artifacts/chart.png`
 
 5. 결과 보고:
    - 생성된 차트 파일의 경로
@@ -52,7 +53,7 @@ def get_agent_executor():
         pass
 
     analyst_model = create_chat_model(temperature=0.2)
-    checkpointer = InMemorySaver()
+    checkpointer = create_checkpointer("analyst")
 
     analyst_agent = create_agent(
         model=analyst_model,
@@ -65,4 +66,5 @@ def get_agent_executor():
     return analyst_agent
 
 
-agent_executor = get_agent_executor()
+# 실행기는 처음 접근할 때 생성합니다. (import 만으로는 LLM/체크포인터를 만들지 않음)
+__getattr__ = lazy_executor_getattr(__name__, get_agent_executor)
@@ -1,7 +1,10 @@
 from datetime import date
-from langgraph.checkpoint.memory import MemorySaver
+from app.utils.checkpointer import create_checkpointer
 from langchain.chat_models import init_chat_model
+from app.utils.model_utils import get_model
+from app.utils.offline import offline_model
 from langchain.agents import create_agent
+from app.agents.registry import lazy_executor_getattr
 from app.tools import tools_basic
 
 # 오늘 날짜
@@ -17,10 +20,11 @@ system_prompt = f"""
 
 def get_agent_executor():
     # LLM (No tools)
-    llm = init_chat_model(model="gpt-4o", model_provider="openai")
+    # LLM_MODEL이 fake: 모델이면 오프라인 Fake 모델을 사용합니다. (부하 테스트용)
+    llm = get_model(offline_model() or "gpt-4o")
     
     # Memory
-    memory = MemorySaver()
+    memory = create_checkpointer("basic")
     
     # Create Basic Agent (도구가 없는 순수 LLM 챗봇)
     basic_agent = create_agent(
@@ -32,4 +36,5 @@ def get_agent_executor():
     
     return basic_agent
 
-agent_executor = get_agent_executor()
+# 실행기는 처음 접근할 때 생성합니다. (import 만으로는 LLM/체크포인터를 만들지 않음)
+__getattr__ = lazy_executor_getattr(__name__, get_agent_executor)
@@ -3,7 +3,8 @@ from dataclasses import dataclass
 from langchain.chat_models import init_chat_model
 from app.utils.model_utils import create_chat_model
 from langchain.agents import create_agent
-from langgraph.checkpoint.memory import InMemorySaver
+from app.agents.registry import lazy_executor_getattr
+from app.utils.checkpointer import create_checkpointer
 from langchain.agents.middleware import FilesystemFileSearchMiddleware
 
 from app.tools import tools_coder
@@ -37,7 +38,7 @@ def get_agent_executor():
         pass
 
     coder_model = create_chat_model(temperature=0.2)
-    checkpointer = InMemorySaver()
+    checkpointer = create_checkpointer("coder")
 
     coder_agent = create_agent(
         model=coder_model,
@@ -56,4 +57,5 @@ def get_agent_executor():
 
     return coder_agent
 
-agent_executor = get_agent_executor()
\ No newline at end of file
+# 실행기는 처음 접근할 때 생성합니다. (import 만으로는 LLM/체크포인터를 만들지 않음)
+__getattr__ = lazy_executor_getattr(__name__, get_agent_executor)
\ No newline at end of file
@@ -1,8 +1,9 @@
 from datetime import date
-from langgraph.checkpoint.memory import MemorySaver
+from app.utils.checkpointer import create_checkpointer
 from langchain.chat_models import init_chat_model
 from app.utils.model_utils import create_chat_model
 from langchain.agents import create_agent
+from app.agents.registry import lazy_executor_getattr
 
 from app.tools import tools_navigator
 
@@ -26,8 +27,8 @@ system_prompt = f"""
   "page_handling": "단일 페이지 또는 다중 페이지 / 페이지네이션 방식",
   "element_selectors": 
   {{
-    "필드1": "CSS 또는 XPath 선택자",
-    "필드2": "CSS 또는 XPath 선택자"
+    "필드1": "CSS 선택자 (XPath 불가, 속성은 ::attr(이름))",
+    "필드2": "CSS 선택자 (XPath 불가, 속성은 ::attr(이름))"
   }},
   "special_handling": "JavaScript 렌더링 필요 여부, 로그인 필요 여부 등"
 }}
@@ -45,7 +46,7 @@ def get_agent_executor():
     llm = create_chat_model()
     
     # Memory
-    memory = MemorySaver()
+    memory = create_checkpointer("navigator")
     
     # Create Basic Agent (도구가 없는 순수 LLM 챗봇)
     basic_agent = create_agent(
@@ -57,4 +58,5 @@ def get_agent_executor():
     
     return basic_agent
 
-agent_executor = get_agent_executor()
\ No newline at end of file
+# 실행기는 처음 접근할 때 생성합니다. (import 만으로는 LLM/체크포인터를 만들지 않음)
+__getattr__ = lazy_executor_getattr(__name__, get_agent_executor)
\ No newline at end of file
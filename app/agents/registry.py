@@ -0,0 +1,161 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("LLMOps_Server")
+
+# ==========================================
+# 1. 에이전트 이름 → 모듈 경로 매핑
+# ==========================================
+# 서버가 노출하는 에이전트 이름과, get_agent_executor()를 가진 모듈의 경로입니다.
+# 모듈은 실제로 요청이 들어오거나 warmup이 호출될 때 처음 임포트됩니다.
+AGENT_MODULES: Dict[str, str] = {
+    "basic": "app.agents.chatbot",
+    "multimodal": "app.agents.multimodal_agent",
+    "navigator": "app.agents.navigator_agent",
+    "coder": "app.agents.coder_agent",
+    "analyst": "app.agents.analyst_agent",
+    "supervisor": "app.agents.supervisor_agent",
+}
+
+
+# ==========================================
+# 2. 모듈 수준 Lazy agent_executor
+# ==========================================
+def lazy_executor_getattr(module_name: str, factory: Callable[[], Any]):
+    """
+    에이전트 모듈의 ``agent_executor`` 속성을 처음 접근할 때 생성하도록 하는
+    모듈 수준 ``__getattr__`` (PEP 562) 함수를 만들어 반환합니다.
+
+    ``from app.agents.chatbot import agent_executor`` 같은 기존 임포트 구문은
+    그대로 동작하지만, 모듈을 임포트하는 것만으로는 LLM/체크포인터가 만들어지지 않습니다.
+    """
+    lock = threading.Lock()
+    cache: Dict[str, Any] = {}
+
+    def __getattr__(name: str):
+        if name != "agent_executor":
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        if "agent_executor" not in cache:
+            with lock:
+                if "agent_executor" not in cache:
+                    cache["agent_executor"] = factory()
+        return cache["agent_executor"]
+
+    return __getattr__
+
+
+# ==========================================
+# 3. Lazy Agent Registry
+# ==========================================
+class LazyAgent:
+    """
+    에이전트 실행기를 처음 사용할 때(또는 warmup 시) 생성하고 캐싱하는 핸들입니다.
+    모듈 임포트 시간과 실행기 생성 시간을 분리하여 기록합니다.
+    """
+
+    def __init__(self, name: str, module_path: str):
+        self.name = name
+        self.module_path = module_path
+        self._executor = None
+        self._lock = threading.Lock()
+        self.import_seconds: Optional[float] = None
+        self.build_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._executor is not None
+
+    def get(self):
+        """실행기를 반환합니다. 아직 없으면 (스레드 안전하게) 생성합니다."""
+        if self._executor is not None:
+            return self._executor
+
+        with self._lock:
+            if self._executor is not None:
+                return self._executor
+            try:
+                start = time.perf_counter()
+                module = importlib.import_module(self.module_path)
+                imported = time.perf_counter()
+                executor = module.agent_executor
+                built = time.perf_counter()
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Agent '{self.name}' failed to load: {e}")
+                raise
+
+            self.import_seconds = imported - start
+            self.build_seconds = built - imported
+            self.loaded_at = time.time()
+            self.error = None
+            self._executor = executor
+            logger.info(
+                f"Agent '{self.name}' ready "
+                f"(import {self.import_seconds:.2f}s, build {self.build_seconds:.2f}s)"
+            )
+            return executor
+
+    async def aget(self):
+        """이벤트 루프를 막지 않도록 생성 작업은 워커 스레드에서 수행합니다."""
+        if self._executor is not None:
+            return self._executor
+        return await asyncio.to_thread(self.get)
+
+    def status(self) -> dict:
+        """에이전트별 startup 리포트 (오토스케일링 판단용)"""
+        total = None
+        if self.import_seconds is not None and self.build_seconds is not None:
+            total = round(self.import_seconds + self.build_seconds, 4)
+        return {
+            "loaded": self.loaded,
+            "module": self.module_path,
+            "import_seconds": None if self.import_seconds is None else round(self.import_seconds, 4),
+            "build_seconds": None if self.build_seconds is None else round(self.build_seconds, 4),
+            "startup_seconds": total,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+class AgentRegistry:
+    """이름으로 LazyAgent를 조회하고 warmup/리포트를 제공하는 레지스트리"""
+
+    def __init__(self, modules: Dict[str, str] = None):
+        self._agents: Dict[str, LazyAgent] = {
+            name: LazyAgent(name, path) for name, path in (modules or AGENT_MODULES).items()
+        }
+
+    def __getitem__(self, name: str) -> LazyAgent:
+        return self._agents[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._agents
+
+    def names(self) -> list:
+        return list(self._agents.keys())
+
+    async def warmup(self, names: list = None) -> dict:
+        """
+        지정한(또는 전체) 에이전트를 순차적으로 미리 생성합니다.
+        실패한 에이전트가 있어도 나머지는 계속 진행하며, 결과 리포트를 반환합니다.
+        """
+        for name in names or self.names():
+            if name not in self._agents:
+                continue
+            try:
+                await self._agents[name].aget()
+            except Exception:
+                pass
+        return self.report()
+
+    def report(self) -> dict:
+        return {name: agent.status() for name, agent in self._agents.items()}
+
+
+registry = AgentRegistry()
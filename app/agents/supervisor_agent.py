@@ -2,30 +2,110 @@ from langchain.tools import tool, ToolRuntime
 from langchain.chat_models import init_chat_model
 from app.utils.model_utils import create_chat_model
 from langchain.agents import create_agent
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+import os
+import re
 import json
+import uuid
+import time
+import asyncio
+from typing import Annotated, List, Optional, Tuple, TypedDict
 
-# 기존 워커 에이전트 가져오기
-from app.agents.navigator_agent import agent_executor as navigator_agent
-from app.agents.coder_agent import agent_executor as coder_agent
-from app.agents.analyst_agent import agent_executor as analyst_agent
+# 기존 워커 에이전트는 레지스트리를 통해 처음 위임할 때 생성합니다.
+from app.agents.registry import lazy_executor_getattr, registry
+from app.utils.concurrency import parse_agent_limits
+from app.utils.metrics import TOOL_CANCELLATIONS, metrics
+from app.utils.artifacts import CHART_EXTENSIONS, DATA_EXTENSIONS, describe, get_artifact_store
+from app.utils.blueprint_cache import get_blueprint_cache
 
 
 # ==========================================
-# 1. Worker-as-Tool 도구 정의
+# 0. 위임 공통 실행기 (비동기 + 취소/데드라인)
 # ==========================================
-@tool("delegate_navigator", description="대상 웹사이트를 분석하고 데이터 수집 strategy를 담은 JSON Blueprint를 생성합니다.")
-def delegate_navigator(user_request: str) -> str:
+# 워커별 최대 실행 시간(초). 예: SUPERVISOR_DELEGATE_TIMEOUTS="navigator=300,*=600"
+DEFAULT_DELEGATE_TIMEOUTS = {"navigator": 600, "coder": 900, "analyst": 600}
+DELEGATE_TIMEOUTS = parse_agent_limits(os.getenv("SUPERVISOR_DELEGATE_TIMEOUTS"), DEFAULT_DELEGATE_TIMEOUTS)
+
+WORKER_LABELS = {"navigator": "Navigator", "coder": "Coder", "analyst": "Analyst"}
+
+STAGE_DURATION = metrics.histogram(
+    "supervisor_stage_duration_seconds",
+    "Delegated worker run time by stage and outcome (ok, error, timeout).",
+    ("stage", "status"),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 900),
+)
+
+
+async def _emit_stage(config: RunnableConfig, **data):
+    """단계 진행 상황을 custom event("stage_progress")로 상위 스트림에 보냅니다. (/stream의 stage 프레임)"""
+    if not (config or {}).get("callbacks"):
+        return
+    try:
+        await adispatch_custom_event("stage_progress", data, config=config)
+    except RuntimeError:
+        # 상위 실행(run) 없이 직접 호출된 경우에는 보낼 곳이 없습니다.
+        pass
+
+
+async def _delegate(worker: str, prompt: str, config: RunnableConfig) -> str:
     """
-    Navigator 에이전트에게 웹사이트 분석과 Blueprint 생성을 위임합니다.
-    
-    Args:
-        user_request: 사용자의 원본 요청 또는 수집 목표
-    
-    Returns:
-        생성된 Blueprint (JSON 형식)
+    워커 에이전트를 ``ainvoke`` 로 실행하고 마지막 메시지 내용을 반환합니다.
+
+    - 이벤트 루프를 막지 않으므로 여러 supervisor 실행이 같은 루프를 공유할 수 있습니다.
+    - 워커는 자체 체크포인터를 가지므로 위임마다 새 thread_id(상위 thread_id 기반)를 부여합니다.
+    - DELEGATE_TIMEOUTS 초를 넘기면 워커 실행을 취소하고 에러 문자열을 반환합니다. (supervisor는 계속 진행)
+    - supervisor 실행 자체가 취소되면(클라이언트 이탈 등) 워커도 함께 취소되고 CancelledError를 그대로 전파합니다.
+    - 워커 내부 이벤트(도구 호출, 토큰)에는 metadata ``stage``/``stage_run`` 이 붙어 상위 astream_events로 전달되고,
+      시작/종료 시점에는 stage_progress 이벤트를 보냅니다. (서버가 verbosity에 따라 걸러서 SSE로 전달)
     """
-    prompt = (
+    label = WORKER_LABELS[worker]
+    timeout = DELEGATE_TIMEOUTS.get(worker)
+    parent_thread = (config or {}).get("configurable", {}).get("thread_id") or "adhoc"
+    stage_run = uuid.uuid4().hex[:8]
+    # configurable을 새로 지정하면 워커는 상위 그래프의 서브그래프가 아닌 독립 실행으로 동작합니다.
+    # callbacks는 상위 실행(tool 또는 파이프라인 노드)의 것을 넘겨 추적/스트림 이벤트가 이어지게 합니다.
+    worker_config = {
+        "callbacks": (config or {}).get("callbacks"),
+        "configurable": {"thread_id": f"{parent_thread}:{worker}:{stage_run}"},
+        "tags": [f"stage:{worker}"],
+        "metadata": {"stage": worker, "stage_run": stage_run},
+    }
+
+    started = time.perf_counter()
+    await _emit_stage(config, stage=worker, stage_run=stage_run, status="start")
+    try:
+        executor = await registry[worker].aget()
+        result = await asyncio.wait_for(
+            executor.ainvoke({"messages": [HumanMessage(content=prompt)]}, config=worker_config),
+            timeout=timeout or None,
+        )
+        text, status = result["messages"][-1].content, "ok"
+    except asyncio.TimeoutError:
+        text, status = f"[Error] {label} 실행 시간 초과 ({timeout}초)", "timeout"
+    except asyncio.CancelledError:
+        TOOL_CANCELLATIONS.inc(tool=f"delegate_{worker}")
+        raise
+    except Exception as e:
+        text, status = f"[Error] {label} 실행 실패: {str(e)}", "error"
+
+    elapsed = time.perf_counter() - started
+    STAGE_DURATION.observe(elapsed, stage=worker, status=status)
+    await _emit_stage(config, stage=worker, stage_run=stage_run, status=status, elapsed_ms=int(elapsed * 1000))
+    return text
+
+
+# ==========================================
+# 1. 워커별 위임 프롬프트
+# ==========================================
+ARTIFACT_DIR = "/workspaces/AAWS_project/code_artifacts"
+
+
+def _navigator_prompt(user_request: str) -> str:
+    return (
         "다음은 웹 데이터 수집 작업의 요청사항입니다:\n\n"
         f"{user_request}\n\n"
         "위 요청에 맞는 웹 크롤링 Blueprint를 JSON 형식으로 생성해 주세요. "
@@ -33,85 +113,288 @@ def delegate_navigator(user_request: str) -> str:
         "- target_url: 수집 대상 URL\n"
         "- description: 작업 설명\n"
         "- data_fields: 수집할 필드 목록\n"
-        "- element_selectors: CSS/XPath 선택자 매핑\n"
+        "- element_selectors: CSS 선택자 매핑 (XPath 불가, 속성은 ::attr(이름))\n"
         "- special_handling: 특수 처리 필요 사항\n\n"
         "Blueprint만 출력하고 다른 설명은 하지 마세요."
     )
-    
-    try:
-        result = navigator_agent.invoke({"messages": [HumanMessage(content=prompt)]})
-        response = result["messages"][-1].content
-        return response
-    except Exception as e:
-        return f"[Error] Navigator 실행 실패: {str(e)}"
 
 
-@tool("delegate_coder", description="생성된 Blueprint를 바탕으로 크롤링 코드를 작성하고 실행하여 데이터를 수집합니다.")
-def delegate_coder(blueprint: str, user_request: str = "") -> str:
-    """
-    Coder 에이전트에게 Blueprint 기반 데이터 수집을 위임합니다.
-    
-    Args:
-        blueprint: Navigator가 생성한 JSON Blueprint
-        user_request: 추가 맥락 (선택사항)
-    
-    Returns:
-        수집 완료 메시지 및 저장 경로
-    """
-    prompt = (
+def _coder_prompt(blueprint: str, output_dir: str) -> str:
+    return (
         "다음은 크롤링을 수행하기 위한 Blueprint입니다:\n\n"
         f"{blueprint}\n\n"
         "위 Blueprint를 기반으로:\n"
         "1. Playwright를 사용하여 파이썬 크롤러 코드를 작성하세요\n"
         "2. 코드를 실행하여 실제로 데이터를 수집하세요\n"
         "3. 수집된 데이터를 JSON 또는 CSV 파일로 저장하세요\n"
-        "4. 저장 경로는 반드시 `/workspaces/AAWS_project/code_artifacts` 폴더로 설정하세요\n\n"
-        "작업 완료 후 생성된 파일의 경로와 수집된 데이터 건수를 명시하세요."
+        f"4. 저장 경로는 반드시 `{output_dir}` 폴더로 설정하세요 (절대 경로 그대로 사용)\n"
+        "\n작업 완료 후 생성된 파일의 경로와 수집된 데이터 건수를 명시하세요."
     )
-    
-    try:
-        result = coder_agent.invoke({"messages": [HumanMessage(content=prompt)]})
-        response = result["messages"][-1].content
-        return response
-    except Exception as e:
-        return f"[Error] Coder 실행 실패: {str(e)}"
 
 
-@tool("delegate_analyst", description="수집된 데이터를 읽어 분석 및 시각화를 수행합니다.")
-def delegate_analyst(data_file_path: str) -> str:
-    """
-    Analyst 에이전트에게 데이터 분석 및 시각화를 위임합니다.
-    
-    Args:
-        data_file_path: 분석할 데이터 파일의 경로 (예: '/workspaces/AAWS_project/code_artifacts/data.json')
-    
-    Returns:
-        생성된 차트 파일의 경로 및 분석 결과
-    """
-    prompt = (
+def _analyst_prompt(data_files: str, output_dir: str, chart_name: str = "chart.png") -> str:
+    return (
         "다음 경로의 데이터 파일을 분석하고 시각화하세요:\n\n"
-        f"파일 경로: {data_file_path}\n\n"
+        f"파일 경로: {data_files}\n\n"
         "수행 단계:\n"
         "1. 파일을 읽어 데이터의 형태와 특성을 파악하세요\n"
         "2. 데이터에 적합한 차트(막대 그래프, 선 그래프, 산점도 등)를 선택하세요\n"
         "3. matplotlib/seaborn을 사용하여 차트를 생성하세요\n"
-        "4. `plt.savefig('/workspaces/AAWS_project/code_artifacts/chart.png')`로 저장하세요\n"
+        f"4. `plt.savefig('{output_dir}/{chart_name}')`로 저장하세요\n"
         "5. 생성된 차트의 경로와 간단한 분석 요약을 제공하세요\n\n"
         "주의: plt.show()는 사용하지 마세요. 반드시 파일로 저장하세요."
     )
+
+
+# ==========================================
+# 2. 단계 실행 + 아티팩트 등록
+# ==========================================
+# 단계 산출물(Blueprint, 데이터 파일, 차트)은 artifact 저장소에 넣고 supervisor에게는 짧은 handle만 돌려줍니다.
+# supervisor LLM이 Blueprint JSON 전체를 다음 도구 인자로 다시 생성하지 않아도 되므로
+# 출력 토큰/지연이 줄고 JSON이 손상될 위험도 없습니다. handle은 각 도구가 로컬에서 내용/경로로 바꿉니다.
+URL_RE = re.compile(r"https?://[^\s<>\"'()\[\]]+")
+
+
+def _is_error(text: str) -> bool:
+    return not text or text.startswith("[Error]")
+
+
+def _parse_blueprint(text: str) -> Optional[dict]:
+    body = text.strip()
+    if "```" in body:
+        body = body.split("```")[1]
+        body = body[4:] if body.startswith("json") else body
+    start, end = body.find("{"), body.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(body[start:end + 1])
+    except ValueError:
+        return None
+
+
+def _blueprint_artifact(blueprint: dict) -> dict:
+    artifact = get_artifact_store().put_text(json.dumps(blueprint, ensure_ascii=False, indent=2), "blueprint", ".json")
+    artifact["summary"] = {k: blueprint.get(k) for k in ("target_url", "data_fields") if k in blueprint}
+    return artifact
+
+
+async def _run_navigator(user_request: str, config: RunnableConfig) -> Tuple[str, Optional[dict]]:
+    # 대상 URL이 하나인 요청은 이전에 만든 Blueprint를 재사용합니다. (선택자가 샘플 페이지에서 여전히 매칭될 때만)
+    urls = URL_RE.findall(user_request)
+    cache = get_blueprint_cache() if len(urls) == 1 else None
+    if cache is not None:
+        cached = await cache.lookup(urls[0], user_request)
+        if cached is not None:
+            # 같은 URL 패턴의 다른 페이지일 수 있으므로 수집 대상은 이번 요청의 URL로 바꿉니다.
+            if "target_url" in cached:
+                cached["target_url"] = urls[0]
+            artifact = _blueprint_artifact(cached)
+            artifact["cached"] = True
+            await _emit_stage(config, stage="navigator", status="cached")
+            return "[Cache] 이전에 검증된 Blueprint를 재사용합니다.", artifact
+
+    text = await _delegate("navigator", _navigator_prompt(user_request), config)
+    if _is_error(text):
+        return text, None
+    blueprint = _parse_blueprint(text)
+    if blueprint is None:
+        return text, get_artifact_store().put_text(text, "blueprint", ".txt")
+    if cache is not None:
+        cache.store(urls[0], user_request, blueprint)
+    return text, _blueprint_artifact(blueprint)
+
+
+def _stage_output_dir(stage: str) -> str:
+    """단계 실행마다 전용 출력 폴더(``ARTIFACT_DIR/runs/<stage>-<id>``)를 만듭니다.
+
+    공용 폴더를 수정 시각으로 훑으면 동시에 실행 중인 다른 요청/대상의 파일까지 섞이므로,
+    산출물은 이 폴더에서만 수집합니다.
+    """
+    path = os.path.join(ARTIFACT_DIR, "runs", f"{stage}-{uuid.uuid4().hex[:12]}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+async def _run_coder(blueprint: str, config: RunnableConfig) -> Tuple[str, List[dict]]:
+    store = get_artifact_store()
+    output_dir = _stage_output_dir("coder")
+    text = await _delegate("coder", _coder_prompt(store.resolve_content(blueprint), output_dir), config)
+    if _is_error(text):
+        return text, []
+    return text, store.collect(output_dir, "data", DATA_EXTENSIONS)
+
+
+async def _run_analyst(data_files: str, config: RunnableConfig, chart_name: str = "chart.png") -> Tuple[str, List[dict]]:
+    store = get_artifact_store()
+    output_dir = _stage_output_dir("analyst")
+    text = await _delegate("analyst", _analyst_prompt(store.resolve_paths(data_files), output_dir, chart_name), config)
+    if _is_error(text):
+        return text, []
+    return text, store.collect(output_dir, "chart", CHART_EXTENSIONS)
+
+
+def _with_artifacts(text: str, title: str, artifacts: List[dict]) -> str:
+    if not artifacts:
+        return text
+    return f"{text}\n\n[{title}]\n{describe(artifacts)}"
+
+
+# ==========================================
+# 3. Worker-as-Tool 도구 정의
+# ==========================================
+# 세 도구는 (LLM에게 보일 내용, artifact 메타데이터) 를 반환합니다. (response_format="content_and_artifact")
+# supervisor LLM은 내용만 보고, 결정적 파이프라인(6절)은 ToolMessage.artifact로 handle을 바로 받습니다.
+@tool(
+    "delegate_navigator",
+    description="대상 웹사이트를 분석하고 데이터 수집 strategy를 담은 JSON Blueprint를 생성합니다.",
+    response_format="content_and_artifact",
+)
+async def delegate_navigator(user_request: str, config: RunnableConfig) -> Tuple[str, dict]:
+    """
+    Navigator 에이전트에게 웹사이트 분석과 Blueprint 생성을 위임합니다.
     
+    Args:
+        user_request: 사용자의 원본 요청 또는 수집 목표
+    
+    Returns:
+        저장된 Blueprint의 artifact handle과 요약 (target_url, data_fields)
+    """
+    text, artifact = await _run_navigator(user_request, config)
+    if artifact is None:
+        return text, {"blueprint": None}
+    summary = json.dumps(artifact.get("summary", {}), ensure_ascii=False)
+    source = " (캐시된 Blueprint 재사용)" if artifact.get("cached") else ""
+    return (
+        f"Blueprint 저장 완료{source}: {artifact['handle']}\n"
+        f"요약: {summary}\n"
+        "delegate_coder의 blueprint 인자에는 Blueprint 내용 대신 이 handle을 그대로 전달하세요."
+    ), {"blueprint": artifact}
+
+
+@tool(
+    "delegate_coder",
+    description="생성된 Blueprint를 바탕으로 크롤링 코드를 작성하고 실행하여 데이터를 수집합니다.",
+    response_format="content_and_artifact",
+)
+async def delegate_coder(blueprint: str, config: RunnableConfig, user_request: str = "") -> Tuple[str, dict]:
+    """
+    Coder 에이전트에게 Blueprint 기반 데이터 수집을 위임합니다.
+    
+    Args:
+        blueprint: Navigator 단계가 돌려준 Blueprint artifact handle (예: 'artifact:3f9a0c1d2b4e5f60') 또는 JSON Blueprint
+        user_request: 추가 맥락 (선택사항)
+    
+    Returns:
+        수집 완료 메시지와 수집된 데이터 파일의 artifact handle 목록
+    """
+    text, data = await _run_coder(blueprint, config)
+    content = _with_artifacts(text, "수집 데이터 artifact (delegate_analyst에 handle 전달)", data)
+    return content, {"data": data, "error": _is_error(text)}
+
+
+@tool(
+    "delegate_analyst",
+    description="수집된 데이터를 읽어 분석 및 시각화를 수행합니다.",
+    response_format="content_and_artifact",
+)
+async def delegate_analyst(data_file_path: str, config: RunnableConfig) -> Tuple[str, dict]:
+    """
+    Analyst 에이전트에게 데이터 분석 및 시각화를 위임합니다.
+    
+    Args:
+        data_file_path: 분석할 데이터의 artifact handle 또는 파일 경로 (예: 'artifact:3f9a0c1d2b4e5f60', '/workspaces/AAWS_project/code_artifacts/data.json')
+    
+    Returns:
+        생성된 차트의 artifact handle 및 분석 결과
+    """
+    text, charts = await _run_analyst(data_file_path, config)
+    return _with_artifacts(text, "차트 artifact", charts), {"charts": charts, "text": text, "error": _is_error(text)}
+
+
+# ==========================================
+# 4. 다중 대상 병렬 수집 (Fan-out)
+# ==========================================
+# 대상별 navigator→coder 체인을 동시에 실행하되, 브라우저(navigator)와 코드 실행 샌드박스(coder) 수는 제한합니다.
+# 프로세스 전체에서 공유되므로 여러 supervisor 실행이 겹쳐도 총 동시 실행 수는 이 값을 넘지 않습니다.
+FANOUT_BROWSER_SLOTS = int(os.getenv("SUPERVISOR_BROWSER_SLOTS", "2"))
+FANOUT_SANDBOX_SLOTS = int(os.getenv("SUPERVISOR_SANDBOX_SLOTS", "4"))
+FANOUT_MAX_TARGETS = int(os.getenv("SUPERVISOR_MAX_TARGETS", "10"))
+
+_browser_slots = asyncio.Semaphore(max(1, FANOUT_BROWSER_SLOTS))
+_sandbox_slots = asyncio.Semaphore(max(1, FANOUT_SANDBOX_SLOTS))
+
+
+async def _collect_target(target: str, user_request: str, config: RunnableConfig) -> dict:
+    """대상 1개의 navigator -> coder 체인. 실패해도 예외 대신 결과 dict에 error를 담아 반환합니다. (취소는 그대로 전파)"""
+    request = f"{user_request}\n\n[이번 수집 대상]\n{target}" if user_request else target
+    stage = "navigator"
     try:
-        result = analyst_agent.invoke({"messages": [HumanMessage(content=prompt)]})
-        response = result["messages"][-1].content
-        return response
+        async with _browser_slots:
+            text, blueprint = await _run_navigator(request, config)
+        if blueprint is None:
+            return {"target": target, "status": "error", "stage": "navigator", "error": text}
+
+        stage = "coder"
+        async with _sandbox_slots:
+            collected, data = await _run_coder(blueprint["handle"], config)
+        result = {"target": target, "blueprint": blueprint["handle"], "data": [a["handle"] for a in data]}
+        if _is_error(collected):
+            return {**result, "status": "error", "stage": "coder", "error": collected}
+        return {**result, "status": "ok", "result": collected}
     except Exception as e:
-        return f"[Error] Analyst 실행 실패: {str(e)}"
+        # 캐시(sqlite)/아티팩트 저장(OSError) 등 위임 밖의 실패도 이 대상만 실패로 처리해 다른 대상의 결과를 지킵니다.
+        print(f"[supervisor] fan-out target failed at {stage}: {target} ({type(e).__name__}: {e})")
+        return {"target": target, "status": "error", "stage": stage, "error": f"{type(e).__name__}: {e}"}
+
+
+@tool(
+    "delegate_parallel_collection",
+    description="여러 사이트/섹션을 동시에 수집합니다. 대상별 Blueprint 생성과 수집을 병렬로 실행하고, 수집된 결과를 한 번에 분석합니다.",
+)
+async def delegate_parallel_collection(targets: List[str], config: RunnableConfig, user_request: str = "",
+                                       analyze: bool = True) -> str:
+    """
+    서로 독립적인 수집 대상 여러 개를 동시에 처리합니다.
+    전체 소요 시간은 대상별 소요 시간의 합이 아니라 가장 느린 대상(+ 슬롯 대기)에 가깝습니다.
+
+    Args:
+        targets: 수집 대상 목록 (URL 또는 "사이트명 - 섹션" 형식의 설명)
+        user_request: 모든 대상에 공통으로 적용되는 수집 목표 (수집 필드 등)
+        analyze: True면 성공한 대상들의 결과를 모아 Analyst를 한 번 호출합니다.
+
+    Returns:
+        대상별 수집 결과와 통합 분석 결과 (JSON)
+    """
+    targets = [t.strip() for t in targets if t and t.strip()][:FANOUT_MAX_TARGETS]
+    if not targets:
+        return "[Error] 수집 대상(targets)이 비어 있습니다."
+
+    print(f"[supervisor] fan-out: {len(targets)} targets "
+          f"(browser slots {FANOUT_BROWSER_SLOTS}, sandbox slots {FANOUT_SANDBOX_SLOTS})")
+    # 하나가 취소되면(상위 실행 취소) gather가 나머지 대상도 함께 취소합니다.
+    results = await asyncio.gather(
+        *(_collect_target(target, user_request, config) for target in targets)
+    )
+
+    report = {"targets": results, "succeeded": sum(r["status"] == "ok" for r in results), "total": len(results)}
+    succeeded = [r for r in results if r["status"] == "ok"]
+    if analyze and succeeded:
+        merged = "\n\n".join(
+            f"[대상 {r['target']}]\n데이터: {', '.join(r['data']) or '(결과 메시지 참고)'}\n{r['result']}" for r in succeeded
+        )
+        analysis, charts = await _run_analyst(
+            f"아래 수집 결과에 명시된 파일들을 모두 함께 비교 분석하세요.\n{merged}", config, "chart_merged.png"
+        )
+        report["analysis"] = analysis
+        report["charts"] = [a["handle"] for a in charts]
+    return json.dumps(report, ensure_ascii=False, indent=2)
 
 
 # ==========================================
-# 2. Supervisor 에이전트 정의
+# 5. Supervisor 에이전트 정의 (LLM)
 # ==========================================
-def get_agent_executor():
+def _build_llm_supervisor():
     llm = create_chat_model(temperature=0.2)
 
     system_prompt = (
@@ -124,8 +407,12 @@ def get_agent_executor():
         "\n2. 도구 사용 규칙:\n"
         "   - 직접 코드를 작성하지 마세요. 반드시 도구를 통해 처리합니다.\n"
         "   - 각 도구의 출력 결과를 다음 도구의 입력으로 사용합니다.\n"
-        "   - Navigator의 결과(Blueprint)를 Coder에게 전달합니다.\n"
-        "   - Coder의 결과(데이터 파일 경로)를 Analyst에게 전달합니다.\n"
+        "   - Navigator의 결과(Blueprint artifact handle)를 Coder에게 전달합니다.\n"
+        "   - Coder의 결과(데이터 artifact handle 또는 파일 경로)를 Analyst에게 전달합니다.\n"
+        "   - `artifact:`로 시작하는 handle은 내용을 다시 쓰지 말고 handle 문자열 그대로 다음 도구에 전달하세요.\n"
+        "   - 여러 사이트나 여러 섹션처럼 서로 독립적인 수집 대상이 2개 이상이면, 대상마다 Step 1~3을 반복하지 말고 "
+        "`delegate_parallel_collection` 도구에 대상 목록(targets)과 공통 수집 목표(user_request)를 한 번에 전달하세요. "
+        "대상별 수집을 병렬로 실행하고 통합 분석까지 수행합니다.\n"
         "\n3. 작업 완료 후:\n"
         "   - 생성된 모든 파일 목록 (JSON, CSV, PNG 등)\n"
         "   - 각 파일의 저장 경로\n"
@@ -139,7 +426,7 @@ def get_agent_executor():
 
     supervisor = create_agent(
         model=llm,
-        tools=[delegate_navigator, delegate_coder, delegate_analyst],
+        tools=[delegate_navigator, delegate_coder, delegate_analyst, delegate_parallel_collection],
         system_prompt=system_prompt,
         name="supervisor",
     )
@@ -147,4 +434,166 @@ def get_agent_executor():
     return supervisor
 
 
-agent_executor = get_agent_executor()
+# ==========================================
+# 6. 결정적 파이프라인 (Fast Path)
+# ==========================================
+# 대상 URL이 하나이고 수집/분석 의도가 드러난 표준 수집 요청은 supervisor LLM의 계획 턴 없이
+# navigator -> coder -> analyst를 고정 순서로 실행합니다. 요청이 모호하거나(대상 URL 없음/여러 개, 의도 키워드 없음)
+# 단계가 실패하면 LLM supervisor로 넘깁니다.
+# 각 단계는 위의 delegate 도구를 그대로 호출하므로 도구 이벤트(/stream의 tool_start, /metrics)는 동일하게 남습니다.
+SUPERVISOR_FAST_PATH = os.getenv("SUPERVISOR_FAST_PATH", "1").strip().lower() in ("1", "true", "yes", "on")
+
+PIPELINE_RUNS = metrics.counter(
+    "supervisor_pipeline_runs_total",
+    "Supervisor runs by execution path (fast = fixed pipeline started, fallback = pipeline handed off to the LLM, llm = LLM only).",
+    ("path",),
+)
+
+
+class PipelineState(TypedDict, total=False):
+    messages: Annotated[list, add_messages]
+    blueprint: Optional[dict]
+    data: List[dict]
+    charts: List[dict]
+    analysis: str
+    failure: Optional[str]
+
+
+def _request_text(state: PipelineState) -> str:
+    for message in reversed(state["messages"]):
+        if isinstance(message, HumanMessage):
+            return message.content if isinstance(message.content, str) else str(message.content)
+    return ""
+
+
+# 고정 파이프라인(수집 -> 분석)에 맞는 요청인지 판단하는 의도 키워드. URL만 있는 질문/요약 요청은 LLM에게 맡깁니다.
+FAST_PATH_INTENT_RE = re.compile(
+    r"수집|크롤링|크롤|스크래핑|스크랩|추출|긁어|분석|시각화|차트|그래프"
+    r"|\b(?:collect|crawl|scrap(?:e|ing)|extract|analy[sz]e|visuali[sz]e|chart|plot)",
+    re.IGNORECASE,
+)
+
+
+def _fast_path_blocker(request: str, forced: bool = False) -> Optional[str]:
+    """fast path로 처리할 수 없는 사유를 반환합니다. (None이면 fast path)
+
+    ``forced`` 는 호출자가 수집 요청임을 명시한 경우(configurable ``fast_path=True``)로, 의도 키워드 검사를 건너뜁니다.
+    """
+    urls = set(URL_RE.findall(request))
+    if not urls:
+        return "대상 URL이 없음"
+    if len(urls) > 1:
+        return "대상 URL이 여러 개 (병렬 수집 필요)"
+    if not forced and not FAST_PATH_INTENT_RE.search(URL_RE.sub(" ", request)):
+        return "수집/분석 의도가 명확하지 않음"
+    return None
+
+
+async def _call_stage(stage_tool, args: dict, config: RunnableConfig):
+    # ToolCall 형식으로 호출하면 ToolMessage(content, artifact)를 받습니다.
+    call = {"name": stage_tool.name, "args": args, "id": f"pipeline_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+    return await stage_tool.ainvoke(call, config)
+
+
+def _route_start(state: PipelineState, config: RunnableConfig) -> str:
+    forced = bool((config or {}).get("configurable", {}).get("fast_path"))
+    blocker = _fast_path_blocker(_request_text(state), forced)
+    if blocker:
+        print(f"[supervisor] LLM supervisor 사용: {blocker}")
+        PIPELINE_RUNS.inc(path="llm")
+        return "supervisor"
+    PIPELINE_RUNS.inc(path="fast")
+    return "navigator"
+
+
+def _next_or_fallback(next_node: str):
+    return lambda state: "fallback" if state.get("failure") else next_node
+
+
+async def _navigator_node(state: PipelineState, config: RunnableConfig) -> dict:
+    result = await _call_stage(delegate_navigator, {"user_request": _request_text(state)}, config)
+    blueprint = (result.artifact or {}).get("blueprint")
+    # JSON으로 해석되지 않는 Blueprint(질문/설명 등)는 모호한 상황으로 보고 LLM에게 넘깁니다.
+    if not blueprint or not blueprint["path"].endswith(".json"):
+        return {"failure": f"navigator: {result.content[:500]}"}
+    return {"blueprint": blueprint}
+
+
+async def _coder_node(state: PipelineState, config: RunnableConfig) -> dict:
+    result = await _call_stage(delegate_coder, {"blueprint": state["blueprint"]["handle"]}, config)
+    artifact = result.artifact or {}
+    if artifact.get("error") or not artifact.get("data"):
+        return {"failure": f"coder: {result.content[:500]}"}
+    return {"data": artifact["data"]}
+
+
+async def _analyst_node(state: PipelineState, config: RunnableConfig) -> dict:
+    handles = ", ".join(a["handle"] for a in state["data"])
+    result = await _call_stage(delegate_analyst, {"data_file_path": handles}, config)
+    artifact = result.artifact or {}
+    if artifact.get("error"):
+        return {"failure": f"analyst: {result.content[:500]}"}
+    return {"charts": artifact.get("charts", []), "analysis": artifact.get("text", result.content)}
+
+
+async def _report_node(state: PipelineState, config: RunnableConfig) -> dict:
+    blueprint = state["blueprint"]
+    target = blueprint.get("summary", {}).get("target_url", "")
+    lines = ["데이터 수집 및 분석을 완료했습니다.", "", f"1. Blueprint: {blueprint['handle']} {target}".rstrip()]
+    lines.append("2. 수집 데이터:")
+    lines += [f"   - {a['path']} ({a['name']}, {a['size']:,} bytes, {a['handle']})" for a in state["data"]]
+    lines.append("3. 분석 결과:")
+    lines += [f"   - {a['path']} ({a['name']}, {a['handle']})" for a in state.get("charts", [])]
+    lines += ["", state.get("analysis", "")]
+    report = "\n".join(lines).strip()
+    # LLM 토큰 스트림이 없는 최종 답변이므로 서버 /stream에 한 번에 보내도록 알립니다.
+    await adispatch_custom_event("stream_text", {"content": report}, config=config)
+    return {"messages": [AIMessage(content=report)]}
+
+
+def _fallback_node(state: PipelineState) -> dict:
+    # 완료된 단계의 handle을 넘겨 LLM supervisor가 처음부터 다시 하지 않고 이어서 진행하게 합니다.
+    PIPELINE_RUNS.inc(path="fallback")
+    print(f"[supervisor] 파이프라인 중단 -> LLM supervisor: {state['failure'][:200]}")
+    done = []
+    if state.get("blueprint"):
+        done.append(f"- Blueprint: {state['blueprint']['handle']}")
+    if state.get("data"):
+        done.append(f"- 수집 데이터: {', '.join(a['handle'] for a in state['data'])}")
+    note = (
+        "[자동 파이프라인 진행 상황]\n"
+        f"실패한 단계: {state['failure']}\n"
+        + ("완료된 단계 산출물:\n" + "\n".join(done) + "\n" if done else "")
+        + "완료된 산출물은 다시 만들지 말고 handle을 그대로 사용하여 원래 요청의 남은 단계를 진행하세요."
+    )
+    return {"messages": [HumanMessage(content=note)]}
+
+
+def build_pipeline(supervisor):
+    graph = StateGraph(PipelineState)
+    graph.add_node("navigator", _navigator_node)
+    graph.add_node("coder", _coder_node)
+    graph.add_node("analyst", _analyst_node)
+    graph.add_node("report", _report_node)
+    graph.add_node("fallback", _fallback_node)
+    graph.add_node("supervisor", supervisor)
+
+    graph.add_conditional_edges(START, _route_start, ["navigator", "supervisor"])
+    graph.add_conditional_edges("navigator", _next_or_fallback("coder"), ["coder", "fallback"])
+    graph.add_conditional_edges("coder", _next_or_fallback("analyst"), ["analyst", "fallback"])
+    graph.add_conditional_edges("analyst", _next_or_fallback("report"), ["report", "fallback"])
+    graph.add_edge("fallback", "supervisor")
+    graph.add_edge("report", END)
+    graph.add_edge("supervisor", END)
+    return graph.compile(name="supervisor")
+
+
+def get_agent_executor():
+    supervisor = _build_llm_supervisor()
+    if not SUPERVISOR_FAST_PATH:
+        return supervisor
+    return build_pipeline(supervisor)
+
+
+# 실행기는 처음 접근할 때 생성합니다. (import 만으로는 LLM/체크포인터를 만들지 않음)
+__getattr__ = lazy_executor_getattr(__name__, get_agent_executor)
@@ -1,60 +1,422 @@
 import requests
+import httpx
+import asyncio
+import random
 import json
 import sys
 import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
+# ==========================================
+# 1. 공통: 재시도 정책 / SSE 파싱
+# ==========================================
+# 429/503은 서버가 에이전트를 실행하기 전에 거절한 것(Admission Control)이므로 POST도 재시도해도 안전합니다.
+ADMISSION_RETRY_STATUS = {429, 503}
+# 멱등 요청(GET, 작업 취소, Last-Event-ID 재접속)은 게이트웨이 오류도 재시도합니다.
+IDEMPOTENT_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _should_retry(status_code: int, idempotent: bool) -> bool:
+    return status_code in (IDEMPOTENT_RETRY_STATUS if idempotent else ADMISSION_RETRY_STATUS)
+
+
+def _retry_delay(attempt: int, backoff: float, max_backoff: float, retry_after: str = None) -> float:
+    """Full-jitter 지수 백오프. 서버가 Retry-After를 주면 그 값을 최소 대기 시간으로 사용합니다."""
+    delay = random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def _parse_sse_line(line: str):
+    """
+    SSE 한 줄을 해석합니다.
+    :return: ("id", "run:seq") / ("data", dict) / ("end", None) / (None, None)
+    """
+    # SSE Format: "id: {run_id}:{seq}" -> 재접속 위치로 기록
+    if line.startswith("id: "):
+        return "id", line[4:].strip()
+    # SSE Format: "data: {...}"
+    if line.startswith("data: "):
+        json_str = line[6:] # remove "data: "
+        if not json_str.strip():
+            return None, None
+        try:
+            return "data", json.loads(json_str)
+        except json.JSONDecodeError:
+            return None, None
+    # End Event
+    if line.startswith("event: end"):
+        return "end", None
+    return None, None
+
+
+def _stream_payload(message: str, thread_id: str, coalesce_tokens: bool, nested_events: str = None) -> dict:
+    payload = {
+        "message": message,
+        "thread_id": thread_id,
+        "stream_tokens": True,
+        "coalesce_tokens": coalesce_tokens,
+    }
+    if nested_events:
+        payload["nested_events"] = nested_events
+    return payload
+
+
+# ==========================================
+# 2. 동기 클라이언트 (requests.Session 커넥션 풀)
+# ==========================================
 class AgentClient:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    """
+    에이전트 서버용 동기 클라이언트.
+
+    하나의 requests.Session(Keep-Alive 커넥션 풀)을 모든 호출이 공유하므로
+    메시지마다 TCP/TLS 연결을 새로 맺지 않습니다. 스레드 간에 공유해도 됩니다.
+    :param timeout: 응답 대기(read) 타임아웃(초). 에이전트 실행 시간을 고려해 길게 잡습니다.
+    :param connect_timeout: 연결 타임아웃(초)
+    :param max_retries: 재시도 횟수 (멱등 요청, 또는 서버가 실행 전에 거절한 429/503)
+    :param pool_size: 호스트당 유지할 최대 커넥션 수
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: float = 300.0,
+                 connect_timeout: float = 5.0, max_retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 10.0, pool_size: int = 16):
         self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, method: str, path: str, idempotent: bool = False, **kwargs) -> requests.Response:
+        """재시도를 포함하여 요청을 보냅니다. 최종 실패 시 requests 예외를 그대로 올립니다."""
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # 연결 단계 실패(ConnectTimeout)는 서버에 요청이 전달되지 않았으므로 POST도 재시도합니다.
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                time.sleep(_retry_delay(attempt, self.backoff, self.max_backoff))
+                continue
+
+            if attempt < self.max_retries and _should_retry(response.status_code, idempotent):
+                response.close()
+                time.sleep(_retry_delay(attempt, self.backoff, self.max_backoff, response.headers.get("Retry-After")))
+                continue
+            if not response.ok:
+                response.close()
+            response.raise_for_status()
+            return response
+
+    def _request(self, method: str, path: str, idempotent: bool = False, **kwargs) -> dict:
+        try:
+            return self._send(method, path, idempotent=idempotent, **kwargs).json()
+        except requests.exceptions.RequestException as e:
+            return {"type": "error", "content": str(e)}
 
     def invoke(self, agent_name: str, message: str, thread_id: str = None) -> dict:
         """
         단일 호출 (Blocking)
         :return: {"type": "ai", "content": "..."}
         """
-        url = f"{self.base_url}/{agent_name}/invoke"
         payload = {"message": message, "thread_id": thread_id}
-        try:
-            response = requests.post(url, json=payload)
+        return self._request("post", f"/{agent_name}/invoke", json=payload)
+
+    def batch(self, agent_name: str, messages: list, thread_ids: list = None, concurrency: int = 4) -> list:
+        """
+        여러 메시지를 한 번의 요청으로 서버에서 동시에 실행 (Blocking)
+        :return: [{"index": 0, "type": "ai", "content": "...", "status_code": 200}, ...] (입력 순서)
+        """
+        thread_ids = thread_ids or [None] * len(messages)
+        payload = {
+            "items": [{"message": m, "thread_id": t} for m, t in zip(messages, thread_ids)],
+            "concurrency": concurrency,
+        }
+        result = self._request("post", f"/{agent_name}/batch", json=payload)
+        if result.get("type") == "error":
+            return [{"index": i, "type": "error", "content": result["content"]} for i in range(len(messages))]
+        return result["results"]
+
+    # --- Concurrent Fan-out (클라이언트 측 동시 실행) ---
+    def fan_out(self, calls: list, concurrency: int = 8) -> list:
+        """
+        인자 없는 함수 목록을 최대 concurrency 개씩 동시에 실행하고 입력 순서대로 결과를 반환합니다.
+        모든 호출이 같은 커넥션 풀을 재사용합니다.
+
+        예) client.fan_out([lambda m=m: list(client.stream("basic", m)) for m in messages])
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(calls) or 1))) as pool:
+            return list(pool.map(lambda call: call(), calls))
+
+    def invoke_many(self, agent_name: str, messages: list, thread_ids: list = None, concurrency: int = 8) -> list:
+        """여러 메시지를 /invoke로 동시에 호출합니다. (입력 순서대로 결과 반환)"""
+        # thread_id를 주지 않으면 메시지마다 새 대화로 실행합니다. (/batch 서버 측 기본값과 동일)
+        thread_ids = thread_ids or [uuid.uuid4().hex for _ in messages]
+        return self.fan_out(
+            [lambda m=m, t=t: self.invoke(agent_name, m, t) for m, t in zip(messages, thread_ids)],
+            concurrency=concurrency,
+        )
+
+    # --- Async Jobs (장시간 실행 작업) ---
+    def submit_job(self, agent_name: str, message: str, thread_id: str = None) -> dict:
+        """
+        작업을 제출하고 즉시 반환 (연결을 유지하지 않음)
+        :return: {"job_id": "...", "status": "queued"}
+        """
+        return self._request("post", "/jobs", json={"agent": agent_name, "message": message, "thread_id": thread_id})
+
+    def get_job(self, job_id: str) -> dict:
+        """작업 상태 및 진행 상황 조회"""
+        return self._request("get", f"/jobs/{job_id}", idempotent=True)
+
+    def get_job_result(self, job_id: str) -> dict:
+        """완료된 작업의 결과 조회. 아직 실행 중이면 {"type": "error", ...}"""
+        return self._request("get", f"/jobs/{job_id}/result", idempotent=True)
+
+    def cancel_job(self, job_id: str) -> dict:
+        """작업 취소 요청"""
+        return self._request("post", f"/jobs/{job_id}/cancel", idempotent=True)
+
+    def stream(self, agent_name: str, message: str, thread_id: str = None, coalesce_tokens: bool = False,
+               max_reconnects: int = 3, reconnect_delay: float = 1.0, nested_events: str = None):
+        """
+        스트리밍 호출 (Generator)
+        연결이 중간에 끊기면 마지막으로 받은 이벤트 ID(Last-Event-ID)로 재접속하여
+        같은 실행의 나머지 프레임을 이어서 받습니다. (최대 max_reconnects 회)
+        :param coalesce_tokens: True면 서버가 토큰을 짧은 시간/크기 단위로 묶어서 보냅니다. (프레임 수 감소)
+        :param nested_events: supervisor 워커 이벤트 전달 수준 (none | progress | tools | tokens, 기본: 서버 설정)
+        :yield: dict (token, tool_start, stage, stage_token, error 등)
+        """
+        payload = _stream_payload(message, thread_id, coalesce_tokens, nested_events)
+        last_event_id = None
+        reconnects = 0
+
+        while True:
+            headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+            try:
+                # stream=True로 연결 유지. 재접속 요청은 새 실행을 만들지 않으므로 멱등입니다.
+                with self._send("post", f"/{agent_name}/stream", idempotent=bool(last_event_id),
+                                json=payload, headers=headers, stream=True) as response:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        field, value = _parse_sse_line(line.decode('utf-8'))
+                        if field == "id":
+                            last_event_id = value
+                        elif field == "data":
+                            yield value
+                        elif field == "end":
+                            return
+
+                # end 이벤트 없이 응답이 끝난 경우도 연결 끊김으로 보고 재접속합니다.
+                error = "Stream closed before the end event."
+            except requests.exceptions.RequestException as e:
+                # 410: 서버에 실행 기록이 더 이상 없음 -> 재접속 불가
+                if getattr(e.response, "status_code", None) == 410:
+                    yield {"type": "error", "error": str(e)}
+                    return
+                error = str(e)
+
+            if last_event_id is None or reconnects >= max_reconnects:
+                yield {"type": "error", "error": error}
+                return
+            reconnects += 1
+            time.sleep(reconnect_delay * reconnects)
+
+
+# ==========================================
+# 3. 비동기 클라이언트 (httpx.AsyncClient 커넥션 풀)
+# ==========================================
+class AsyncAgentClient:
+    """
+    AgentClient의 asyncio 버전. 하나의 httpx.AsyncClient(커넥션 풀)를 공유하며,
+    이벤트 루프를 막지 않고 많은 요청을 동시에 보낼 수 있습니다.
+
+    async with AsyncAgentClient() as client:
+        results = await client.invoke_many("basic", messages, concurrency=16)
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: float = 300.0,
+                 connect_timeout: float = 5.0, max_retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 10.0, pool_size: int = 16):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _send(self, method: str, path: str, idempotent: bool = False, stream: bool = False,
+                    **kwargs) -> httpx.Response:
+        """재시도를 포함하여 요청을 보냅니다. stream=True면 호출자가 response.aclose()를 책임집니다."""
+        for attempt in range(self.max_retries + 1):
+            request = self.client.build_request(method.upper(), path, **kwargs)
+            try:
+                response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                # 연결 단계 실패(ConnectError/ConnectTimeout)는 요청이 전달되지 않았으므로 POST도 재시도합니다.
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(_retry_delay(attempt, self.backoff, self.max_backoff))
+                continue
+
+            if attempt < self.max_retries and _should_retry(response.status_code, idempotent):
+                await response.aclose()
+                await asyncio.sleep(
+                    _retry_delay(attempt, self.backoff, self.max_backoff, response.headers.get("Retry-After"))
+                )
+                continue
+            if response.is_error and stream:
+                await response.aclose()
             response.raise_for_status()
+            return response
+
+    async def _request(self, method: str, path: str, idempotent: bool = False, **kwargs) -> dict:
+        try:
+            response = await self._send(method, path, idempotent=idempotent, **kwargs)
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {"type": "error", "content": str(e)}
 
-    def stream(self, agent_name: str, message: str, thread_id: str = None):
+    async def invoke(self, agent_name: str, message: str, thread_id: str = None) -> dict:
+        """단일 호출 :return: {"type": "ai", "content": "..."}"""
+        return await self._request("post", f"/{agent_name}/invoke", json={"message": message, "thread_id": thread_id})
+
+    async def batch(self, agent_name: str, messages: list, thread_ids: list = None, concurrency: int = 4) -> list:
+        """여러 메시지를 한 번의 요청으로 서버에서 동시에 실행 (입력 순서대로 반환)"""
+        thread_ids = thread_ids or [None] * len(messages)
+        payload = {
+            "items": [{"message": m, "thread_id": t} for m, t in zip(messages, thread_ids)],
+            "concurrency": concurrency,
+        }
+        result = await self._request("post", f"/{agent_name}/batch", json=payload)
+        if result.get("type") == "error":
+            return [{"index": i, "type": "error", "content": result["content"]} for i in range(len(messages))]
+        return result["results"]
+
+    # --- Concurrent Fan-out (클라이언트 측 동시 실행) ---
+    async def fan_out(self, calls: list, concurrency: int = 8) -> list:
         """
-        스트리밍 호출 (Generator)
-        :yield: dict (token, tool_start, error 등)
+        인자 없는 코루틴 함수 목록을 최대 concurrency 개씩 동시에 실행하고 입력 순서대로 결과를 반환합니다.
+
+        예) await client.fan_out([lambda m=m: client.collect_stream("basic", m) for m in messages])
         """
-        url = f"{self.base_url}/{agent_name}/stream"
-        payload = {"message": message, "thread_id": thread_id, "stream_tokens": True}
-        
-        try:
-            # stream=True로 연결 유지
-            with requests.post(url, json=payload, stream=True) as response:
-                response.raise_for_status()
-                
-                for line in response.iter_lines():
-                    if line:
-                        decoded_line = line.decode('utf-8')
-                        
-                        # SSE Format: "data: {...}"
-                        if decoded_line.startswith("data: "):
-                            json_str = decoded_line[6:] # remove "data: "
-                            if not json_str.strip():
-                                continue
-                            try:
-                                data = json.loads(json_str)
-                                yield data
-                            except json.JSONDecodeError:
-                                pass
-                                
-                        # End Event
-                        elif decoded_line.startswith("event: end"):
-                            break
-                            
-        except requests.exceptions.RequestException as e:
-            yield {"type": "error", "error": str(e)}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _run(call):
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(*(_run(call) for call in calls))
+
+    async def invoke_many(self, agent_name: str, messages: list, thread_ids: list = None, concurrency: int = 8) -> list:
+        """여러 메시지를 /invoke로 동시에 호출합니다. (입력 순서대로 결과 반환)"""
+        # thread_id를 주지 않으면 메시지마다 새 대화로 실행합니다. (/batch 서버 측 기본값과 동일)
+        thread_ids = thread_ids or [uuid.uuid4().hex for _ in messages]
+        return await self.fan_out(
+            [lambda m=m, t=t: self.invoke(agent_name, m, t) for m, t in zip(messages, thread_ids)],
+            concurrency=concurrency,
+        )
+
+    async def collect_stream(self, agent_name: str, message: str, thread_id: str = None) -> dict:
+        """/stream 결과를 모아 {"type": "ai", "content": ..., "tools": [...]} 하나로 반환합니다."""
+        tokens, tools = [], []
+        async for chunk in self.stream(agent_name, message, thread_id, coalesce_tokens=True):
+            if chunk.get("type") == "token":
+                tokens.append(chunk.get("content", ""))
+            elif chunk.get("type") == "tool_start":
+                tools.append(chunk.get("name"))
+            elif chunk.get("type") == "error" or "error" in chunk:
+                return {"type": "error", "content": chunk.get("error") or chunk.get("content"), "tools": tools}
+        return {"type": "ai", "content": "".join(tokens), "tools": tools}
+
+    # --- Async Jobs (장시간 실행 작업) ---
+    async def submit_job(self, agent_name: str, message: str, thread_id: str = None) -> dict:
+        return await self._request("post", "/jobs", json={"agent": agent_name, "message": message, "thread_id": thread_id})
+
+    async def get_job(self, job_id: str) -> dict:
+        return await self._request("get", f"/jobs/{job_id}", idempotent=True)
+
+    async def get_job_result(self, job_id: str) -> dict:
+        return await self._request("get", f"/jobs/{job_id}/result", idempotent=True)
+
+    async def cancel_job(self, job_id: str) -> dict:
+        return await self._request("post", f"/jobs/{job_id}/cancel", idempotent=True)
+
+    async def stream(self, agent_name: str, message: str, thread_id: str = None, coalesce_tokens: bool = False,
+                     max_reconnects: int = 3, reconnect_delay: float = 1.0, nested_events: str = None):
+        """스트리밍 호출 (Async Generator). 재접속/nested_events 동작은 AgentClient.stream과 같습니다."""
+        payload = _stream_payload(message, thread_id, coalesce_tokens, nested_events)
+        last_event_id = None
+        reconnects = 0
+
+        while True:
+            headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+            try:
+                response = await self._send("post", f"/{agent_name}/stream", idempotent=bool(last_event_id),
+                                            stream=True, json=payload, headers=headers)
+                try:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        field, value = _parse_sse_line(line)
+                        if field == "id":
+                            last_event_id = value
+                        elif field == "data":
+                            yield value
+                        elif field == "end":
+                            return
+                finally:
+                    await response.aclose()
+
+                error = "Stream closed before the end event."
+            except httpx.HTTPError as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 410:
+                    yield {"type": "error", "error": str(e)}
+                    return
+                error = str(e)
+
+            if last_event_id is None or reconnects >= max_reconnects:
+                yield {"type": "error", "error": error}
+                return
+            reconnects += 1
+            await asyncio.sleep(reconnect_delay * reconnects)
 
 # --- Interactive Test Loop ---
 if __name__ == "__main__":
@@ -105,13 +467,17 @@ if __name__ == "__main__":
         
         # Stream Output
         try:
-            for chunk in client.stream(current_agent, user_input, thread_id):
+            for chunk in client.stream(current_agent, user_input, thread_id, coalesce_tokens=True):
                 if "type" in chunk:
                     if chunk["type"] == "token":
                         content = chunk.get("content", "")
                         print(content, end="", flush=True)
+                    elif chunk["type"] == "stage":
+                        elapsed = f" ({chunk['elapsed_ms'] / 1000:.1f}s)" if "elapsed_ms" in chunk else ""
+                        print(f"\n📍 [Stage: {chunk.get('stage')}] {chunk.get('status')}{elapsed}")
                     elif chunk["type"] == "tool_start":
-                        print(f"\n🛠️ [Tool: {chunk['name']}] Processing...", end="")
+                        stage = f"{chunk['stage']} > " if chunk.get("stage") else ""
+                        print(f"\n🛠️ [Tool: {stage}{chunk['name']}] Processing...", end="")
                         if 'input' in chunk:
                              print(f" Input: {chunk['input']}", end="")
                         print("\n", end="")
@@ -28,23 +28,27 @@ if os.path.exists(dotenv_path):
 else:
     print("Warning: .env file not found.")
 
+import asyncio
 import logging
 import json
+import time
 import traceback
-from typing import AsyncGenerator, Optional, Dict, Any
+import uuid
+from typing import AsyncGenerator, AsyncIterator, Callable, Optional, Dict, Any, List, Literal
 
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-# --- Agent Executors Import ---
-# 주의: 환경 변수(API Key)가 로드된 후에 에이전트 모듈을 임포트해야 합니다.
-from app.agents.chatbot import agent_executor as chatbot_agent
-from app.agents.multimodal_agent import agent_executor as multimodal_agent
-from app.agents.navigator_agent import agent_executor as navigator_agent
-from app.agents.coder_agent import agent_executor as coder_agent
-from app.agents.analyst_agent import agent_executor as analyst_agent
-from app.agents.supervisor_agent import agent_executor as supervisor_agent
+# --- Agent Registry Import ---
+# 에이전트 모듈은 첫 요청(또는 warmup) 시점에 임포트/생성됩니다.
+# 환경 변수(API Key)는 위에서 이미 로드되었으므로 그 이후 언제 생성되어도 안전합니다.
+from app.agents.registry import LazyAgent, registry
+from app.utils.concurrency import AgentLimiter, AdmissionRejected, parse_agent_limits
+from app.utils.metrics import AGENT_QUEUE_WAIT, AGENT_TTFT, ToolMetricsCallback, metrics, track_run
+from app.utils.stream_runs import StreamRunRegistry, follow_run
+from app.utils.browser_pool import get_browser_pool, shutdown_browser_pool
+from app.utils.jobs import JobManager, JobQueueFull, JobStore, DEFAULT_JOB_DB_PATH, FINISHED_STATUSES, SUCCEEDED
 
 # Logging Setup
 logging.basicConfig(level=logging.INFO)
@@ -57,76 +61,399 @@ class UserInput(BaseModel):
 
 class StreamInput(UserInput):
     stream_tokens: bool = Field(default=True)
+    # 토큰 묶음 전송: 토큰을 버퍼에 모았다가 시간/크기 기준으로 한 프레임에 보냅니다.
+    coalesce_tokens: bool = Field(default=False)
+    flush_interval_ms: int = Field(default=20, ge=0)
+    flush_bytes: int = Field(default=256, ge=1)
+    # 하위(워커) 에이전트 이벤트 전달 수준. 비우면 STREAM_NESTED_EVENTS 환경 변수 값을 사용합니다.
+    nested_events: Optional[Literal["none", "progress", "tools", "tokens"]] = None
 
 class ChatMessage(BaseModel):
     type: str
     content: str
 
+class WarmupInput(BaseModel):
+    agents: Optional[List[str]] = None
+
+class BatchInput(BaseModel):
+    items: List[UserInput]
+    # 한 배치 안에서 동시에 실행할 최대 메시지 수 (에이전트 동시 실행 슬롯 제한도 함께 적용됨)
+    concurrency: int = Field(default=4, ge=1, le=64)
+    # True면 완료되는 순서대로 NDJSON 한 줄씩 반환, False면 입력 순서대로 모아서 한 번에 반환
+    stream_results: bool = Field(default=False)
+
+class BatchItemResult(BaseModel):
+    index: int
+    type: str
+    content: str
+    status_code: int = 200
+
+class BatchOutput(BaseModel):
+    results: List[BatchItemResult]
+
+class JobInput(UserInput):
+    agent: str = Field(default="supervisor")
+
+
+# --- Concurrency Limits ---
+# 브라우저/서브프로세스를 띄우는 무거운 에이전트일수록 슬롯과 대기열을 작게 잡습니다.
+# AGENT_MAX_CONCURRENCY="navigator=2,*=8" 처럼 환경 변수로 덮어쓸 수 있습니다.
+DEFAULT_MAX_CONCURRENCY = {"basic": 16, "multimodal": 8, "navigator": 2, "coder": 4, "analyst": 4, "supervisor": 2}
+DEFAULT_MAX_QUEUE = {"basic": 64, "multimodal": 32, "navigator": 4, "coder": 8, "analyst": 8, "supervisor": 4}
+
+def build_limiters() -> Dict[str, AgentLimiter]:
+    concurrency = parse_agent_limits(os.environ.get("AGENT_MAX_CONCURRENCY"), DEFAULT_MAX_CONCURRENCY)
+    queue = parse_agent_limits(os.environ.get("AGENT_MAX_QUEUE"), DEFAULT_MAX_QUEUE)
+    queue_timeout = float(os.environ.get("AGENT_QUEUE_TIMEOUT", "30"))
+    return {
+        name: AgentLimiter(name, concurrency.get(name, 4), queue.get(name, 8), queue_timeout)
+        for name in registry.names()
+    }
+
+limiters = build_limiters()
+
+# /stream 클라이언트 연결 끊김을 확인하는 주기(초)
+DISCONNECT_POLL_SECONDS = float(os.environ.get("STREAM_DISCONNECT_POLL_SECONDS", "0.5"))
+
+# supervisor가 위임한 워커 에이전트의 이벤트를 /stream으로 얼마나 전달할지 (뒤로 갈수록 많이 전달)
+# none: 전달 안 함 / progress: 단계 시작·종료(stage 프레임) / tools: + 워커 도구 호출 / tokens: + 워커 LLM 토큰(stage_token)
+NESTED_EVENT_LEVELS = ("none", "progress", "tools", "tokens")
+DEFAULT_NESTED_EVENTS = os.environ.get("STREAM_NESTED_EVENTS", "tools").strip().lower()
+if DEFAULT_NESTED_EVENTS not in NESTED_EVENT_LEVELS:
+    DEFAULT_NESTED_EVENTS = "tools"
+
+# 재접속(Last-Event-ID)을 위한 실행별 프레임 보관 설정
+stream_runs = StreamRunRegistry(
+    buffer_size=int(os.environ.get("STREAM_REPLAY_BUFFER", "2048")),
+    resume_grace=float(os.environ.get("STREAM_RESUME_GRACE_SECONDS", "15")),
+    retention=float(os.environ.get("STREAM_RUN_RETENTION_SECONDS", "300")),
+)
+
+
+async def _with_flush_ticks(events: AsyncIterator, next_timeout: Callable[[], Optional[float]]) -> AsyncGenerator:
+    """
+    events를 그대로 전달하되, next_timeout()초(None이면 무제한) 안에 다음 이벤트가 오지 않으면 None을 끼워 넣습니다.
+    모델이 멈춰도 버퍼에 쌓인 토큰을 flush_interval_ms 안에 내보내기 위한 것입니다.
+    원본 이터레이터는 하나의 Task에서 끝까지 돌려 LangChain의 실행 컨텍스트가 유지되도록 합니다.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    finished = object()
+
+    async def _produce():
+        try:
+            async for event in events:
+                await queue.put((event, None))
+            await queue.put((finished, None))
+        except Exception as e:
+            await queue.put((finished, e))
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            timeout = next_timeout()
+            try:
+                item, error = await (queue.get() if timeout is None else asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is finished:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # 스트림이 취소/종료되면 에이전트 실행도 함께 취소합니다.
+        producer.cancel()
+
 
 # --- Router Factory ---
-def create_agent_router(agent_executor, prefix: str, tags: list = None) -> APIRouter:
+def create_agent_router(agent, prefix: str, tags: list = None, limiter: AgentLimiter = None) -> APIRouter:
     """
-    주어진 에이전트 실행기(Executor)를 위한 FastAPI 라우터를 생성하는 팩토리 함수입니다.
+    주어진 에이전트를 위한 FastAPI 라우터를 생성하는 팩토리 함수입니다.
     /invoke 및 /stream 엔드포인트를 자동으로 등록합니다.
+
+    agent에는 실행기(Executor)를 직접 넘기거나, 레지스트리의 LazyAgent를 넘길 수 있습니다.
+    LazyAgent인 경우 첫 요청 시점(또는 warmup 호출 시)에 실행기가 생성됩니다.
+    limiter를 지정하면 동시 실행 수와 대기열 길이를 제한하고, 초과 시 429/503으로 즉시 거절합니다.
     """
     router = APIRouter(prefix=prefix, tags=tags or [prefix])
+    agent_name = prefix.strip("/")
 
-    async def _stream_generator(input_data: StreamInput) -> AsyncGenerator[str, None]:
+    async def _get_executor():
+        if isinstance(agent, LazyAgent):
+            return await agent.aget()
+        return agent
+
+    async def _admit() -> float:
+        # 슬롯을 얻을 때까지 대기하고 대기 시간을 반환합니다. (limiter가 없으면 0)
+        if limiter is None:
+            return 0.0
         try:
-            config = {"configurable": {"thread_id": input_data.thread_id}} if input_data.thread_id else {}
+            waited = await limiter.acquire()
+            AGENT_QUEUE_WAIT.observe(waited, agent=agent_name)
+            return waited
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected request in {prefix}: {e.reason}")
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.reason,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+    async def _admit_waiting() -> float:
+        # 배치 항목은 외부 요청과 슬롯을 공유하되, 거절하지 않고 슬롯이 날 때까지 기다립니다.
+        if limiter is None:
+            return 0.0
+        waited = await limiter.acquire_waiting()
+        AGENT_QUEUE_WAIT.observe(waited, agent=agent_name)
+        return waited
+
+    def _run_config(thread_id: Optional[str]) -> dict:
+        config = {"callbacks": [ToolMetricsCallback(agent_name)]}
+        if thread_id:
+            config["configurable"] = {"thread_id": thread_id}
+        return config
+
+    def _release_once():
+        # 스트림 종료/클라이언트 이탈 어느 쪽에서 호출되어도 슬롯은 한 번만 반환합니다.
+        started = time.perf_counter()
+        released = False
+
+        def _release():
+            nonlocal released
+            if limiter is not None and not released:
+                released = True
+                limiter.release(time.perf_counter() - started)
+
+        return _release
+
+    async def _stream_generator(input_data: StreamInput) -> AsyncGenerator[str, None]:
+        # coalesce_tokens=True면 토큰을 버퍼링하여 flush_interval_ms 또는 flush_bytes 기준으로 내보냅니다.
+        token_buffer = []
+        buffered_bytes = 0
+        buffer_started = 0.0
+        flush_interval = input_data.flush_interval_ms / 1000
+        nested_level = NESTED_EVENT_LEVELS.index(input_data.nested_events or DEFAULT_NESTED_EVENTS)
+
+        def _flush_tokens() -> Optional[str]:
+            nonlocal buffered_bytes
+            if not token_buffer:
+                return None
+            content = "".join(token_buffer)
+            token_buffer.clear()
+            buffered_bytes = 0
+            return f"data: {json.dumps({'type': 'token', 'content': content})}\n\n"
+
+        # 실행 시간/결과/TTFT 및 도구별 소요 시간을 /metrics에 기록합니다.
+        with track_run(agent_name, "stream") as outcome:
+            try:
+                run_started = time.perf_counter()
+                first_token = True
+                agent_executor = await _get_executor()
+                config = _run_config(input_data.thread_id)
             
-            # LangGraph astream_events (v2)
-            async for event in agent_executor.astream_events(
-                {"messages": [("user", input_data.message)]}, 
-                config=config,
-                version="v2"
-            ):
-                kind = event["event"]
+                # LangGraph astream_events (v2)
+                # 버퍼에 토큰이 있으면 flush 기한까지만 다음 이벤트를 기다리고, 기한이 지나면(None) 바로 내보냅니다.
+                events = agent_executor.astream_events(
+                    {"messages": [("user", input_data.message)]},
+                    config=config,
+                    version="v2"
+                )
+                flush_deadline = lambda: (max(0.0, buffer_started + flush_interval - time.perf_counter())
+                                          if token_buffer else None)
+                async for event in _with_flush_ticks(events, flush_deadline):
+                    if event is None:
+                        frame = _flush_tokens()
+                        if frame:
+                            yield frame
+                        continue
+                    kind = event["event"]
+
+                    # 위임된 워커 내부 이벤트 (metadata.stage가 붙어 있음): 최종 답변 토큰과 섞이지 않도록 stage를 달아 별도 프레임으로 보냅니다.
+                    stage = (event.get("metadata") or {}).get("stage")
+                    if stage is not None:
+                        frame = None
+                        tagged = {"stage": stage, "stage_run": event["metadata"].get("stage_run")}
+                        if kind == "on_tool_start" and nested_level >= 2:
+                            frame = {"type": "tool_start", "name": event["name"], "input": event["data"].get("input"), **tagged}
+                        elif (kind == "on_chat_model_stream" and nested_level >= 3
+                              and "exclude_from_stream" not in event.get("tags", [])):
+                            chunk = event["data"]["chunk"]
+                            if chunk and chunk.content:
+                                frame = {"type": "stage_token", "content": chunk.content, **tagged}
+                        if frame:
+                            pending = _flush_tokens()
+                            if pending:
+                                yield pending
+                            yield f"data: {json.dumps(frame, default=str)}\n\n"
+                        continue
+
+                    # 토큰 이외의 이벤트가 오면 버퍼에 남은 토큰을 먼저 내보내 순서를 보장합니다.
+                    if kind != "on_chat_model_stream":
+                        frame = _flush_tokens()
+                        if frame:
+                            yield frame
                 
-                # Tool Start
-                if kind == "on_tool_start":
-                    yield f"data: {json.dumps({'type': 'tool_start', 'name': event['name'], 'input': event['data'].get('input')})}\n\n"
+                    # Tool Start
+                    if kind == "on_tool_start":
+                        yield f"data: {json.dumps({'type': 'tool_start', 'name': event['name'], 'input': event['data'].get('input')})}\n\n"
                 
-                # Token Streaming (Chat Model)
-                elif kind == "on_chat_model_stream":
-                    # 내부 로직(예: Self-Query 구성 등)에서 발생하는 중간 단계의 토큰은 제외합니다.
-                    tags = event.get("tags", [])
-                    if "exclude_from_stream" in tags:
-                        continue
+                    # 워커 단계 시작/종료 (supervisor가 보내는 stage_progress)
+                    elif kind == "on_custom_event" and event["name"] == "stage_progress":
+                        if nested_level >= 1:
+                            yield f"data: {json.dumps({'type': 'stage', **(event.get('data') or {})})}\n\n"
 
-                    chunk = event["data"]["chunk"]
-                    if chunk and chunk.content:
-                        yield f"data: {json.dumps({'type': 'token', 'content': chunk.content})}\n\n"
+                    # LLM 토큰 없이 만들어진 텍스트 (예: supervisor 결정적 파이프라인의 최종 보고)
+                    elif kind == "on_custom_event" and event["name"] == "stream_text":
+                        content = (event.get("data") or {}).get("content")
+                        if content:
+                            if first_token:
+                                first_token = False
+                                AGENT_TTFT.observe(time.perf_counter() - run_started, agent=agent_name)
+                            yield f"data: {json.dumps({'type': 'token', 'content': content})}\n\n"
+                
+                    # Token Streaming (Chat Model)
+                    elif kind == "on_chat_model_stream":
+                        # 내부 로직(예: Self-Query 구성 등)에서 발생하는 중간 단계의 토큰은 제외합니다.
+                        tags = event.get("tags", [])
+                        if "exclude_from_stream" in tags:
+                            continue
 
-        except Exception as e:
-            logger.error(f"Stream error in {prefix}: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                        chunk = event["data"]["chunk"]
+                        if chunk and chunk.content:
+                            if first_token:
+                                first_token = False
+                                AGENT_TTFT.observe(time.perf_counter() - run_started, agent=agent_name)
+                            if not input_data.coalesce_tokens or not isinstance(chunk.content, str):
+                                frame = _flush_tokens()
+                                if frame:
+                                    yield frame
+                                yield f"data: {json.dumps({'type': 'token', 'content': chunk.content})}\n\n"
+                                continue
+
+                            if not token_buffer:
+                                buffer_started = time.perf_counter()
+                            token_buffer.append(chunk.content)
+                            buffered_bytes += len(chunk.content.encode("utf-8"))
+                            if (buffered_bytes >= input_data.flush_bytes
+                                    or time.perf_counter() - buffer_started >= flush_interval):
+                                yield _flush_tokens()
+
+                frame = _flush_tokens()
+                if frame:
+                    yield frame
+
+            except Exception as e:
+                logger.error(f"Stream error in {prefix}: {e}")
+                outcome["status"] = "error"
+                frame = _flush_tokens()
+                if frame:
+                    yield frame
+                yield f"data: {json.dumps({'error': str(e)})}\n\n"
         
-        yield "event: end\ndata: \n\n"
+            yield "event: end\ndata: \n\n"
+
+    async def _run_invoke(input_data: UserInput, endpoint: str = "invoke") -> ChatMessage:
+        with track_run(agent_name, endpoint):
+            agent_executor = await _get_executor()
+            config = _run_config(input_data.thread_id)
 
-    @router.post("/invoke", response_model=ChatMessage)
-    async def invoke(input_data: UserInput):
-        try:
-            config = {"configurable": {"thread_id": input_data.thread_id}} if input_data.thread_id else {}
-            
             # invoke returns the final state
             result = await agent_executor.ainvoke(
                 {"messages": [("user", input_data.message)]},
                 config=config
             )
-            # LangGraph: State['messages'][-1] is the AI response
-            last_message = result["messages"][-1]
-            return ChatMessage(type="ai", content=last_message.content)
+        # LangGraph: State['messages'][-1] is the AI response
+        last_message = result["messages"][-1]
+        return ChatMessage(type="ai", content=last_message.content)
+
+    @router.post("/invoke", response_model=ChatMessage)
+    async def invoke(input_data: UserInput, response: Response):
+        waited = await _admit()
+        response.headers["X-Queue-Wait-Ms"] = str(int(waited * 1000))
+        release = _release_once()
+        try:
+            return await _run_invoke(input_data)
         except Exception as e:
             logger.error(f"Invocation error in {prefix}: {e}")
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            release()
+
+    @router.post("/batch", response_model=BatchOutput)
+    async def batch(input_data: BatchInput):
+        """
+        여러 메시지를 같은 에이전트에 동시에 실행합니다. (최대 concurrency 개씩, 에이전트 슬롯 수를 넘지 않음)
+        메시지 하나가 실패해도 나머지는 계속 실행되며, 실패 항목은 type="error"로 반환됩니다.
+        항목은 429/503으로 거절되지 않고 에이전트 슬롯이 날 때까지 기다립니다.
+        """
+        concurrency = input_data.concurrency
+        if limiter is not None:
+            # 슬롯보다 많이 띄우면 남는 항목은 대기열만 차지하므로 슬롯 수로 제한합니다.
+            concurrency = min(concurrency, limiter.max_concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _run_item(index: int, item: UserInput) -> BatchItemResult:
+            # thread_id가 없는 항목은 서로 섞이지 않도록 새 thread_id를 붙입니다. (checkpointer가 있는 에이전트 대응)
+            if not item.thread_id:
+                item = item.model_copy(update={"thread_id": uuid.uuid4().hex})
+            async with semaphore:
+                await _admit_waiting()
+                release = _release_once()
+                try:
+                    message = await _run_invoke(item, endpoint="batch")
+                    return BatchItemResult(index=index, type=message.type, content=message.content)
+                except Exception as e:
+                    logger.error(f"Batch item {index} error in {prefix}: {e}")
+                    return BatchItemResult(index=index, type="error", content=str(e), status_code=500)
+                finally:
+                    release()
+
+        tasks = [asyncio.create_task(_run_item(i, item)) for i, item in enumerate(input_data.items)]
+
+        if not input_data.stream_results:
+            return BatchOutput(results=await asyncio.gather(*tasks))
+
+        async def _ndjson() -> AsyncGenerator[str, None]:
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    item_result = await finished
+                    yield item_result.model_dump_json() + "\n"
+            finally:
+                # 클라이언트가 중간에 끊으면 남은 항목은 취소합니다.
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
 
     @router.post("/stream")
-    async def stream(input_data: StreamInput):
+    async def stream(input_data: StreamInput, request: Request):
+        """
+        에이전트 실행을 SSE로 중계합니다. 모든 프레임에는 ``id: {run_id}:{seq}`` 가 붙습니다.
+
+        연결이 끊긴 클라이언트는 같은 엔드포인트에 ``Last-Event-ID`` 헤더를 붙여 다시 요청하면
+        새 실행을 시작하지 않고 놓친 프레임부터 이어서 받습니다. (본문은 무시됨)
+        STREAM_RESUME_GRACE_SECONDS 안에 재접속하지 않으면 실행을 취소하여 자원을 회수합니다. (이후 재접속하면 취소 error 프레임과 end를 받음)
+        """
+        last_event_id = request.headers.get("last-event-id")
+        if last_event_id:
+            run, after_seq = stream_runs.resolve(last_event_id)
+            if run is None or run.agent_name != agent_name:
+                raise HTTPException(status_code=410, detail="Stream run expired or unknown. Start a new run.")
+            return StreamingResponse(
+                follow_run(run, after_seq, DISCONNECT_POLL_SECONDS, request.is_disconnected),
+                media_type="text/event-stream",
+                headers={"X-Stream-Run-Id": run.run_id},
+            )
+
+        waited = await _admit()
+        # 슬롯은 HTTP 연결이 아니라 실행(run)이 끝날 때 반환합니다. (재접속 대기 중에도 실행은 계속됨)
+        run = stream_runs.start(agent_name, _stream_generator(input_data), on_finish=_release_once())
         return StreamingResponse(
-            _stream_generator(input_data), 
-            media_type="text/event-stream"
+            follow_run(run, 0, DISCONNECT_POLL_SECONDS, request.is_disconnected),
+            media_type="text/event-stream",
+            headers={"X-Queue-Wait-Ms": str(int(waited * 1000)), "X-Stream-Run-Id": run.run_id},
         )
         
     return router
@@ -139,25 +466,200 @@ app = FastAPI(
     description="Unified Server for Multiple Agents"
 )
 
+@app.on_event("startup")
+async def warmup_on_startup():
+    # AGENT_WARMUP="all" 또는 "basic,multimodal" 처럼 지정하면 기동 시 미리 생성합니다.
+    # 지정하지 않으면 모든 에이전트는 첫 요청 시점에 생성됩니다.
+    warmup_env = os.environ.get("AGENT_WARMUP", "").strip()
+    if not warmup_env:
+        return
+    names = None if warmup_env.lower() == "all" else [n.strip() for n in warmup_env.split(",") if n.strip()]
+    report = await registry.warmup(names)
+    logger.info(f"Agent warmup report: {json.dumps(report)}")
+
+@app.on_event("startup")
+async def start_jobs_on_startup():
+    # 작업 저장소는 import 시점이 아니라 기동 시점에 만듭니다.
+    # 종료된(heartbeat가 끊긴) 워커가 끝내지 못한 작업만 interrupted로 표시하고, 살아 있는 다른 워커의 작업은 그대로 둡니다.
+    count = await get_job_manager().start()
+    if count:
+        logger.warning(f"Marked {count} unfinished job(s) as interrupted")
+
+@app.on_event("shutdown")
+async def stop_jobs_on_shutdown():
+    if job_manager is not None:
+        await job_manager.stop()
+
+@app.on_event("shutdown")
+async def close_browser_pool_on_shutdown():
+    # 브라우저 풀이 띄운 Chromium 프로세스를 정리합니다. (풀을 쓴 적이 없으면 아무것도 하지 않음)
+    await shutdown_browser_pool()
+
+@app.get("/browser/sessions")
+async def browser_sessions():
+    # 브라우저 풀 현황과 진행 중인 대여 목록 (lease_id로 화면 피드를 요청)
+    return get_browser_pool().stats()
+
+@app.get("/browser/sessions/{lease_id}/screencast")
+async def browser_screencast(lease_id: str, request: Request, mode: Literal["screencast", "screenshot"] = "screencast",
+                             interval: float = 1.0, quality: int = 60):
+    # 시청 중일 때만 CDP에 붙는 MJPEG 피드 (<img src="..."> 로 바로 볼 수 있음). lease_id 대신 thread_id도 가능
+    pool = get_browser_pool()
+    lease = pool.find_lease(lease_id)
+    if lease is None:
+        raise HTTPException(status_code=404, detail=f"No active browser lease: {lease_id}")
+
+    async def _frames():
+        async for jpeg in pool.watch(lease, mode=mode, interval=max(interval, 0.1), quality=min(max(quality, 1), 100)):
+            if await request.is_disconnected():
+                break
+            yield b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n"
+
+    return StreamingResponse(_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+
 @app.get("/health")
 def health():
     # report basic health plus configured LLM model environment variable
     model_env = os.environ.get("LLM_MODEL")
     return {
         "status": "ok",
-        "agents": ["basic", "multimodal", "navigator", "coder", "analyst", "supervisor"],
+        "agents": registry.names(),
+        "agents_loaded": [name for name in registry.names() if registry[name].loaded],
         "openai_key_set": bool(os.environ.get("OPENAI_API_KEY")),
         "google_key_set": bool(os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")),
         "llm_model_env": model_env,
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus 텍스트 포맷
+    return metrics.render()
+
+@app.get("/agents/status")
+def agents_status():
+    # 에이전트별 startup 리포트 (import/build 소요 시간, 로드 여부, 에러)와
+    # 동시 실행 슬롯/대기열 현황(queue depth, 대기 시간, 거절 횟수)
+    report = registry.report()
+    for name, limiter in limiters.items():
+        report[name]["concurrency"] = limiter.stats()
+    return report
+
+@app.post("/agents/warmup")
+async def agents_warmup(input_data: WarmupInput = None):
+    names = input_data.agents if input_data else None
+    unknown = [n for n in (names or []) if n not in registry]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown agents: {unknown}")
+    return await registry.warmup(names)
+
+# --- Async Jobs ---
+# 수 분 이상 걸리는 supervisor 파이프라인 등을 HTTP 연결과 분리하여 백그라운드에서 실행합니다.
+async def _run_job(job: dict, report_progress) -> str:
+    agent_name = job["agent"]
+    limiter = limiters[agent_name]
+
+    # 작업도 에이전트 동시 실행 슬롯을 공유합니다. 대기열이 가득 차 있으면 거절 대신 기다렸다가 재시도합니다.
+    await limiter.acquire_waiting()
+
+    started = time.perf_counter()
+    progress = {"events": 0, "tools": [], "current_tool": None}
+    final_output = None
+    try:
+        agent_executor = await registry[agent_name].aget()
+        # thread_id가 없으면 job_id를 thread_id로 사용합니다. (checkpointer가 있는 에이전트 대응)
+        config = {
+            "configurable": {"thread_id": job["thread_id"] or job["job_id"]},
+            "callbacks": [ToolMetricsCallback(agent_name)],
+        }
+        with track_run(agent_name, "job"):
+            async for event in agent_executor.astream_events(
+                {"messages": [("user", job["message"])]},
+                config=config,
+                version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_tool_start":
+                    progress["events"] += 1
+                    progress["current_tool"] = event["name"]
+                    progress["tools"].append({"name": event["name"], "started_at": time.time()})
+                    report_progress(progress)
+                elif kind == "on_tool_end":
+                    progress["events"] += 1
+                    progress["current_tool"] = None
+                    report_progress(progress)
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # 최상위 그래프의 종료 이벤트에 최종 상태가 담겨 있습니다.
+                    final_output = event["data"].get("output")
+    finally:
+        limiter.release(time.perf_counter() - started)
+
+    if isinstance(final_output, dict) and final_output.get("messages"):
+        return final_output["messages"][-1].content
+    return ""
+
+job_manager: Optional[JobManager] = None
+
+def get_job_manager() -> JobManager:
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager(
+            JobStore(os.environ.get("JOB_DB_PATH", DEFAULT_JOB_DB_PATH)),
+            _run_job,
+            max_workers=int(os.environ.get("JOB_MAX_WORKERS", "2")),
+            max_pending=int(os.environ.get("JOB_MAX_PENDING", "100")),
+            heartbeat_interval=float(os.environ.get("JOB_HEARTBEAT_SECONDS", "10")),
+        )
+    return job_manager
+
+@app.post("/jobs", status_code=202, tags=["Jobs"])
+async def submit_job(input_data: JobInput):
+    if input_data.agent not in registry:
+        raise HTTPException(status_code=404, detail=f"Unknown agent: {input_data.agent}")
+    try:
+        job = await get_job_manager().submit(input_data.agent, input_data.message, input_data.thread_id)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+@app.get("/jobs", tags=["Jobs"])
+def list_jobs(status: Optional[str] = None, limit: int = 50):
+    manager = get_job_manager()
+    return {"jobs": manager.store.list(status=status, limit=limit), "pool": manager.stats()}
+
+@app.get("/jobs/{job_id}", tags=["Jobs"])
+def get_job(job_id: str):
+    # 상태/진행 상황 조회 (결과 본문은 /result에서 반환)
+    job = get_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    job.pop("result", None)
+    return job
+
+@app.get("/jobs/{job_id}/result", tags=["Jobs"])
+def get_job_result(job_id: str):
+    job = get_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job["status"] not in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}", headers={"Retry-After": "5"})
+    if job["status"] != SUCCEEDED:
+        return {"job_id": job_id, "status": job["status"], "type": "error", "content": job["error"] or job["status"]}
+    return {"job_id": job_id, "status": job["status"], "type": "ai", "content": job["result"]}
+
+@app.post("/jobs/{job_id}/cancel", tags=["Jobs"])
+async def cancel_job(job_id: str):
+    job = await get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"job_id": job_id, "status": job["status"], "cancel_requested": job["cancel_requested"]}
+
 # --- Register Routers ---
-app.include_router(create_agent_router(chatbot_agent, "/basic", ["Chatbot"]))
-app.include_router(create_agent_router(multimodal_agent, "/multimodal", ["Multimodal"])) #뒤의 리스트 부분은 API 문서에서 사용하는 태그명
-app.include_router(create_agent_router(navigator_agent, "/navigator", ["Web Navigator"])) # (API 문서 태그명은 Web Navigator로 지정)
-app.include_router(create_agent_router(coder_agent, "/coder", ["Python Coder"])) 
-app.include_router(create_agent_router(analyst_agent, "/analyst", ["Data Analyst"]))
-app.include_router(create_agent_router(supervisor_agent, "/supervisor", ["Supervisor"])) 
+app.include_router(create_agent_router(registry["basic"], "/basic", ["Chatbot"], limiters["basic"]))
+app.include_router(create_agent_router(registry["multimodal"], "/multimodal", ["Multimodal"], limiters["multimodal"])) #뒤의 리스트 부분은 API 문서에서 사용하는 태그명
+app.include_router(create_agent_router(registry["navigator"], "/navigator", ["Web Navigator"], limiters["navigator"])) # (API 문서 태그명은 Web Navigator로 지정)
+app.include_router(create_agent_router(registry["coder"], "/coder", ["Python Coder"], limiters["coder"])) 
+app.include_router(create_agent_router(registry["analyst"], "/analyst", ["Data Analyst"], limiters["analyst"]))
+app.include_router(create_agent_router(registry["supervisor"], "/supervisor", ["Supervisor"], limiters["supervisor"])) 
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,19 +1,15 @@
 import os
+import asyncio
 from langchain_core.tools import tool
-from browser_use import Agent, Browser
+from langchain_core.runnables import RunnableConfig
 from app.utils.model_utils import create_chat_model
+from app.utils.metrics import TOOL_CANCELLATIONS
+from app.utils.offline import fake_browse, offline_tools_enabled
+from app.utils.browser_pool import get_browser_pool
 
 # browser-use의 통계 수집(Telemetry)을 비활성화하여 버그 차단
 os.environ["ANONYMIZED_TELEMETRY"] = "false"
 
-# 💡 세션을 유지하는 공유 브라우저 인스턴스
-shared_browser = Browser(
-    headless=False,
-    disable_security=True,
-    window_size={'width': 1280, 'height': 720},
-    keep_alive=True 
-)
-
 # ==========================================
 # 💡 통합 웹 탐색 도구 (Universal Browser Tool)
 # ==========================================
@@ -21,7 +17,8 @@ shared_browser = Browser(
 async def browse_web(
     instruction: str, 
     return_url_only: bool = False, 
-    keep_session_alive: bool = False
+    keep_session_alive: bool = False,
+    config: RunnableConfig = None,
 ) -> str:
     """
     주어진 지시사항에 따라 웹 브라우저를 직접 조작하고 결과를 반환하는 통합 웹 탐색 도구입니다.
@@ -34,6 +31,10 @@ async def browse_web(
     print(f"\n🌐 [Universal Browser Tool] 행동 개시: {instruction}")
     print(f"   ┣ 옵션 - URL 모드: {return_url_only} | 세션 유지: {keep_session_alive}")
     
+    # 오프라인 모드: 실제 브라우저/LLM 없이 고정 지연 후 고정 결과 반환 (부하 테스트용)
+    if offline_tools_enabled():
+        return await fake_browse(instruction, return_url_only)
+
     # 1. URL 모드일 경우 프롬프트 강화
     task = instruction
     if return_url_only:
@@ -42,20 +43,33 @@ async def browse_web(
     # 2. LLM 초기화
     # create_chat_model will choose gpt-4o-mini by default or fall back to
     # gemini-flash-latest; it respects the LLM_MODEL env var if set.
-    bu_llm = create_chat_model(temperature=0.0)
-    
-    # 3. 에이전트 설정 (세션 유지 옵션에 따라 브라우저 주입 여부 결정)
-    agent_kwargs = {
-        "task": task,
-        "llm": bu_llm,
-    }
+    # 단계별 판단은 매번 현재 페이지 상태에 따라 달라야 하므로 응답 캐시(LLM_CACHE)는 쓰지 않습니다.
+    bu_llm = create_chat_model(temperature=0.0, cache=False)
     
-    if keep_session_alive:
-        agent_kwargs["browser"] = shared_browser
-        
-    # 4. 에이전트 실행
-    agent = Agent(**agent_kwargs)
-    history = await agent.run(max_steps=10)
+    # 3. 브라우저 풀에서 Chromium을 빌려 CDP로 연결 (브라우저 기동 비용 없음)
+    # CDP 연결은 context 격리가 없어 쿠키/스토리지를 공유하므로 cdp=True로 Chromium 1개를 독점해서 빌립니다.
+    # 세션 유지 시에는 같은 thread의 호출이 같은 브라우저/browser-use 세션을 이어서 사용하고,
+    # 세션이 만료되면 풀이 보관된 browser-use 세션도 함께 종료합니다.
+    from browser_use import Agent, Browser
+    thread_id = (config or {}).get("configurable", {}).get("thread_id") if keep_session_alive else None
+    async with get_browser_pool().lease(thread_id=thread_id, cdp=True) as lease:
+        browser = lease.state.get("browser_use")
+        if browser is None:
+            # CDP로 붙은 browser-use 세션은 종료 시 연결만 끊고 풀의 Chromium 프로세스는 그대로 둡니다.
+            browser = Browser(cdp_url=lease.cdp_url, keep_alive=keep_session_alive)
+            if keep_session_alive:
+                lease.state["browser_use"] = browser
+
+        # 4. 에이전트 실행
+        agent = Agent(task=task, llm=bu_llm, browser=browser)
+        try:
+            history = await agent.run(max_steps=10)
+        except asyncio.CancelledError:
+            # 상위 실행이 취소되면(예: 스트림 클라이언트 이탈) 남은 step을 중단합니다.
+            agent.stop()
+            TOOL_CANCELLATIONS.inc(tool="browse_web")
+            print("\n⛔ [Universal Browser Tool] 실행 취소됨")
+            raise
     
     result_text = history.final_result()
     
@@ -6,6 +6,7 @@ from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from app.utils.model_utils import create_chat_model
 from langchain_core.messages import HumanMessage
+from app.utils.offline import FakeSearch, offline_tools_enabled
 
 @tool
 def read_image_and_analyze(image_path: str, query_hint: str = "이 이미지의 내용을 상세히 설명해줘.") -> str:
@@ -29,7 +30,7 @@ def read_image_and_analyze(image_path: str, query_hint: str = "이 이미지의
             encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
 
         # choose a model for vision tasks; this will use the LLM_MODEL override if set
-        vision_llm = create_chat_model(temperature=0)
+        vision_llm = create_chat_model(temperature=0, cache=True)
 
         messages = [
             HumanMessage(
@@ -65,6 +66,8 @@ if TavilySearch:
 else:
     tavily_search = None
 
+_offline_search = FakeSearch(max_results=5)
+
 @tool
 def web_search_custom_tool(query: str) -> str:
     """
@@ -73,9 +76,10 @@ def web_search_custom_tool(query: str) -> str:
     """
     print(f"---웹 검색 도구 호출: {query}---")
 
-    # 1. Tavily 호출
+    # 1. Tavily 호출 (오프라인 모드에서는 고정 결과를 반환하는 로컬 대체 검색 사용)
+    search = _offline_search if offline_tools_enabled() else tavily_search
     try:
-        response = tavily_search.invoke({"query": query})
+        response = search.invoke({"query": query})
     except Exception as e:
         return f"검색 중 오류가 발생했습니다: {e}"
 
@@ -94,7 +94,7 @@ if prompt := st.chat_input("메시지를 입력하세요..."):
         
         try:
             # A. 텍스트 스트리밍 수신
-            for chunk in client.stream(agent_name, prompt, st.session_state.thread_id):
+            for chunk in client.stream(agent_name, prompt, st.session_state.thread_id, coalesce_tokens=True):
                 
                 # 🚨 핵심 디버깅: 터미널 창(VS Code/명령프롬프트)에 실제 청크 데이터 출력
                 print("들어온 청크 데이터:", chunk) 
@@ -107,8 +107,11 @@ if prompt := st.chat_input("메시지를 입력하세요..."):
                             content = chunk.get("content", "")
                             full_response += content
                             message_placeholder.markdown(full_response + "▌")
+                        elif chunk["type"] == "stage":
+                            st.toast(f"📍 {chunk.get('stage')}: {chunk.get('status')}")
                         elif chunk["type"] == "tool_start":
-                            with st.status(f"🛠️ 도구 사용 중: {chunk.get('name', '알 수 없음')}", expanded=False) as status:
+                            stage = f"[{chunk['stage']}] " if chunk.get("stage") else ""
+                            with st.status(f"🛠️ 도구 사용 중: {stage}{chunk.get('name', '알 수 없음')}", expanded=False) as status:
                                 st.write(f"Input: {chunk.get('input')}")
                                 status.update(state="complete")
                         elif chunk["type"] == "error":
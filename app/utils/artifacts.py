@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+from typing import List, Optional
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ARTIFACT_STORE_DIR = os.path.join(BASE_DIR, "data", "artifacts")
+
+# 도구 사이에서 주고받는 짧은 참조 문자열 (예: "artifact:3f9a0c1d2b4e5f60")
+HANDLE_PREFIX = "artifact:"
+HANDLE_RE = re.compile(r"artifact:([0-9a-f]{16})")
+
+# 수집/분석 단계가 만든 파일 중 저장소에 등록할 확장자
+DATA_EXTENSIONS = (".json", ".csv", ".jsonl", ".xlsx", ".parquet")
+CHART_EXTENSIONS = (".png", ".jpg", ".jpeg", ".svg", ".html")
+
+
+# ==========================================
+# 1. Content-addressed 아티팩트 저장소
+# ==========================================
+class ArtifactStore:
+    """
+    Blueprint, 수집 데이터, 차트 등 단계별 산출물을 내용 해시(sha256 앞 16자리)로 저장합니다.
+
+    - 같은 내용은 한 번만 저장되고 항상 같은 handle(``artifact:<id>``)을 받습니다.
+    - 파일은 ``<root>/<id 앞 2자리>/<id><확장자>`` 에, 메타데이터(kind, 원본 이름, 크기)는 같은 위치의 ``.meta.json`` 에 둡니다.
+    - LLM은 짧은 handle만 주고받고, 실제 내용/경로는 도구가 로컬에서 resolve 합니다.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARTIFACT_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _base(self, artifact_id: str) -> str:
+        return os.path.join(self.root, artifact_id[:2], artifact_id)
+
+    def _write(self, artifact_id: str, ext: str, kind: str, name: str, size: int, write) -> dict:
+        base = self._base(artifact_id)
+        path = base + ext
+        meta = {
+            "handle": HANDLE_PREFIX + artifact_id,
+            "id": artifact_id,
+            "kind": kind,
+            "name": name,
+            "path": path,
+            "size": size,
+            "created_at": time.time(),
+        }
+        with self._lock:
+            existing = self.get(meta["handle"])
+            if existing is not None:
+                return existing
+            os.makedirs(os.path.dirname(base), exist_ok=True)
+            # 임시 파일에 쓴 뒤 rename하여, 동시에 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 합니다.
+            tmp = f"{path}.tmp{threading.get_ident()}"
+            write(tmp)
+            os.replace(tmp, path)
+            with open(base + ".meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+        return meta
+
+    def put_text(self, text: str, kind: str, ext: str = ".txt", name: Optional[str] = None) -> dict:
+        data = text.encode("utf-8")
+        artifact_id = hashlib.sha256(data).hexdigest()[:16]
+
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                f.write(data)
+
+        return self._write(artifact_id, ext, kind, name or f"{kind}{ext}", len(data), write)
+
+    def put_file(self, path: str, kind: str) -> dict:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        artifact_id = digest.hexdigest()[:16]
+        ext = os.path.splitext(path)[1].lower()
+        return self._write(artifact_id, ext, kind, os.path.basename(path), os.path.getsize(path),
+                           lambda tmp: shutil.copyfile(path, tmp))
+
+    def get(self, handle: str) -> Optional[dict]:
+        match = HANDLE_RE.search(handle or "")
+        if not match:
+            return None
+        try:
+            with open(self._base(match.group(1)) + ".meta.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def read_text(self, handle: str) -> Optional[str]:
+        meta = self.get(handle)
+        if meta is None:
+            return None
+        with open(meta["path"], "r", encoding="utf-8") as f:
+            return f.read()
+
+    # --- 도구 인자 resolve ---
+    def resolve_content(self, value: str) -> str:
+        """값이 handle 하나뿐이면 저장된 내용(텍스트)으로 바꿉니다. 그 외에는 그대로 반환합니다."""
+        if value and HANDLE_RE.fullmatch(value.strip()):
+            text = self.read_text(value.strip())
+            if text is not None:
+                return text
+        return value
+
+    def resolve_paths(self, value: str) -> str:
+        """문자열 안의 모든 handle을 로컬 파일 경로로 바꿉니다. (알 수 없는 handle은 그대로 둠)"""
+        def _replace(match):
+            meta = self.get(match.group(0))
+            return meta["path"] if meta else match.group(0)
+
+        return HANDLE_RE.sub(_replace, value or "")
+
+    def collect(self, directory: str, kind: str, extensions=DATA_EXTENSIONS,
+                since: Optional[float] = None) -> List[dict]:
+        """directory 바로 아래의 파일(확장자 일치, since가 있으면 그 이후 수정분)을 저장소에 등록하고 메타데이터 목록을 반환합니다.
+
+        다른 실행의 파일이 섞이지 않도록 directory는 단계 실행 전용 폴더여야 합니다.
+        """
+        found = []
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return found
+        for name in names:
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(extensions) or not os.path.isfile(path):
+                continue
+            if since is None or os.path.getmtime(path) >= since:
+                found.append(self.put_file(path, kind))
+        return found
+
+
+def describe(artifacts: List[dict]) -> str:
+    """LLM에게 돌려줄 짧은 목록 (handle, 원본 파일명, 크기)"""
+    return "\n".join(f"- {a['handle']} ({a['name']}, {a['size']:,} bytes)" for a in artifacts)
+
+
+# ==========================================
+# 2. 설정 기반 싱글톤
+# ==========================================
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """프로세스 공용 저장소. 경로는 ``ARTIFACT_STORE_DIR`` (기본 ``data/artifacts``)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore(os.environ.get("ARTIFACT_STORE_DIR", DEFAULT_ARTIFACT_STORE_DIR))
+    return _store
@@ -0,0 +1,308 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.utils.metrics import metrics
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_BLUEPRINT_CACHE_PATH = os.path.join(BASE_DIR, "data", "blueprint_cache.sqlite")
+
+BLUEPRINT_CACHE_REQUESTS = metrics.counter(
+    "blueprint_cache_requests_total",
+    "Navigator blueprint cache lookups by result (hit, miss, stale, expired, unverified).",
+    ("result",),
+)
+
+_URL_RE = re.compile(r"https?://[^\s<>\"'()\[\]]+")
+# 경로 조각 중 글 번호/날짜/해시처럼 요청마다 바뀌는 부분
+_VARIABLE_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f-]{36}|\d{4}-\d{2}-\d{2})$", re.IGNORECASE)
+# 수집 목표 정규화: 절 경계(연결어/문장 끝), 분석 단계 단어, 요청 동사, 단어 끝 조사
+_GOAL_CLAUSE_SPLIT_RE = re.compile(r"하고|해서|와서|한\s*(?:뒤|후|다음)|그리고|\band then\b|\bthen\b|[.;\n]")
+_ANALYSIS_WORD_RE = re.compile(r"분석|시각화|차트|그래프|그려|통계|비교|요약|analy[sz]|visuali[sz]|chart|plot|graph|summar")
+_REQUEST_WORD_RE = re.compile(r"(수집|크롤링|스크래핑|추출|긁어|가져와|가져|모아|저장)(해|하여|해서)?(줘|줄래|주세요|주라)?$"
+                              r"|(해줘|해 줘|해주세요|주세요|줘)$")
+_PARTICLE_RE = re.compile(r"(에서|으로|과|와|을|를|이|가|은|는|의|에|로|도|만|랑)$")
+_GOAL_STOPWORDS = {"", "에서", "페이지", "사이트", "좀", "please", "collect", "scrape", "crawl", "extract", "get",
+                   "the", "from", "and", "all", "of"}
+# CSS 선택자 뒤에 붙는 추출 지시자 (예: "a.title::attr(href)", "span::text")
+_PSEUDO_EXTRACT_RE = re.compile(r"::(attr\([^)]*\)|text)\s*$")
+
+
+# ==========================================
+# 1. 캐시 키: URL 패턴 + 수집 목표
+# ==========================================
+def normalize_url_pattern(url: str) -> str:
+    """
+    같은 구조의 페이지가 같은 키를 갖도록 URL을 패턴으로 바꿉니다.
+
+    - 스킴/``www.`` 제거, 호스트 소문자화, 끝의 ``/`` 제거
+    - 숫자/해시/날짜 경로 조각은 ``{n}`` 으로 치환 (예: ``/news/12345`` -> ``/news/{n}``)
+    - 쿼리는 파라미터 이름만 정렬해 남기고 값/fragment는 버립니다. (``?page=3&sid=100`` -> ``?page&sid``)
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    segments = [
+        "{n}" if _VARIABLE_SEGMENT_RE.match(seg) else seg
+        for seg in parts.path.split("/") if seg
+    ]
+    pattern = host + ("/" + "/".join(segments) if segments else "")
+    params = sorted({p.split("=", 1)[0] for p in parts.query.split("&") if p})
+    if params:
+        pattern += "?" + "&".join(params)
+    return pattern
+
+
+def normalize_goal(text: str) -> str:
+    """
+    요청 문장에서 수집 대상(필드)만 남긴 목표 문자열. 표현이 달라도 같은 데이터를 요청하면 같은 키가 됩니다.
+
+    - URL을 지우고, "…수집하고 차트로 시각화해줘"처럼 연결어로 이어진 분석/시각화 절은 버립니다.
+    - 요청 동사(수집/크롤링/해줘 등)와 조사를 지우고, 남은 단어를 정렬해 순서 차이를 없앱니다.
+      (예: "상품명과 가격을 수집해줘" 와 "가격, 상품명 긁어와서 분석해줘" -> "가격 상품명")
+    """
+    text = _URL_RE.sub(" ", text or "").lower()
+    clauses = [c for c in _GOAL_CLAUSE_SPLIT_RE.split(text) if not _ANALYSIS_WORD_RE.search(c)]
+    words = set()
+    for word in re.sub(r"[^\w\s]", " ", " ".join(clauses)).split():
+        word = _REQUEST_WORD_RE.sub("", word)
+        word = _PARTICLE_RE.sub("", word) if len(word) > 2 else word
+        if word and word not in _GOAL_STOPWORDS:
+            words.add(word)
+    return " ".join(sorted(words))
+
+
+def extract_selectors(blueprint: dict) -> List[str]:
+    """
+    Blueprint에서 검증할 CSS 선택자 목록을 뽑습니다.
+
+    app navigator 형식(``element_selectors``)과 노트북 N계층 형식(``layers[].selectors``, ``blueprints[]`` 묶음)
+    모두 지원합니다. N계층 형식은 샘플(진입) 페이지에 있는 첫 계층의 선택자만 검증 대상입니다.
+    """
+    found = []
+    if isinstance(blueprint.get("element_selectors"), dict):
+        found.extend(blueprint["element_selectors"].values())
+    layers = blueprint.get("layers") or []
+    if layers and isinstance(layers[0], dict):
+        found.extend((layers[0].get("selectors") or {}).values())
+        found.append(layers[0].get("navigate_to_next"))
+    for child in blueprint.get("blueprints") or []:
+        if isinstance(child, dict):
+            found.extend(extract_selectors(child))
+    return [s for s in found if isinstance(s, str) and s.strip()]
+
+
+# ==========================================
+# 2. 선택자 재검증 (샘플 HTML 1개)
+# ==========================================
+def verify_selectors(blueprint: dict, html: str) -> Tuple[bool, dict]:
+    """
+    Blueprint의 CSS 선택자가 샘플 HTML에서 각각 1개 이상 매칭되는지 확인합니다.
+
+    XPath 선택자는 건너뜁니다. 검증 가능한 선택자가 하나도 없으면 실패로 보고 navigator를 다시 실행하게 합니다.
+    반환값: (모두 매칭 여부, {선택자: 매칭 수})
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        print("[blueprint_cache] beautifulsoup4가 설치되지 않아 선택자를 검증할 수 없습니다.")
+        return False, {}
+
+    soup = BeautifulSoup(html or "", "html.parser")
+    counts = {}
+    for selector in extract_selectors(blueprint):
+        css = _PSEUDO_EXTRACT_RE.sub("", selector.strip())
+        if not css or css.startswith(("/", "(")):
+            continue
+        try:
+            counts[selector] = len(soup.select(css, limit=1))
+        except Exception:
+            # bs4(soupsieve)가 해석하지 못하는 선택자는 불일치로 취급
+            counts[selector] = 0
+    return bool(counts) and all(counts.values()), counts
+
+
+async def fetch_sample_html(url: str, timeout: float = 10.0, render: str = "http") -> Optional[str]:
+    """
+    재검증용 샘플 페이지를 가져옵니다. 최근 스냅샷이 있으면 재사용합니다. 실패하면 None.
+
+    기본은 브라우저 없이 원본 HTML(``render="http"``)이고, JS 렌더링 사이트는 ``render="browser"`` 로 가져옵니다.
+    """
+    from app.utils.page_snapshots import fetch_page
+
+    try:
+        return (await fetch_page(url, render=render, timeout_ms=int(timeout * 1000)))["html"]
+    except Exception as e:
+        print(f"[blueprint_cache] 샘플 페이지 요청 실패 ({url}): {e}")
+        return None
+
+
+# ==========================================
+# 3. SQLite 기반 Blueprint 캐시
+# ==========================================
+class BlueprintCache:
+    """
+    Navigator가 만든 Blueprint를 (URL 패턴, 수집 목표) 키로 SQLite 파일에 저장합니다.
+
+    - 조회 시 항목이 있으면 샘플 페이지 1개(라이브 요청 또는 호출자가 넘긴 로컬 스냅샷)로 선택자를 다시 검증하고,
+      모두 매칭될 때만 hit으로 처리합니다. 불일치하면 항목을 지우고 stale로 처리합니다.
+    - 원본 HTML(http)에서 선택자가 하나도 매칭되지 않으면 JS 렌더링 사이트로 보고 브라우저 렌더링으로 한 번 더 검증합니다.
+      통과하면 항목의 render를 ``browser`` 로 기록해 이후 재검증은 바로 브라우저로 합니다.
+    - 마지막 검증 후 verify_interval초 이내의 재조회는 검증을 생략합니다. (동일 사이트 fan-out 등)
+    - ttl_seconds가 지난 항목은 검증 없이 삭제합니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_BLUEPRINT_CACHE_PATH, ttl_seconds: Optional[float] = None,
+                 verify_interval: float = 0):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.verify_interval = verify_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blueprint_cache (
+                key TEXT PRIMARY KEY,
+                url_pattern TEXT NOT NULL,
+                goal TEXT NOT NULL,
+                blueprint TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                verified_at REAL NOT NULL,
+                render TEXT NOT NULL DEFAULT 'http'
+            )
+            """
+        )
+        # 이전 버전 파일에는 render 컬럼이 없으므로 추가합니다.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(blueprint_cache)")}
+        if "render" not in columns:
+            self._conn.execute("ALTER TABLE blueprint_cache ADD COLUMN render TEXT NOT NULL DEFAULT 'http'")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(url: str, goal: str) -> Tuple[str, str, str]:
+        pattern, goal = normalize_url_pattern(url), normalize_goal(goal)
+        return hashlib.sha256(f"{pattern}\x00{goal}".encode("utf-8")).hexdigest(), pattern, goal
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM blueprint_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    async def _verify(self, url: str, blueprint: dict, render: str,
+                      snapshot_html: Optional[str]) -> Tuple[Optional[bool], dict, str]:
+        """샘플 페이지로 선택자를 검증합니다. 반환값: (통과 여부 | 샘플 없음이면 None, {선택자: 매칭 수}, 사용한 render)"""
+        if snapshot_html is not None:
+            ok, counts = verify_selectors(blueprint, snapshot_html)
+            return ok, counts, render
+        html = await fetch_sample_html(url, render=render)
+        if html is None:
+            return None, {}, render
+        ok, counts = verify_selectors(blueprint, html)
+        if not ok and render == "http" and counts and not any(counts.values()):
+            # 원본 HTML에 대상 요소가 전혀 없으면 JS로 그려지는 페이지일 가능성이 높으므로 렌더링 후 다시 확인합니다.
+            html = await fetch_sample_html(url, render="browser")
+            if html is None:
+                return None, counts, render
+            ok, counts = verify_selectors(blueprint, html)
+            render = "browser"
+        return ok, counts, render
+
+    async def lookup(self, url: str, goal: str, snapshot_html: Optional[str] = None) -> Optional[dict]:
+        """검증을 통과한 Blueprint(dict)를 반환합니다. 없거나 더 이상 맞지 않으면 None."""
+        key, pattern, _ = self._key(url, goal)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blueprint, created_at, verified_at, render FROM blueprint_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            BLUEPRINT_CACHE_REQUESTS.inc(result="miss")
+            return None
+        blueprint, created_at, verified_at, render = json.loads(row[0]), row[1], row[2], row[3]
+        if self.ttl_seconds and now - created_at > self.ttl_seconds:
+            self._delete(key)
+            BLUEPRINT_CACHE_REQUESTS.inc(result="expired")
+            return None
+
+        if now - verified_at > self.verify_interval:
+            ok, counts, render = await self._verify(url, blueprint, render, snapshot_html)
+            if ok is None:
+                # 샘플을 못 가져온 경우 항목은 남겨두고 이번 요청만 navigator로 넘깁니다.
+                BLUEPRINT_CACHE_REQUESTS.inc(result="unverified")
+                return None
+            if not ok:
+                missing = [s for s, n in counts.items() if not n]
+                print(f"[blueprint_cache] stale: {pattern} (불일치 선택자: {missing or '검증 가능한 선택자 없음'})")
+                self._delete(key)
+                BLUEPRINT_CACHE_REQUESTS.inc(result="stale")
+                return None
+            with self._lock:
+                self._conn.execute("UPDATE blueprint_cache SET verified_at = ?, render = ? WHERE key = ?",
+                                   (now, render, key))
+                self._conn.commit()
+
+        BLUEPRINT_CACHE_REQUESTS.inc(result="hit")
+        print(f"[blueprint_cache] hit: {pattern}")
+        return blueprint
+
+    def store(self, url: str, goal: str, blueprint: dict) -> None:
+        key, pattern, goal = self._key(url, goal)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blueprint_cache (key, url_pattern, goal, blueprint, created_at, verified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, pattern, goal, json.dumps(blueprint, ensure_ascii=False), now, now),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM blueprint_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM blueprint_cache").fetchone()[0]
+        return {"entries": entries}
+
+
+# ==========================================
+# 4. 설정 기반 싱글톤
+# ==========================================
+_blueprint_cache: Optional[BlueprintCache] = None
+_blueprint_cache_lock = threading.Lock()
+
+
+def get_blueprint_cache() -> Optional[BlueprintCache]:
+    """
+    프로세스 공용 Blueprint 캐시. ``BLUEPRINT_CACHE=0`` 이면 None (기본: 켜짐)
+
+    - ``BLUEPRINT_CACHE_PATH``: SQLite 파일 경로 (기본 ``data/blueprint_cache.sqlite``)
+    - ``BLUEPRINT_CACHE_TTL_SECONDS``: 항목 유효 시간(초). 0이면 무제한 (기본 2592000 = 30일)
+    - ``BLUEPRINT_CACHE_VERIFY_SECONDS``: 마지막 검증 후 재검증을 생략하는 시간(초) (기본 600)
+    """
+    global _blueprint_cache
+    if os.environ.get("BLUEPRINT_CACHE", "1").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _blueprint_cache is None:
+        with _blueprint_cache_lock:
+            if _blueprint_cache is None:
+                _blueprint_cache = BlueprintCache(
+                    path=os.environ.get("BLUEPRINT_CACHE_PATH", DEFAULT_BLUEPRINT_CACHE_PATH),
+                    ttl_seconds=float(os.environ.get("BLUEPRINT_CACHE_TTL_SECONDS", "2592000")) or None,
+                    verify_interval=float(os.environ.get("BLUEPRINT_CACHE_VERIFY_SECONDS", "600")),
+                )
+                print(f"[blueprint_cache] enabled: {_blueprint_cache.path}")
+    return _blueprint_cache
@@ -0,0 +1,512 @@
+import os
+import time
+import uuid
+import base64
+import signal
+import socket
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.utils.metrics import metrics
+
+BROWSER_POOL_LEASES = metrics.gauge(
+    "browser_pool_leases_active",
+    "Browser contexts currently leased from the pool.",
+)
+BROWSER_POOL_LAUNCHES = metrics.counter(
+    "browser_pool_launches_total",
+    "Chromium launches by reason (start, recycle, unhealthy).",
+    ("reason",),
+)
+BROWSER_SCREENCAST_VIEWERS = metrics.gauge(
+    "browser_screencast_viewers",
+    "Clients currently watching a leased browser (screencast, screenshot).",
+    ("mode",),
+)
+BROWSER_POOL_WAIT = metrics.histogram(
+    "browser_pool_lease_wait_seconds",
+    "Time spent waiting for a free browser context.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Slot:
+    """미리 띄워 둔 Chromium 프로세스 1개"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.cdp_url: Optional[str] = None
+        self.pages = 0          # 기동 이후 열린 페이지 수 (recycle 기준)
+        self.active = 0         # 현재 대여 중인 context 수
+        self.draining = False   # recycle 대기 (새 대여를 받지 않음)
+        self.launched_at = 0.0
+        self.pid: Optional[int] = None
+        self.cdp_owner: Optional[str] = None  # CDP로 붙은 대여(또는 thread 세션) 키. 브라우저당 1개만 허용
+
+
+class BrowserLease:
+    """
+    ``BrowserPool.lease()`` 가 돌려주는 대여 정보.
+
+    - ``context``: 다른 대여와 쿠키/스토리지가 분리된 Playwright BrowserContext
+    - ``cdp_url``: 같은 Chromium에 CDP로 붙어야 하는 도구(browser-use 등)용 주소.
+      CDP로 붙은 도구는 context 격리를 받지 못하므로 ``lease(cdp=True)`` 로 빌려야 하며, 그 동안 이 Chromium에는
+      다른 CDP 대여가 배정되지 않습니다.
+    - ``state``: thread 세션에 함께 보관되는 dict (세션 대여일 때만 다음 대여로 이어짐)
+    - ``lease_id``: 화면 피드(``BrowserPool.watch``)로 이 대여를 지정할 때 쓰는 ID
+    """
+
+    def __init__(self, slot: _Slot, context, thread_id: Optional[str], state: dict):
+        self.lease_id = uuid.uuid4().hex[:12]
+        self.context = context
+        self.cdp_url = slot.cdp_url
+        self.thread_id = thread_id
+        self.state = state
+        self.browser_index = slot.index
+        self.started_at = time.time()
+        self.released = False
+
+    async def new_page(self):
+        return await self.context.new_page()
+
+
+# ==========================================
+# 1. Chromium 프로세스/컨텍스트 풀
+# ==========================================
+class BrowserPool:
+    """
+    Headless Chromium N개를 미리 띄워 두고, 격리된 BrowserContext를 대여/반납 방식으로 나눠 줍니다.
+
+    - 동시 대여 수는 ``size * contexts_per_browser`` 로 제한되며, 대여는 가장 한가한 브라우저에 배정합니다.
+    - 대여 시점에 연결이 끊긴(크래시) 브라우저는 다시 띄웁니다. (health check)
+    - 페이지를 ``recycle_after_pages`` 개 이상 연 브라우저는 진행 중인 대여가 끝난 뒤 새 프로세스로 교체합니다.
+    - ``thread_id`` 를 주면 같은 thread의 대여는 같은 context(로그인/쿠키/열린 탭 유지)를 받고 순서대로 실행됩니다.
+      ``session_idle_seconds`` 동안 쓰이지 않은 세션과 recycle 대상 브라우저의 세션은 닫힙니다.
+    - ``cdp=True`` 대여(browser-use처럼 CDP로 브라우저 전체에 붙는 도구)는 Chromium 1개를 독점합니다.
+      CDP 연결은 기본 context(쿠키/스토리지)를 공유하므로, 동시 실행 수는 ``size`` 로 제한되고 나머지는 대기합니다.
+      세션 대여라면 세션이 닫힐 때까지 독점이 유지되며, 빈 브라우저가 없으면 쉬고 있는 세션부터 닫아 자리를 만듭니다.
+    - Playwright 객체는 이벤트 루프에 묶이므로 풀 하나는 한 루프에서만 사용합니다. (``get_browser_pool`` 참고)
+    """
+
+    def __init__(self, size: int = 2, contexts_per_browser: int = 4, recycle_after_pages: int = 50,
+                 session_idle_seconds: float = 600, headless: bool = True, launch_args: Optional[List[str]] = None,
+                 context_options: Optional[dict] = None):
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.recycle_after_pages = recycle_after_pages
+        self.session_idle_seconds = session_idle_seconds
+        self.headless = headless
+        self.launch_args = list(launch_args or ["--disable-dev-shm-usage"])
+        self.context_options = context_options or {
+            "user_agent": DEFAULT_USER_AGENT,
+            "viewport": {"width": 1280, "height": 720},
+            "ignore_https_errors": True,
+        }
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self._sessions: Dict[str, dict] = {}
+        self._leases: Dict[str, BrowserLease] = {}
+        self._playwright = None
+        self._started = False
+        self._lock = asyncio.Lock()
+        self._cdp_released = asyncio.Condition(self._lock)
+        self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+
+    # --- 프로세스 관리 ---
+    async def start(self):
+        """Chromium 프로세스를 모두 띄웁니다. 첫 대여 시 자동으로 호출됩니다."""
+        async with self._lock:
+            if self._started:
+                return
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            await asyncio.gather(*(self._launch(slot, "start") for slot in self._slots), return_exceptions=True)
+            self._started = True
+
+    async def _launch(self, slot: _Slot, reason: str):
+        port = _free_port()
+        slot.browser = await self._playwright.chromium.launch(
+            headless=self.headless, args=[f"--remote-debugging-port={port}", *self.launch_args]
+        )
+        slot.cdp_url = f"http://127.0.0.1:{port}"
+        slot.pid = await self._browser_pid(slot.browser)
+        slot.pages = 0
+        slot.draining = False
+        slot.cdp_owner = None
+        slot.launched_at = time.time()
+        BROWSER_POOL_LAUNCHES.inc(reason=reason)
+        print(f"[browser_pool] chromium #{slot.index} launched ({reason}, headless={self.headless})")
+
+    @staticmethod
+    async def _browser_pid(browser) -> Optional[int]:
+        """루프가 끝난 뒤에도 프로세스를 정리할 수 있도록(``kill``) Chromium 브라우저 프로세스의 PID를 CDP로 조회합니다."""
+        try:
+            cdp = await browser.new_browser_cdp_session()
+            try:
+                info = await cdp.send("SystemInfo.getProcessInfo")
+            finally:
+                await cdp.detach()
+            return next((p["id"] for p in info.get("processInfo", []) if p.get("type") == "browser"), None)
+        except Exception:
+            return None
+
+    async def _close_slot(self, slot: _Slot):
+        for thread_id, session in list(self._sessions.items()):
+            if session["slot"] is slot:
+                await self._close_session(thread_id)
+        slot.cdp_owner = None
+        slot.pid = None
+        browser, slot.browser = slot.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _relaunch(self, slot: _Slot, reason: str):
+        await self._close_slot(slot)
+        try:
+            await self._launch(slot, reason)
+        except Exception as e:
+            print(f"[browser_pool] chromium #{slot.index} launch failed: {e}")
+
+    @staticmethod
+    def _healthy(slot: _Slot) -> bool:
+        return slot.browser is not None and slot.browser.is_connected()
+
+    async def _close_session(self, thread_id: str):
+        """(self._lock 안에서) thread 세션을 닫습니다. 세션에 보관된 도구 객체(browser-use Browser 등)도 함께 종료합니다."""
+        session = self._sessions.pop(thread_id, None)
+        if session is None:
+            return
+        for value in list(session["state"].values()):
+            closer = getattr(value, "kill", None) or getattr(value, "stop", None)
+            if closer is None:
+                continue
+            try:
+                result = closer()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"[browser_pool] session {thread_id} state close failed: {e}")
+        session["state"].clear()
+        try:
+            await session["context"].close()
+        except Exception:
+            pass
+        slot = session["slot"]
+        if slot.cdp_owner == self._session_key(thread_id):
+            slot.cdp_owner = None
+            self._cdp_released.notify_all()
+
+    @staticmethod
+    def _session_key(thread_id: str) -> str:
+        return f"session:{thread_id}"
+
+    # --- 대여/반납 ---
+    async def _acquire(self, thread_id: Optional[str], cdp: bool = False):
+        """(self._lock 안에서) 배정할 브라우저와 context를 고릅니다. CDP 대여에 내줄 브라우저가 없으면 None."""
+        now = time.time()
+        for tid, session in list(self._sessions.items()):
+            if not session["lock"].locked() and now - session["last_used"] > self.session_idle_seconds:
+                await self._close_session(tid)
+
+        session = self._sessions.get(thread_id) if thread_id else None
+        if session is not None and not session["lock"].locked() and (
+                session["slot"].draining or not self._healthy(session["slot"])):
+            await self._close_session(thread_id)
+            session = None
+        if session is not None:
+            owner = session["slot"].cdp_owner
+            if cdp and owner not in (None, self._session_key(thread_id)):
+                return None
+            return session["slot"], session["context"], session
+
+        for slot in self._slots:
+            if not self._healthy(slot):
+                await self._relaunch(slot, "unhealthy")
+            elif slot.draining and slot.active == 0:
+                await self._relaunch(slot, "recycle")
+        candidates = [s for s in self._slots if self._healthy(s) and not s.draining] or \
+                     [s for s in self._slots if self._healthy(s)]
+        if not candidates:
+            raise RuntimeError("사용 가능한 브라우저가 없습니다. (Chromium 기동 실패)")
+        if cdp:
+            candidates = [s for s in candidates if s.cdp_owner is None] or await self._free_cdp_slot(candidates)
+            if not candidates:
+                return None
+        slot = min(candidates, key=lambda s: s.active)
+
+        context = await slot.browser.new_context(**self.context_options)
+        context.on("page", lambda _page, slot=slot: setattr(slot, "pages", slot.pages + 1))
+        if thread_id:
+            session = {"slot": slot, "context": context, "lock": asyncio.Lock(), "state": {}, "last_used": now}
+            self._sessions[thread_id] = session
+        return slot, context, session
+
+    async def _free_cdp_slot(self, candidates: List[_Slot]) -> List[_Slot]:
+        """(self._lock 안에서) 쉬고 있는 세션 중 가장 오래된 것을 닫아 CDP 대여에 내줄 브라우저를 만듭니다."""
+        idle = [(tid, session) for tid, session in self._sessions.items()
+                if session["slot"] in candidates and not session["lock"].locked()
+                and session["slot"].cdp_owner == self._session_key(tid)]
+        if not idle:
+            return []
+        thread_id, session = min(idle, key=lambda item: item[1]["last_used"])
+        await self._close_session(thread_id)
+        return [session["slot"]]
+
+    @asynccontextmanager
+    async def lease(self, thread_id: Optional[str] = None, cdp: bool = False):
+        """
+        ``async with pool.lease() as lease:`` 로 context를 빌립니다.
+        세션 없는 대여의 context는 반납 시 닫히고, thread 세션 context는 풀에 남습니다.
+        ``cdp=True`` 면 Chromium 1개를 독점하는 대여가 될 때까지 기다립니다. (클래스 설명 참고)
+        """
+        if not self._started:
+            await self.start()
+        waited = time.perf_counter()
+        owner = None
+        async with self._capacity:
+            async with self._lock:
+                while True:
+                    picked = await self._acquire(thread_id, cdp)
+                    if picked is not None:
+                        break
+                    await self._cdp_released.wait()
+                slot, context, session = picked
+                slot.active += 1
+                if cdp:
+                    owner = self._session_key(thread_id) if session is not None else uuid.uuid4().hex
+                    slot.cdp_owner = owner
+            try:
+                if session is not None:
+                    await session["lock"].acquire()
+                BROWSER_POOL_WAIT.observe(time.perf_counter() - waited)
+                BROWSER_POOL_LEASES.inc()
+                pages_before = slot.pages
+                lease = BrowserLease(slot, context, thread_id, session["state"] if session else {})
+                self._leases[lease.lease_id] = lease
+                try:
+                    yield lease
+                finally:
+                    lease.released = True
+                    self._leases.pop(lease.lease_id, None)
+                    BROWSER_POOL_LEASES.dec()
+                    # CDP로 붙는 도구는 이 context 밖에서 페이지를 열므로 대여 1회를 최소 1페이지로 셉니다.
+                    if slot.pages == pages_before:
+                        slot.pages += 1
+                    if session is not None:
+                        session["last_used"] = time.time()
+                        session["lock"].release()
+            finally:
+                slot.active -= 1
+                if self.recycle_after_pages and slot.pages >= self.recycle_after_pages:
+                    slot.draining = True
+                if session is None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                if owner is not None:
+                    async with self._lock:
+                        if session is None and slot.cdp_owner == owner:
+                            slot.cdp_owner = None
+                        # 세션 대여는 반납 후 쉬는 세션이 되므로, 대기 중인 CDP 대여가 그 자리를 가져갈 수 있게 깨웁니다.
+                        self._cdp_released.notify_all()
+
+    async def shutdown(self):
+        async with self._lock:
+            for slot in self._slots:
+                await self._close_slot(slot)
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+            self._started = False
+
+    def kill(self):
+        """
+        이미 끝난 이벤트 루프에 묶여 ``shutdown`` 을 await할 수 없는 풀을 정리합니다.
+        Playwright 객체 대신 기동 시 기록한 PID로 Chromium 프로세스를 직접 종료합니다.
+        """
+        for slot in self._slots:
+            if slot.pid:
+                try:
+                    os.kill(slot.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                    print(f"[browser_pool] chromium #{slot.index} killed (pid={slot.pid})")
+                except OSError:
+                    pass
+            slot.browser, slot.pid, slot.cdp_owner = None, None, None
+        self._sessions.clear()
+        self._playwright = None
+        self._started = False
+
+    def stats(self) -> dict:
+        return {
+            "started": self._started,
+            "browsers": [
+                {"index": s.index, "healthy": self._healthy(s), "active": s.active, "pages": s.pages,
+                 "draining": s.draining, "uptime_seconds": round(time.time() - s.launched_at, 1) if s.launched_at else 0}
+                for s in self._slots
+            ],
+            "sessions": len(self._sessions),
+            "leases": [
+                {"lease_id": l.lease_id, "thread_id": l.thread_id, "browser": l.browser_index,
+                 "age_seconds": round(time.time() - l.started_at, 1)}
+                for l in list(self._leases.values())
+            ],
+        }
+
+    # --- 온디맨드 화면 피드 ---
+    def find_lease(self, key: str) -> Optional[BrowserLease]:
+        """lease_id 또는 thread_id로 진행 중인 대여를 찾습니다. (thread_id는 가장 최근 대여)"""
+        if key in self._leases:
+            return self._leases[key]
+        matches = [l for l in list(self._leases.values()) if l.thread_id == key]
+        return max(matches, key=lambda l: l.started_at) if matches else None
+
+    async def _watch_page(self, lease: BrowserLease):
+        """대여 context의 마지막 페이지. CDP로 붙는 도구(browser-use)는 context 밖에 페이지를 열므로 CDP로 따로 연결해 찾습니다."""
+        pages = [p for p in lease.context.pages if not p.is_closed()]
+        if pages:
+            return pages[-1], None
+        remote = await self._playwright.chromium.connect_over_cdp(lease.cdp_url)
+        pages = [p for c in remote.contexts for p in c.pages if not p.is_closed()]
+        if not pages:
+            await remote.close()
+            return None, None
+        return pages[-1], remote
+
+    async def watch(self, lease: BrowserLease, mode: str = "screencast", interval: float = 1.0,
+                    quality: int = 60) -> AsyncIterator[bytes]:
+        """
+        대여 중인 브라우저 화면을 JPEG 프레임으로 내보냅니다. 시청자가 있을 때만 CDP에 붙고, 끝나면 바로 해제합니다.
+
+        - ``screencast``: CDP ``Page.startScreencast`` (화면이 바뀔 때만 프레임 전송)
+        - ``screenshot``: ``interval`` 초마다 스크린샷 (매번 마지막 페이지를 다시 고르므로 새 탭도 따라감)
+        대여가 반납되면 피드도 끝납니다.
+        """
+        BROWSER_SCREENCAST_VIEWERS.inc(mode=mode)
+        remote = None
+        try:
+            if mode == "screenshot":
+                while not lease.released:
+                    page, remote = await self._watch_page(lease)
+                    if page is not None:
+                        try:
+                            yield await page.screenshot(type="jpeg", quality=quality)
+                        except Exception:
+                            pass
+                    if remote is not None:
+                        await remote.close()
+                        remote = None
+                    await asyncio.sleep(interval)
+                return
+
+            page, remote = await self._watch_page(lease)
+            if page is None:
+                return
+            frames: asyncio.Queue = asyncio.Queue(maxsize=2)
+            cdp = await page.context.new_cdp_session(page)
+
+            def _on_frame(params):
+                # 다음 프레임을 받으려면 ack가 필요합니다. 느린 시청자는 오래된 프레임을 버립니다.
+                asyncio.ensure_future(cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}))
+                if frames.full():
+                    frames.get_nowait()
+                frames.put_nowait(params["data"])
+
+            cdp.on("Page.screencastFrame", _on_frame)
+            viewport = self.context_options.get("viewport") or {"width": 1280, "height": 720}
+            await cdp.send("Page.startScreencast", {"format": "jpeg", "quality": quality,
+                                                    "maxWidth": viewport["width"], "maxHeight": viewport["height"]})
+            try:
+                while not lease.released and not page.is_closed():
+                    try:
+                        data = await asyncio.wait_for(frames.get(), timeout=interval)
+                    except asyncio.TimeoutError:
+                        continue
+                    yield base64.b64decode(data)
+            finally:
+                try:
+                    await cdp.send("Page.stopScreencast")
+                    await cdp.detach()
+                except Exception:
+                    pass
+        finally:
+            BROWSER_SCREENCAST_VIEWERS.dec(mode=mode)
+            if remote is not None:
+                try:
+                    await remote.close()
+                except Exception:
+                    pass
+
+
+# ==========================================
+# 2. 설정 기반 싱글톤
+# ==========================================
+_pool: Optional[BrowserPool] = None
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def browser_headless() -> bool:
+    """서버 기본값은 headless. noVNC 화면이 있는 개발 환경에서만 ``BROWSER_HEADLESS=0`` 으로 창을 띄웁니다."""
+    return _env_flag("BROWSER_HEADLESS", "1")
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    현재 이벤트 루프의 공용 브라우저 풀. (실행 중인 루프 안에서 호출해야 합니다.)
+
+    - ``BROWSER_POOL_SIZE``: 미리 띄울 Chromium 수 (기본 2)
+    - ``BROWSER_POOL_CONTEXTS_PER_BROWSER``: 브라우저당 동시 대여 context 수 (기본 4)
+    - ``BROWSER_POOL_RECYCLE_PAGES``: 이만큼 페이지를 연 브라우저는 새로 띄움. 0이면 끔 (기본 50)
+    - ``BROWSER_POOL_SESSION_IDLE_SECONDS``: thread 세션 유지 시간(초) (기본 600)
+    - ``BROWSER_HEADLESS``: 0이면 창을 띄움 (noVNC로 관찰할 때) (기본 1, 화면은 ``watch`` 피드로 확인)
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.loop is not loop:
+        # 노트북/스크립트에서 asyncio.run을 반복하면 루프가 바뀌므로 그 루프용 풀을 새로 만듭니다.
+        # 이전 풀의 Chromium 프로세스가 남지 않도록 먼저 정리합니다.
+        if _pool is not None:
+            _retire_pool(_pool)
+        _pool = BrowserPool(
+            size=int(os.environ.get("BROWSER_POOL_SIZE", "2")),
+            contexts_per_browser=int(os.environ.get("BROWSER_POOL_CONTEXTS_PER_BROWSER", "4")),
+            recycle_after_pages=int(os.environ.get("BROWSER_POOL_RECYCLE_PAGES", "50")),
+            session_idle_seconds=float(os.environ.get("BROWSER_POOL_SESSION_IDLE_SECONDS", "600")),
+            headless=browser_headless(),
+        )
+        _pool.loop = loop
+    return _pool
+
+
+def _retire_pool(pool: BrowserPool):
+    """다른 루프에 묶인 풀을 정리합니다. 그 루프가 아직 돌고 있으면 거기서 shutdown, 끝났으면 프로세스를 kill."""
+    old_loop = pool.loop
+    if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(pool.shutdown(), old_loop)
+    else:
+        pool.kill()
+
+
+async def shutdown_browser_pool():
+    if _pool is not None and _pool._started:
+        await _pool.shutdown()
@@ -0,0 +1,250 @@
+import os
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CHECKPOINT_DIR = os.path.join(BASE_DIR, "data", "checkpoints")
+
+
+def _thread_id(config) -> Optional[str]:
+    if not config:
+        return None
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
+# ==========================================
+# 1. 스레드 수 / TTL 기반 퇴출 정책
+# ==========================================
+class _ThreadEvictionPolicy:
+    """
+    thread_id별 마지막 접근 시각을 LRU 순서로 관리하고,
+    max_threads 초과 또는 ttl_seconds 경과 시 퇴출할 thread_id 목록을 계산합니다.
+    """
+
+    def __init__(self, max_threads: int, ttl_seconds: Optional[float]):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def touch(self, thread_id: Optional[str]) -> list:
+        """접근 시각을 갱신하고 퇴출 대상 thread_id 목록을 반환합니다."""
+        if thread_id is None:
+            return []
+        now = time.time()
+        with self._lock:
+            self._last_access[thread_id] = now
+            self._last_access.move_to_end(thread_id)
+
+            expired = []
+            if self.ttl_seconds:
+                for tid, last in self._last_access.items():
+                    if now - last < self.ttl_seconds:
+                        break
+                    expired.append(tid)
+            while len(self._last_access) - len(expired) > self.max_threads:
+                tid = next(t for t in self._last_access if t not in expired)
+                expired.append(tid)
+
+            for tid in expired:
+                del self._last_access[tid]
+            self.evicted += len(expired)
+            return expired
+
+    def forget(self, thread_id: str):
+        with self._lock:
+            self._last_access.pop(thread_id, None)
+
+    @property
+    def size(self) -> int:
+        return len(self._last_access)
+
+
+# ==========================================
+# 2. In-memory LRU/TTL Checkpointer
+# ==========================================
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver와 동일하게 동작하되, 보관하는 대화 스레드 수를 max_threads로 제한하고
+    ttl_seconds 동안 접근이 없는 스레드는 삭제하여 장시간 실행 시에도 메모리를 일정하게 유지합니다.
+    """
+
+    def __init__(self, max_threads: int = 1000, ttl_seconds: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.policy = _ThreadEvictionPolicy(max_threads, ttl_seconds)
+
+    def _touch(self, config):
+        for thread_id in self.policy.touch(_thread_id(config)):
+            super().delete_thread(thread_id)
+
+    def get_tuple(self, config):
+        result = super().get_tuple(config)
+        if result is not None:
+            self._touch(config)
+        return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._touch(config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self._touch(config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.policy.forget(str(thread_id))
+        super().delete_thread(thread_id)
+
+
+# ==========================================
+# 3. SQLite(WAL) Checkpointer
+# ==========================================
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:
+    # langgraph-checkpoint-sqlite가 설치되지 않은 경우 memory 모드만 사용 가능
+    SqliteSaver = None
+
+if SqliteSaver is not None:
+
+    class BoundedSqliteSaver(SqliteSaver):
+        """
+        SqliteSaver(WAL 모드)에 async 메서드와 스레드 수/TTL 퇴출을 추가한 Checkpointer입니다.
+
+        - 같은 DB 파일을 여러 uvicorn 워커 프로세스가 공유할 수 있습니다.
+        - async 메서드는 sync 메서드를 워커 스레드에서 실행합니다. (내부 Lock으로 직렬화)
+        - 스레드별 마지막 접근 시각은 ``thread_access`` 테이블에 기록하고, 퇴출 대상도 매번 이 공유 테이블에서 고릅니다.
+          (프로세스별 메모리 스냅샷을 쓰면 다른 워커가 방금 사용한 스레드를 지울 수 있음)
+        """
+
+        def __init__(self, path: str, max_threads: int = 10000, ttl_seconds: Optional[float] = None, **kwargs):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS thread_access ("
+                "thread_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_thread_access_last ON thread_access (last_access)")
+            conn.commit()
+            super().__init__(conn, **kwargs)
+            self.path = path
+            self.max_threads = max_threads
+            self.ttl_seconds = ttl_seconds
+            self.evicted = 0
+
+        def _touch(self, config):
+            thread_id = _thread_id(config)
+            if thread_id is None:
+                return
+            now = time.time()
+            with self.cursor() as cur:
+                cur.execute(
+                    "INSERT OR REPLACE INTO thread_access (thread_id, last_access) VALUES (?, ?)",
+                    (thread_id, now),
+                )
+                # 퇴출 대상: TTL이 지난 스레드 + 최대 개수를 넘는 만큼 가장 오래 쓰지 않은 스레드
+                cutoff = now - self.ttl_seconds if self.ttl_seconds else 0
+                expired = cur.execute(
+                    "SELECT thread_id, last_access FROM thread_access WHERE last_access < ? AND thread_id != ?",
+                    (cutoff, thread_id),
+                ).fetchall()
+                total = cur.execute("SELECT COUNT(*) FROM thread_access").fetchone()[0]
+                overflow = total - len(expired) - self.max_threads
+                if overflow > 0:
+                    expired += cur.execute(
+                        "SELECT thread_id, last_access FROM thread_access WHERE last_access >= ? AND thread_id != ? "
+                        "ORDER BY last_access LIMIT ?",
+                        (cutoff, thread_id, overflow),
+                    ).fetchall()
+            for expired_id, last_access in expired:
+                self._evict(expired_id, last_access)
+
+        def _evict(self, thread_id: str, last_access: float):
+            # 조회 이후 다른 워커가 그 스레드를 다시 사용했다면(last_access 변경) 지우지 않습니다.
+            with self.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM thread_access WHERE thread_id = ? AND last_access = ?", (thread_id, last_access)
+                )
+                claimed = cur.rowcount == 1
+            if claimed:
+                super().delete_thread(thread_id)
+                self.evicted += 1
+
+        def get_tuple(self, config):
+            result = super().get_tuple(config)
+            if result is not None:
+                self._touch(config)
+            return result
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            self._touch(config)
+            return super().put(config, checkpoint, metadata, new_versions)
+
+        def put_writes(self, config, writes, task_id, task_path=""):
+            self._touch(config)
+            return super().put_writes(config, writes, task_id, task_path)
+
+        def delete_thread(self, thread_id: str) -> None:
+            super().delete_thread(thread_id)
+            with self.cursor() as cur:
+                cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (str(thread_id),))
+
+        # --- async 버전: 이벤트 루프를 막지 않도록 워커 스레드에서 실행 ---
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[Any]:
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes: Sequence, task_id: str, task_path: str = ""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id: str) -> None:
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+# ==========================================
+# 4. 설정 기반 Checkpointer Factory
+# ==========================================
+def create_checkpointer(agent_name: str):
+    """
+    환경 변수 설정에 따라 에이전트별 Checkpointer를 생성합니다.
+
+    - ``CHECKPOINTER_BACKEND``: ``memory`` (기본, LRU/TTL 제한) 또는 ``sqlite``
+    - ``CHECKPOINTER_MAX_THREADS``: 보관할 최대 대화 스레드 수 (기본 1000)
+    - ``CHECKPOINTER_TTL_SECONDS``: 마지막 접근 후 보관 시간(초). 0이면 무제한 (기본 86400)
+    - ``CHECKPOINTER_DIR``: sqlite 모드의 DB 파일 디렉토리 (기본 ``data/checkpoints``)
+
+    에이전트마다 별도의 저장소를 사용하므로 같은 thread_id를 여러 에이전트가 써도 상태가 섞이지 않습니다.
+    """
+    backend = os.environ.get("CHECKPOINTER_BACKEND", "memory").strip().lower()
+    max_threads = int(os.environ.get("CHECKPOINTER_MAX_THREADS", "1000"))
+    ttl_seconds = float(os.environ.get("CHECKPOINTER_TTL_SECONDS", "86400")) or None
+
+    if backend == "sqlite":
+        if SqliteSaver is None:
+            raise ImportError("CHECKPOINTER_BACKEND=sqlite requires 'langgraph-checkpoint-sqlite'.")
+        checkpoint_dir = os.environ.get("CHECKPOINTER_DIR", DEFAULT_CHECKPOINT_DIR)
+        path = os.path.join(checkpoint_dir, f"{agent_name}.sqlite")
+        print(f"[checkpointer] {agent_name}: sqlite ({path})")
+        return BoundedSqliteSaver(path, max_threads=max_threads, ttl_seconds=ttl_seconds)
+
+    return BoundedMemorySaver(max_threads=max_threads, ttl_seconds=ttl_seconds)
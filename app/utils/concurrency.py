@@ -0,0 +1,155 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    동시 실행 슬롯과 대기열이 모두 가득 차서 요청을 받을 수 없을 때 발생합니다.
+    status_code(429/503)와 Retry-After 초를 함께 전달합니다.
+    """
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AgentLimiter:
+    """
+    에이전트 1개에 대한 동시 실행 슬롯 + 유한 대기열 (Admission Control)
+
+    - 실행 중인 요청이 max_concurrency 미만이면 즉시 슬롯을 받습니다.
+    - 그렇지 않으면 최대 max_queue 개까지 대기열에서 기다립니다.
+    - 대기열이 가득 차면 즉시 429, queue_timeout 동안 슬롯을 얻지 못하면 503으로 거절합니다.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float = 30.0):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.completed = 0
+
+    def _retry_after(self) -> int:
+        # 평균 실행 시간 × (대기열 앞에 선 요청 수 / 슬롯 수) 로 대략적인 재시도 시점을 계산합니다.
+        avg_run = self.total_run_seconds / self.completed if self.completed else 1.0
+        waves = (self.queued + 1) / self.max_concurrency
+        return max(1, math.ceil(avg_run * waves))
+
+    async def acquire(self) -> float:
+        """슬롯을 획득하고 대기한 시간(초)을 반환합니다. 획득 불가 시 AdmissionRejected."""
+        # queued는 await 전에 바로 올라가므로, 같은 이벤트 루프 턴에 몰린 요청도 이 합계로 막힙니다.
+        if self.in_flight + self.queued >= self.max_concurrency + self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(
+                429, self._retry_after(),
+                f"'{self.name}' queue is full ({self.in_flight} running, {self.queued} queued)",
+            )
+
+        start = time.perf_counter()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(
+                503, self._retry_after(),
+                f"'{self.name}' did not get a slot within {self.queue_timeout:.0f}s",
+            )
+        finally:
+            self.queued -= 1
+
+        waited = time.perf_counter() - start
+        self.in_flight += 1
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    async def acquire_waiting(self) -> float:
+        """
+        거절 대신 슬롯이 날 때까지 기다리는 acquire. 반환값은 재시도를 포함한 전체 대기 시간(초)입니다.
+        배치/비동기 작업처럼 처리량이 목적이고 즉시 거절할 필요가 없는 내부 실행에 사용합니다.
+        """
+        start = time.perf_counter()
+        while True:
+            try:
+                await self.acquire()
+                return time.perf_counter() - start
+            except AdmissionRejected as e:
+                await asyncio.sleep(e.retry_after)
+
+    def release(self, run_seconds: Optional[float] = None):
+        self.in_flight -= 1
+        if run_seconds is not None:
+            self.total_run_seconds += run_seconds
+            self.completed += 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """``async with limiter.slot() as waited:`` 형태로 슬롯을 점유합니다."""
+        waited = await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+            "avg_run_seconds": round(self.total_run_seconds / self.completed, 4) if self.completed else None,
+        }
+
+
+def parse_agent_limits(env_value: Optional[str], defaults: Dict[str, int]) -> Dict[str, int]:
+    """
+    ``"navigator=2,supervisor=1,*=8"`` 형식의 문자열을 에이전트별 값으로 변환합니다.
+    ``*`` 는 명시되지 않은 모든 에이전트에 적용되며, 값이 없으면 defaults를 사용합니다.
+    """
+    limits = dict(defaults)
+    if not env_value:
+        return limits
+
+    wildcard = None
+    explicit = {}
+    for item in env_value.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        name, value = name.strip(), value.strip()
+        if not value.isdigit():
+            continue
+        if name == "*":
+            wildcard = int(value)
+        else:
+            explicit[name] = int(value)
+
+    if wildcard is not None:
+        limits = {name: wildcard for name in limits}
+    limits.update(explicit)
+    return limits
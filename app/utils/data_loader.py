@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from app.utils.model_utils import create_chat_model
+from app.utils.offline import HashEmbeddings, offline_tools_enabled
 from langchain_classic.retrievers.self_query.base import SelfQueryRetriever
 from langchain_classic.chains.query_constructor.schema import AttributeInfo
 
@@ -17,6 +18,8 @@ load_dotenv(override=True)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 CHROMA_DB_DIR = os.path.join(DATA_DIR, "chroma_db")
+# 오프라인(해시 임베딩) 벡터가 실제 임베딩 DB에 섞이지 않도록 별도 디렉토리를 사용합니다.
+OFFLINE_CHROMA_DB_DIR = os.path.join(DATA_DIR, "chroma_db_offline")
 PDF_SOURCE_DIR = os.path.join(DATA_DIR, "bok_major_industry_reports")
 
 # 전역 변수로 Retriever 관리 (Lazy Loading)
@@ -27,6 +30,8 @@ _retrievers = {
 }
 
 def _get_embedding_model():
+    if offline_tools_enabled():
+        return HashEmbeddings()
     return OpenAIEmbeddings(model="text-embedding-3-large")
 
 def _initialize_vectorstore(collection_name: str) -> Chroma:
@@ -35,14 +40,15 @@ def _initialize_vectorstore(collection_name: str) -> Chroma:
     (실습 환경에서는 이미 생성되었다고 가정하거나, 없으면 로드 시도)
     """
     embedding_model = _get_embedding_model()
+    db_dir = OFFLINE_CHROMA_DB_DIR if offline_tools_enabled() else CHROMA_DB_DIR
     
     # DB 디렉토리가 없으면 생성 (폴더만)
-    if not os.path.exists(CHROMA_DB_DIR):
-        os.makedirs(CHROMA_DB_DIR, exist_ok=True)
+    if not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
 
     print(f"📂 [DataLoader] Loading VectorStore: {collection_name}")
     vectorstore = Chroma(
-        persist_directory=CHROMA_DB_DIR,
+        persist_directory=db_dir,
         embedding_function=embedding_model,
         collection_name=collection_name
     )
@@ -77,7 +83,7 @@ def _create_self_query_retriever(collection_name: str):
     document_content_description = "Bank of Korea Industry Reports"
     
     # Self-Query를 위한 LLM (구조화된 쿼리 생성용)
-    llm = create_chat_model(temperature=0).with_config({"tags": ["exclude_from_stream"]})
+    llm = create_chat_model(temperature=0, cache=True).with_config({"tags": ["exclude_from_stream"]})
     
     retriever = SelfQueryRetriever.from_llm(
         llm,
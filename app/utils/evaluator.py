@@ -2,6 +2,9 @@ import json
 import pandas as pd
 from datasets import Dataset
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from app.utils.llm_cache import get_llm_cache
+from app.utils.model_utils import get_model
+from app.utils.offline import HashEmbeddings, offline_model, offline_tools_enabled
 
 # RAGAS Imports
 from ragas import evaluate as ragas_evaluate
@@ -104,9 +107,15 @@ async def run_ragas_evaluation(
     ragas_dataset = Dataset.from_dict(data_dict)
     
     # 4. 평가 모델 설정
-    judge_llm = JSONCleanLLM(model="gpt-4o", temperature=0)
-    creative_llm = JSONCleanLLM(model="gpt-4o", temperature=0.7)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    # temperature=0 판정 호출은 LLM_CACHE=1일 때 디스크 캐시를 사용합니다. (같은 데이터셋 재평가 시)
+    if offline_model():
+        # 오프라인 부하 테스트: 판정도 Fake 모델로 수행합니다.
+        # (점수가 의미 있으려면 FAKE_LLM_SCRIPT로 RAGAS 형식의 JSON 응답을 지정해야 함)
+        judge_llm = creative_llm = get_model(offline_model())
+    else:
+        judge_llm = JSONCleanLLM(model="gpt-4o", temperature=0, cache=get_llm_cache())
+        creative_llm = JSONCleanLLM(model="gpt-4o", temperature=0.7)
+    embeddings = HashEmbeddings() if offline_tools_enabled() else OpenAIEmbeddings(model="text-embedding-3-large")
     
     metrics = [
         Faithfulness(llm=judge_llm),
@@ -0,0 +1,175 @@
+import os
+import re
+from typing import Tuple
+
+from app.utils.metrics import metrics
+
+HTML_CONDENSE_RATIO = metrics.histogram(
+    "html_condense_ratio",
+    "Original / condensed size of HTML sent to the selector analysis LLM.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+# 셀렉터 분석에 쓸모없는 태그 (내용째 삭제)
+DROP_TAGS = ("script", "style", "noscript", "svg", "path", "header", "footer",
+             "iframe", "template", "link", "meta", "canvas", "picture", "source")
+# 셀렉터/필드 추출에 쓰이는 속성만 남깁니다.
+KEEP_ATTRS = ("id", "class", "href", "src", "name", "type", "role", "aria-label", "title",
+              "datetime", "itemprop", "data-id", "data-testid")
+# 내용이 없어도 남길 태그
+KEEP_EMPTY_TAGS = ("img", "input", "button", "select", "textarea", "time")
+
+# 빌드마다 바뀌는 CSS-in-JS/프레임워크 생성 class/id (셀렉터로 쓰면 곧 깨짐)
+UNSTABLE_CLASS_RE = re.compile(r"^((css|sc|jsx|svelte|emotion|styled)-[\w-]*|_[a-zA-Z0-9]*\d[a-zA-Z0-9]*)$")
+UNSTABLE_ID_RE = re.compile(r"^(ember\d+|react-[\w-]*\d[\w-]*|radix-[\w:-]*|headlessui-[\w-]*|mui-\d+|:r[0-9a-z]+:)$")
+
+# 예산을 넘으면 단계적으로 더 강하게 줄입니다: (형제 대표 수, 텍스트 최대 길이, URL 최대 길이)
+LEVELS = ((2, 80, 120), (1, 40, 60), (1, 20, 30), (1, 10, 0))
+
+
+# ==========================================
+# 1. 토큰 추정
+# ==========================================
+_encoder = None
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken(cl100k)을 쓸 수 있으면 그 기준, 없으면(미설치/인코딩 파일 다운로드 불가) 글자 수 / 3 으로 대략 계산합니다."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+    if _encoder is False:
+        return len(text) // 3
+    return len(_encoder.encode(text, disallowed_special=()))
+
+
+# ==========================================
+# 2. 축약 규칙 (반복 형제 접기, 속성/텍스트 정리)
+# ==========================================
+def _signature(tag) -> str:
+    return tag.name + "".join(f".{c}" for c in sorted(tag.get("class") or []))
+
+
+def _clean_attrs(tag, max_url: int):
+    attrs = {}
+    for name in KEEP_ATTRS:
+        value = tag.attrs.get(name)
+        if value is None:
+            continue
+        if name == "class":
+            value = [c for c in value if not UNSTABLE_CLASS_RE.match(c)]
+            if not value:
+                continue
+        elif name == "id" and UNSTABLE_ID_RE.match(value):
+            continue
+        elif name in ("href", "src"):
+            if not max_url:
+                continue
+            value = value if len(value) <= max_url else value[:max_url] + "…"
+        attrs[name] = value
+    tag.attrs = attrs
+
+
+def _condense(soup, max_repeats: int, max_text: int, max_url: int) -> int:
+    """soup를 제자리에서 축약하고, 접힌 형제 그룹 수를 반환합니다."""
+    from bs4 import Comment, NavigableString, Tag
+
+    for node in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        node.extract()
+    for tag in soup.find_all(DROP_TAGS):
+        tag.decompose()
+    if soup.head is not None:
+        title = soup.head.title
+        soup.head.clear()
+        if title is not None:
+            soup.head.append(title)
+
+    collapsed = 0
+    # 위에서 아래로: 반복되는 형제는 대표 몇 개만 남기고, 남은 자식만 계속 내려갑니다.
+    stack = [soup]
+    while stack:
+        parent = stack.pop()
+        children = [c for c in parent.children if isinstance(c, Tag)]
+        seen = {}
+        for child in children:
+            sig = _signature(child)
+            seen[sig] = seen.get(sig, 0) + 1
+            if seen[sig] > max_repeats:
+                child.decompose()
+        for sig, count in seen.items():
+            if count > max_repeats:
+                collapsed += 1
+                # 마지막 대표 뒤에 "같은 구조가 N개 더 있음" 표시를 남깁니다.
+                kept = [c for c in parent.children if isinstance(c, Tag) and _signature(c) == sig]
+                kept[-1].insert_after(NavigableString(f" [×{count - max_repeats} more {sig}] "))
+        for child in parent.children:
+            if isinstance(child, Tag):
+                _clean_attrs(child, max_url)
+                stack.append(child)
+
+    for text in soup.find_all(string=True):
+        if isinstance(text, NavigableString) and not isinstance(text, Comment):
+            value = " ".join(text.split())
+            if len(value) > max_text and not value.startswith("[×"):
+                value = value[:max_text] + "…"
+            if value != text:
+                text.replace_with(value)
+
+    # 내용도, 쓸 만한 속성도 없는 빈 요소 제거 (안쪽부터)
+    for tag in reversed(soup.find_all(True)):
+        if tag.name in KEEP_EMPTY_TAGS or tag.get("id") or tag.get("href"):
+            continue
+        if not tag.get_text(strip=True) and not tag.find(KEEP_EMPTY_TAGS):
+            tag.decompose()
+    return collapsed
+
+
+# ==========================================
+# 3. 토큰 예산에 맞춘 단계적 축약
+# ==========================================
+def condense_html(html: str, max_tokens: int = 6000) -> Tuple[str, dict]:
+    """
+    LLM 셀렉터 분석용으로 HTML을 축약합니다. 반환값: (축약 HTML, 리포트)
+
+    - 같은 tag+class 형제(목록 항목, 카드 등)는 대표 1~2개와 ``[×N more li.item]`` 표시로 접습니다.
+    - 긴 텍스트/URL은 자르고, 셀렉터와 무관한 속성과 빌드마다 바뀌는 class/id는 지웁니다.
+    - 들여쓰기 없이 직렬화하며, ``max_tokens`` 를 넘으면 더 강한 단계로 다시 줄이고 마지막에는 잘라냅니다.
+    리포트: original_chars, condensed_chars, ratio, original_tokens, condensed_tokens, collapsed_groups, level
+    """
+    from bs4 import BeautifulSoup
+
+    html = html or ""
+    original_tokens = estimate_tokens(html)
+    for level, (max_repeats, max_text, max_url) in enumerate(LEVELS):
+        soup = BeautifulSoup(html, "html.parser")
+        collapsed = _condense(soup, max_repeats, max_text, max_url)
+        body = soup.body or soup
+        condensed = re.sub(r">\s+<", "><", str(body)).strip()
+        tokens = estimate_tokens(condensed)
+        if tokens <= max_tokens:
+            break
+    else:
+        # 가장 강한 단계로도 넘치면 예산에 맞춰 자릅니다. (토큰 비율로 글자 수 환산)
+        condensed = condensed[:int(len(condensed) * max_tokens / tokens)] + "<!-- truncated -->"
+        tokens = estimate_tokens(condensed)
+
+    ratio = len(html) / max(len(condensed), 1)
+    HTML_CONDENSE_RATIO.observe(ratio)
+    return condensed, {
+        "original_chars": len(html),
+        "condensed_chars": len(condensed),
+        "ratio": round(ratio, 1),
+        "original_tokens": original_tokens,
+        "condensed_tokens": tokens,
+        "collapsed_groups": collapsed,
+        "level": level,
+    }
+
+
+def default_max_tokens() -> int:
+    """``HTML_CONDENSE_MAX_TOKENS`` (기본 6000)"""
+    return int(os.environ.get("HTML_CONDENSE_MAX_TOKENS", "6000"))
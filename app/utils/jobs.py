@@ -0,0 +1,274 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("LLMOps_Server")
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_JOB_DB_PATH = os.path.join(BASE_DIR, "data", "jobs.sqlite")
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"  # 서버 재시작 등으로 실행 도중 중단됨
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED, INTERRUPTED)
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업 수가 max_pending에 도달하여 새 작업을 받을 수 없을 때 발생합니다."""
+
+
+# ==========================================
+# 1. 작업 상태 저장소 (SQLite)
+# ==========================================
+class JobStore:
+    """
+    작업(Job)의 상태, 진행 상황, 결과를 로컬 SQLite 파일에 저장합니다.
+    서버가 재시작되어도 완료된 작업의 결과를 조회할 수 있습니다.
+
+    여러 워커 프로세스가 같은 파일을 공유할 수 있도록 작업마다 실행 중인 워커(owner)를 기록하고,
+    워커는 ``job_owners`` 테이블에 주기적으로 heartbeat를 남깁니다. 중단 처리는 heartbeat가 끊긴 워커의 작업에만 적용됩니다.
+    """
+
+    _COLUMNS = (
+        "job_id", "agent", "status", "message", "thread_id", "progress", "result", "error",
+        "cancel_requested", "created_at", "started_at", "finished_at", "owner",
+    )
+
+    def __init__(self, path: str = DEFAULT_JOB_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                agent TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT NOT NULL,
+                thread_id TEXT,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT
+            )
+            """
+        )
+        # owner 컬럼이 없던 이전 버전의 DB 파일 대응
+        if "owner" not in {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_owners (owner TEXT PRIMARY KEY, heartbeat REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _row_to_dict(self, row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else {}
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, agent: str, message: str, thread_id: Optional[str] = None, owner: Optional[str] = None) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, agent, status, message, thread_id, progress, created_at, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, agent, QUEUED, message, thread_id, json.dumps({}), time.time(), owner),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields):
+        if "progress" in fields:
+            fields["progress"] = json.dumps(fields["progress"], ensure_ascii=False)
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> list:
+        query = f"SELECT {', '.join(self._COLUMNS)} FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def heartbeat(self, owner: str):
+        """owner 워커가 살아 있음을 기록합니다."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_owners (owner, heartbeat) VALUES (?, ?)", (owner, time.time())
+            )
+            self._conn.commit()
+
+    def remove_owner(self, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM job_owners WHERE owner = ?", (owner,))
+            self._conn.commit()
+
+    def mark_interrupted(self, owner_timeout: float) -> int:
+        """
+        heartbeat가 owner_timeout초 넘게 끊긴(또는 owner가 없는) 워커의 실행/대기 작업을 interrupted로 표시합니다.
+        살아 있는 다른 워커 프로세스의 작업은 건드리지 않습니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM job_owners WHERE heartbeat < ?", (now - owner_timeout,))
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?) "
+                "AND (owner IS NULL OR owner NOT IN (SELECT owner FROM job_owners))",
+                (INTERRUPTED, "The server worker running this job stopped before it finished.", now, QUEUED, RUNNING),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+
+# ==========================================
+# 2. 작업 실행 관리자 (Bounded Worker Pool)
+# ==========================================
+JobRunner = Callable[[dict, Callable[[dict], None]], Awaitable[str]]
+
+
+class JobManager:
+    """
+    제출된 작업을 최대 max_workers 개까지 동시에 실행하는 로컬 워커 풀입니다.
+
+    runner는 ``async def runner(job, report_progress) -> str`` 형태이며,
+    report_progress(dict)로 넘긴 진행 상황은 저장소에 기록됩니다.
+    다른 워커 프로세스에서 요청된 취소도 진행 상황을 기록할 때 감지하여 반영합니다.
+
+    ``start()`` 후에는 heartbeat_interval초마다 heartbeat를 남기고, heartbeat가 3회 이상 끊긴
+    다른 워커(비정상 종료)의 작업을 interrupted로 정리합니다.
+    """
+
+    def __init__(self, store: JobStore, runner: JobRunner, max_workers: int = 2, max_pending: int = 100,
+                 heartbeat_interval: float = 10.0):
+        self.store = store
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.heartbeat_interval = heartbeat_interval
+        # 호스트 + pid + 기동마다 다른 값 (pid 재사용과 구분)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.running = 0
+
+    def recover(self) -> int:
+        """heartbeat가 끊긴 워커의 미완료 작업을 interrupted로 표시하고 그 수를 반환합니다."""
+        self.store.heartbeat(self.owner)
+        return self.store.mark_interrupted(owner_timeout=self.heartbeat_interval * 3)
+
+    async def start(self) -> int:
+        """heartbeat를 시작하고, 기동 시점에 정리한 작업 수를 반환합니다."""
+        count = self.recover()
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        return count
+
+    async def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        self.store.remove_owner(self.owner)
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                count = self.recover()
+                if count:
+                    logger.warning(f"Marked {count} job(s) of stopped workers as interrupted")
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {e}")
+
+    async def submit(self, agent: str, message: str, thread_id: Optional[str] = None) -> dict:
+        if len(self._tasks) >= self.max_workers + self.max_pending:
+            raise JobQueueFull(f"{len(self._tasks)} jobs already queued or running")
+        job = self.store.create(agent, message, thread_id, owner=self.owner)
+        task = asyncio.create_task(self._execute(job))
+        self._tasks[job["job_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["job_id"], None))
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        self.store.update(job_id, cancel_requested=1)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return self.store.get(job_id)
+
+    async def _execute(self, job: dict):
+        job_id = job["job_id"]
+        task = asyncio.current_task()
+
+        def report_progress(progress: dict):
+            self.store.update(job_id, progress=progress)
+            current = self.store.get(job_id)
+            if current and current["cancel_requested"]:
+                task.cancel()
+
+        try:
+            async with self._semaphore:
+                if self.store.get(job_id)["cancel_requested"]:
+                    raise asyncio.CancelledError()
+                self.store.update(job_id, status=RUNNING, started_at=time.time())
+                self.running += 1
+                try:
+                    result = await self.runner(job, report_progress)
+                finally:
+                    self.running -= 1
+            self.store.update(job_id, status=SUCCEEDED, result=result, finished_at=time.time())
+        except asyncio.CancelledError:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+            logger.info(f"Job {job_id} cancelled")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "running": self.running,
+            "queued": len(self._tasks) - self.running,
+        }
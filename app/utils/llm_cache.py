@@ -0,0 +1,158 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import warnings
+from typing import Optional
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from app.utils.metrics import metrics
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LLM_CACHE_PATH = os.path.join(BASE_DIR, "data", "llm_cache.sqlite")
+
+LLM_CACHE_REQUESTS = metrics.counter(
+    "llm_cache_requests_total",
+    "LLM response cache lookups by result (hit, miss, expired).",
+    ("result",),
+)
+
+
+# ==========================================
+# 1. SQLite 기반 LLM 응답 캐시 (크기 제한 + TTL)
+# ==========================================
+class PersistentLLMCache(BaseCache):
+    """
+    LangChain BaseCache 구현. 모델/파라미터(llm_string)와 메시지(prompt)의 해시를 키로
+    응답(Generation 목록)을 SQLite 파일에 저장합니다.
+
+    - ttl_seconds가 지난 항목은 조회 시 삭제하고 miss로 처리합니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 조회되지 않은 항목부터 삭제합니다. (LRU)
+    - 같은 파일을 여러 워커 프로세스가 공유할 수 있도록 WAL 모드를 사용합니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_LLM_CACHE_PATH, max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                LLM_CACHE_REQUESTS.inc(result="expired")
+                row = None
+            if row is None:
+                self.misses += 1
+                LLM_CACHE_REQUESTS.inc(result="miss")
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        self.hits += 1
+        LLM_CACHE_REQUESTS.inc(result="hit")
+        with warnings.catch_warnings():
+            # langchain_core.load.loads는 beta 경고를 매 호출마다 출력합니다.
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = dumps(return_val)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self._key(prompt, llm_string), value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 크기 합이 max_bytes의 90% 이하가 될 때까지 LRU 순으로 삭제 (매 삽입마다 정리하지 않도록 여유를 둠)
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+# ==========================================
+# 2. 설정 기반 싱글톤
+# ==========================================
+_llm_cache: Optional[PersistentLLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[PersistentLLMCache]:
+    """
+    ``LLM_CACHE=1`` 일 때만 프로세스 공용 캐시를 반환합니다. (기본: 꺼짐 -> None)
+
+    - ``LLM_CACHE_PATH``: SQLite 파일 경로 (기본 ``data/llm_cache.sqlite``)
+    - ``LLM_CACHE_MAX_MB``: 최대 크기(MB). 넘으면 오래 안 쓴 항목부터 삭제 (기본 512)
+    - ``LLM_CACHE_TTL_SECONDS``: 항목 유효 시간(초). 0이면 무제한 (기본 604800 = 7일)
+    """
+    global _llm_cache
+    if os.environ.get("LLM_CACHE", "").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = PersistentLLMCache(
+                    path=os.environ.get("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH),
+                    max_bytes=int(float(os.environ.get("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024),
+                    ttl_seconds=float(os.environ.get("LLM_CACHE_TTL_SECONDS", "604800")) or None,
+                )
+                print(f"[llm_cache] enabled: {_llm_cache.path}")
+    return _llm_cache
@@ -0,0 +1,248 @@
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+# ==========================================
+# Prometheus 텍스트 포맷 호환 메트릭 (외부 의존성 없음)
+# ==========================================
+class Counter:
+    """단조 증가 카운터. 라벨 조합별로 값을 따로 누적합니다."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{value}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """증감 가능한 현재 값. (예: 실행 중인 요청 수)"""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+# 에이전트 실행은 수 초~수 분이 걸리므로 기본 버킷을 길게 잡습니다.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Histogram(Counter):
+    """누적 버킷 히스토그램. observe()는 버킷 탐색(bisect) 1회와 덧셈만 수행합니다."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [버킷별 개수(마지막은 +Inf), 합계, 개수]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """이름으로 메트릭을 등록/조회하고 전체를 Prometheus 텍스트로 출력합니다."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames: Tuple[str, ...], **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# --- 공용 메트릭 정의 ---
+RUNS_CANCELLED = metrics.counter(
+    "agent_runs_cancelled_total",
+    "Agent runs cancelled before completion.",
+    ("agent", "reason"),
+)
+TOOL_CANCELLATIONS = metrics.counter(
+    "tool_cancellations_total",
+    "Tool executions interrupted by cancellation (resources released early).",
+    ("tool",),
+)
+AGENT_REQUESTS = metrics.counter(
+    "agent_requests_total",
+    "Agent requests by endpoint and outcome (ok, error, cancelled).",
+    ("agent", "endpoint", "status"),
+)
+AGENT_IN_FLIGHT = metrics.gauge(
+    "agent_requests_in_flight",
+    "Agent requests currently running (after admission).",
+    ("agent", "endpoint"),
+)
+AGENT_LATENCY = metrics.histogram(
+    "agent_request_duration_seconds",
+    "Total agent run time per request (excluding queue wait).",
+    ("agent", "endpoint"),
+)
+AGENT_QUEUE_WAIT = metrics.histogram(
+    "agent_queue_wait_seconds",
+    "Time spent waiting for a concurrency slot.",
+    ("agent",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+AGENT_TTFT = metrics.histogram(
+    "agent_time_to_first_token_seconds",
+    "Time from run start to the first streamed token.",
+    ("agent",),
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120),
+)
+TOOL_DURATION = metrics.histogram(
+    "tool_duration_seconds",
+    "Tool execution time (browse_web, execute_python_code, get_page_structure, ...).",
+    ("agent", "tool"),
+)
+TOOL_ERRORS = metrics.counter(
+    "tool_errors_total",
+    "Tool executions that raised an error.",
+    ("agent", "tool"),
+)
+
+
+# ==========================================
+# 에이전트 실행 / 도구 계측 Hook
+# ==========================================
+@contextmanager
+def track_run(agent: str, endpoint: str):
+    """
+    에이전트 실행 1건의 in-flight 수, 소요 시간, 결과를 기록합니다.
+    yield된 dict의 "status"를 바꾸면 예외 없이 끝난 실행도 error로 기록할 수 있습니다.
+    """
+    AGENT_IN_FLIGHT.inc(agent=agent, endpoint=endpoint)
+    started = time.perf_counter()
+    outcome = {"status": "ok"}
+    try:
+        yield outcome
+    except BaseException as e:
+        # CancelledError/GeneratorExit는 클라이언트 이탈 등으로 실행이 중단된 경우입니다.
+        outcome["status"] = "error" if isinstance(e, Exception) else "cancelled"
+        raise
+    finally:
+        AGENT_IN_FLIGHT.dec(agent=agent, endpoint=endpoint)
+        AGENT_LATENCY.observe(time.perf_counter() - started, agent=agent, endpoint=endpoint)
+        AGENT_REQUESTS.inc(agent=agent, endpoint=endpoint, status=outcome["status"])
+
+
+class ToolMetricsCallback(BaseCallbackHandler):
+    """
+    실행 config의 callbacks에 넣어 도구별 소요 시간과 에러 수를 기록합니다.
+    invoke / astream_events 어느 쪽으로 실행해도 동일하게 동작합니다.
+    """
+
+    # 이벤트 루프에서 바로 실행 (executor로 넘기지 않음)
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._started: Dict[str, Tuple[str, float]] = {}
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._started[str(run_id)] = (name, time.perf_counter())
+
+    def _finish(self, run_id, error: bool):
+        started = self._started.pop(str(run_id), None)
+        if started is None:
+            return
+        name, start = started
+        TOOL_DURATION.observe(time.perf_counter() - start, agent=self.agent, tool=name)
+        if error:
+            TOOL_ERRORS.inc(agent=self.agent, tool=name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id, error=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        # 취소는 에러가 아니라 TOOL_CANCELLATIONS로 따로 집계합니다.
+        self._finish(run_id, error=not isinstance(error, asyncio.CancelledError))
@@ -0,0 +1,337 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    CallbackManager,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.utils.metrics import metrics
+
+# 하위 모델 호출은 라우터 실행의 자식으로 추적하되, 토큰 이벤트는 라우터가 한 번만 내보내도록
+# 서버 스트림에서 제외합니다. (server.py의 exclude_from_stream 규칙)
+INNER_TAGS = ["exclude_from_stream"]
+
+ROUTE_CALLS = metrics.counter(
+    "llm_route_calls_total",
+    "LLM calls per provider/model route by outcome (ok, error, timeout).",
+    ("route", "outcome"),
+)
+ROUTE_LATENCY = metrics.histogram(
+    "llm_route_latency_seconds",
+    "Time to first response (first chunk when streaming) per route.",
+    ("route",),
+)
+ROUTE_HEDGES = metrics.counter(
+    "llm_route_hedges_total",
+    "Hedged requests started on a backup route because the current one was slow.",
+    ("route",),
+)
+ROUTE_CIRCUIT_OPEN = metrics.gauge(
+    "llm_route_circuit_open",
+    "1 while the route's circuit breaker is open.",
+    ("route",),
+)
+
+
+# ==========================================
+# 1. 경로(provider/model)별 상태: Rolling 지연/에러율 + Circuit Breaker
+# ==========================================
+class RouteHealth:
+    """
+    경로 1개의 최근 window 개 호출 결과를 기록하고 Circuit Breaker 상태를 관리합니다.
+
+    - 연속 실패가 failure_threshold 회 이상이거나, 최근 에러율이 max_error_rate 이상이면 열림(open)
+    - 열린 뒤 cooldown 초가 지나면 시험 호출을 허용(half-open)하고, 성공하면 닫힘(closed)
+    """
+
+    def __init__(self, name: str, window: int = 50, failure_threshold: int = 3,
+                 max_error_rate: float = 0.5, min_samples: int = 10, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def available(self) -> bool:
+        return self.state != "open"
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.opened_at = None
+        ROUTE_CALLS.inc(route=self.name, outcome="ok")
+        ROUTE_LATENCY.observe(latency, route=self.name)
+        ROUTE_CIRCUIT_OPEN.set(0, route=self.name)
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            should_open = (
+                self.consecutive_failures >= self.failure_threshold
+                or (len(self.outcomes) >= self.min_samples and self.error_rate() >= self.max_error_rate)
+                # half-open 시험 호출이 실패하면 다시 cooldown 동안 엽니다.
+                or self.opened_at is not None
+            )
+            if should_open:
+                self.opened_at = time.monotonic()
+        outcome = "timeout" if isinstance(error, (asyncio.TimeoutError, TimeoutError)) else "error"
+        ROUTE_CALLS.inc(route=self.name, outcome=outcome)
+        if should_open:
+            ROUTE_CIRCUIT_OPEN.set(1, route=self.name)
+            print(f"[model_router] circuit open for {self.name} ({self.consecutive_failures} consecutive failures)")
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "samples": len(self.outcomes),
+        }
+
+
+# 같은 경로는 모든 라우터(도구 바인딩된 복사본 포함)가 하나의 상태를 공유합니다.
+_route_health: Dict[str, RouteHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_route_health(name: str) -> RouteHealth:
+    with _health_lock:
+        if name not in _route_health:
+            _route_health[name] = RouteHealth(name)
+        return _route_health[name]
+
+
+def route_health_report() -> dict:
+    return {name: health.snapshot() for name, health in _route_health.items()}
+
+
+# ==========================================
+# 2. Routing Chat Model
+# ==========================================
+class RoutingChatModel(BaseChatModel):
+    """
+    여러 provider/model 경로를 우선순위대로 묶은 Chat Model 래퍼입니다.
+
+    - 실패/타임아웃 시 다음 경로로 재시도(reroute)하며, Circuit이 열린 경로는 건너뜁니다.
+    - latency_budget을 넘는 p95를 보이는 경로는 순서를 뒤로 미룹니다.
+    - hedge_after(초) 안에 첫 응답이 없으면 다음 경로를 동시에 시작하고 먼저 응답한 쪽을 사용합니다.
+      (adaptive_hedge=True면 현재 경로의 rolling p95를 대기 시간으로 사용)
+    스트리밍은 첫 청크를 받기 전까지만 hedge/reroute가 가능합니다.
+    """
+
+    routes: List[Any]
+    route_names: List[str]
+    timeout: float = 120.0
+    hedge_after: Optional[float] = None
+    adaptive_hedge: bool = False
+    latency_budget: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"routes": self.route_names}
+
+    def bind_tools(self, tools, **kwargs):
+        # 경로마다 provider 형식에 맞게 도구를 바인딩하고, 상태(RouteHealth)는 그대로 공유합니다.
+        bound = [route.bind_tools(tools, **kwargs) for route in self.routes]
+        return self.model_copy(update={"routes": bound})
+
+    # --- 경로 선택 ---
+    def _order(self) -> List[int]:
+        healths = [get_route_health(name) for name in self.route_names]
+        order = [i for i, health in enumerate(healths) if health.available()]
+        if not order:
+            # 모든 Circuit이 열려 있으면 우선순위대로 그대로 시도합니다.
+            return list(range(len(self.routes)))
+
+        def _is_slow(i: int) -> bool:
+            p95 = healths[i].percentile(0.95)
+            return bool(self.latency_budget and p95 is not None and p95 > self.latency_budget)
+
+        return sorted(order, key=lambda i: (_is_slow(i), i))
+
+    def _hedge_delay(self, i: int) -> Optional[float]:
+        if self.adaptive_hedge:
+            p95 = get_route_health(self.route_names[i]).percentile(0.95)
+            if p95 is not None:
+                return p95 if self.hedge_after is None else max(p95, self.hedge_after)
+        return self.hedge_after
+
+    def _inner_config(self, run_manager) -> dict:
+        # LLM run manager에는 get_child()가 없으므로 상속 가능한 핸들러로 자식 매니저를 직접 만듭니다.
+        callbacks = None
+        if run_manager is not None:
+            manager_cls = AsyncCallbackManager if isinstance(run_manager, AsyncCallbackManagerForLLMRun) else CallbackManager
+            callbacks = manager_cls(
+                handlers=run_manager.inheritable_handlers,
+                inheritable_handlers=run_manager.inheritable_handlers,
+                parent_run_id=run_manager.run_id,
+                tags=run_manager.inheritable_tags,
+                inheritable_tags=run_manager.inheritable_tags,
+                metadata=run_manager.inheritable_metadata,
+                inheritable_metadata=run_manager.inheritable_metadata,
+            )
+        return {"callbacks": callbacks, "tags": INNER_TAGS}
+
+    async def _race(self, start: Callable[[int], Any], discard: Callable[[Any], Any] = None):
+        """
+        경로를 순서대로 시도하며 먼저 성공한 (index, result)를 반환합니다.
+        현재 경로가 hedge 지연 안에 응답하지 않으면 다음 경로를 동시에 시작하고,
+        실패하면 다음 경로로 넘어갑니다. 모든 경로가 실패하면 마지막 에러를 올립니다.
+        """
+        order = self._order()
+        pending: Dict[asyncio.Task, tuple] = {}
+        next_idx = 0
+        last_error: Optional[BaseException] = None
+
+        def _launch():
+            nonlocal next_idx
+            i = order[next_idx]
+            next_idx += 1
+            task = asyncio.create_task(asyncio.wait_for(start(i), self.timeout))
+            pending[task] = (i, time.perf_counter())
+
+        _launch()
+        try:
+            while pending:
+                hedge = self._hedge_delay(order[next_idx - 1]) if next_idx < len(order) else None
+                done, _ = await asyncio.wait(pending, timeout=hedge, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    ROUTE_HEDGES.inc(route=self.route_names[order[next_idx]])
+                    _launch()
+                    continue
+                for task in done:
+                    i, started = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        get_route_health(self.route_names[i]).record_success(time.perf_counter() - started)
+                        return i, task.result()
+                    get_route_health(self.route_names[i]).record_failure(error)
+                    last_error = error
+                if not pending and next_idx < len(order):
+                    _launch()
+        finally:
+            # 지거나 남은 hedge 요청을 정리합니다.
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+                elif discard is not None and not task.cancelled() and task.exception() is None:
+                    asyncio.create_task(discard(task.result()))
+        raise last_error
+
+    # --- 동기 호출: hedging 없이 순차 reroute ---
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> ChatResult:
+        last_error = None
+        for i in self._order():
+            health = get_route_health(self.route_names[i])
+            started = time.perf_counter()
+            try:
+                message = self.routes[i].invoke(messages, config=self._inner_config(run_manager), stop=stop, **kwargs)
+            except Exception as e:
+                health.record_failure(e)
+                last_error = e
+                continue
+            health.record_success(time.perf_counter() - started)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        last_error = None
+        for i in self._order():
+            health = get_route_health(self.route_names[i])
+            started = time.perf_counter()
+            first = True
+            try:
+                for chunk in self.routes[i].stream(messages, config=self._inner_config(run_manager), stop=stop, **kwargs):
+                    if first:
+                        first = False
+                        health.record_success(time.perf_counter() - started)
+                    yield ChatGenerationChunk(message=chunk)
+                return
+            except Exception as e:
+                health.record_failure(e)
+                if not first:
+                    raise
+                last_error = e
+        raise last_error
+
+    # --- 비동기 호출: hedging + reroute ---
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs) -> ChatResult:
+        config = self._inner_config(run_manager)
+        _, message = await self._race(
+            lambda i: self.routes[i].ainvoke(messages, config=config, stop=stop, **kwargs)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        config = self._inner_config(run_manager)
+
+        async def _open(i: int):
+            # 첫 청크가 도착할 때까지를 하나의 시도로 봅니다.
+            stream = self.routes[i].astream(messages, config=config, stop=stop, **kwargs)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                await stream.aclose()
+                raise
+            return stream, first
+
+        async def _discard(opened):
+            await opened[0].aclose()
+
+        i, (stream, first) = await self._race(_open, discard=_discard)
+        if first is None:
+            return
+        try:
+            yield ChatGenerationChunk(message=first)
+            async for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+        except Exception as e:
+            # 이미 일부를 내보낸 뒤에는 다른 경로로 이어 붙일 수 없으므로 실패로 기록만 합니다.
+            get_route_health(self.route_names[i]).record_failure(e)
+            raise
+        finally:
+            await stream.aclose()
@@ -1,8 +1,128 @@
 import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
 from langchain.chat_models import init_chat_model
 
+from app.utils.llm_cache import get_llm_cache
+from app.utils.model_router import RoutingChatModel
+from app.utils.offline import FAKE_PROVIDER, create_fake_chat_model
+
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+FALLBACK_MODEL = "google_genai:gemini-flash-latest"
+
+# (provider, model, kwargs(temperature 포함)) -> 모델 인스턴스
+# 같은 설정의 모델은 프로세스 전체에서 하나만 만들어 공유합니다.
+# 인스턴스가 내부 HTTP 클라이언트(커넥션 풀)를 들고 있으므로 연결과 TLS 세션도 함께 재사용됩니다.
+# (langchain-openai는 기본 httpx 클라이언트를 프로세스 단위로 이미 공유합니다.)
+_model_cache: Dict[Tuple, Any] = {}
+# LLM_MODEL 값 -> 실제로 초기화에 성공한 모델 문자열 (fallback 판단 결과 메모이제이션)
+_resolved_models: Dict[Optional[str], str] = {}
+_lock = threading.RLock()
+
+
+def _split_model(model_str: str) -> Tuple[str, str]:
+    if ":" in model_str:
+        # provider specified (e.g. "google_genai:gemini-flash-latest")
+        provider, model = model_str.split(":", 1)
+        return provider, model
+    # assume OpenAI if no provider prefix
+    return "openai", model_str
+
+
+def _freeze(value):
+    # kwargs 값을 캐시 키로 쓸 수 있도록 hashable 형태로 변환합니다.
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
 
-def create_chat_model(temperature: float = 0.2, **kwargs):
+def get_model(model_str: str, **kwargs):
+    """
+    ``provider:model`` (또는 OpenAI 모델 이름) 과 kwargs가 같으면 캐시된 인스턴스를 반환합니다.
+    처음 요청된 조합만 ``init_chat_model`` 로 생성하며, 여러 스레드에서 동시에 호출해도 한 번만 생성됩니다.
+    """
+    provider, model = _split_model(model_str)
+    key = (provider, model, _freeze(kwargs))
+    instance = _model_cache.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _model_cache.get(key)
+        if instance is None:
+            if provider == FAKE_PROVIDER:
+                # fake:<이름> -> 네트워크 없이 동작하는 결정적 Fake 모델 (app/utils/offline.py)
+                instance = create_fake_chat_model(model, **kwargs)
+            else:
+                instance = init_chat_model(model=model, model_provider=provider, **kwargs)
+            _model_cache[key] = instance
+    return instance
+
+
+def clear_model_cache():
+    """캐시된 모델 인스턴스와 fallback 판단 결과를 모두 비웁니다. (API Key/LLM_MODEL 변경 후 사용)"""
+    with _lock:
+        _model_cache.clear()
+        _resolved_models.clear()
+
+
+def model_cache_info() -> dict:
+    return {
+        "models": [f"{provider}:{model}" for provider, model, _ in _model_cache if provider != "router"],
+        "resolved": {str(env): model for env, model in _resolved_models.items()},
+    }
+
+
+def _create_router(routes_env: str, **kwargs):
+    """
+    ``LLM_ROUTES="gpt-4o-mini,google_genai:gemini-flash-latest"`` 처럼 지정된 경로들을 묶은
+    RoutingChatModel을 반환합니다. 초기화에 실패한 경로(API Key 없음 등)는 제외합니다.
+    """
+    key = ("router", routes_env, _freeze(kwargs))
+    router = _model_cache.get(key)
+    if router is not None:
+        return router
+
+    with _lock:
+        router = _model_cache.get(key)
+        if router is not None:
+            return router
+
+        names, models = [], []
+        for model_str in [r.strip() for r in routes_env.split(",") if r.strip()]:
+            try:
+                models.append(get_model(model_str, **kwargs))
+                names.append(model_str)
+            except Exception as e:
+                print(f"[model_utils] warning: skipping route {model_str}: {e}")
+        if not models:
+            return None
+        if len(models) == 1:
+            router = models[0]
+        else:
+            # LLM_HEDGE_AFTER_SECONDS: 비우면 hedging 끔, 숫자면 고정 대기 시간, "p95"면 경로별 rolling p95
+            hedge_env = os.environ.get("LLM_HEDGE_AFTER_SECONDS", "").strip().lower()
+            budget_env = os.environ.get("LLM_LATENCY_BUDGET_SECONDS", "").strip()
+            router = RoutingChatModel(
+                routes=models,
+                route_names=names,
+                timeout=float(os.environ.get("LLM_ROUTE_TIMEOUT_SECONDS", "120")),
+                hedge_after=float(hedge_env) if hedge_env and hedge_env != "p95" else None,
+                adaptive_hedge=hedge_env == "p95",
+                latency_budget=float(budget_env) if budget_env else None,
+            )
+        print(f"[model_utils] using model routes: {' -> '.join(names)}")
+        _model_cache[key] = router
+        return router
+
+
+def create_chat_model(temperature: float = 0.2, cache: bool = False, **kwargs):
     """Return a chat model instance.
 
     Selection logic:
@@ -15,43 +135,77 @@ def create_chat_model(temperature: float = 0.2, **kwargs):
        ``gpt-4o-mini`` instance.  If this call throws an exception (e.g. due
        to a missing or invalid OpenAI key), the function falls back to the
        Google Gemini Flash model ``google_genai:gemini-flash-latest``.
-    3. Any additional ``kwargs`` are forwarded to ``init_chat_model`` (e.g.
-       ``temperature``).
+    3. ``temperature`` and any additional ``kwargs`` are forwarded to ``init_chat_model``.
+
+    Instances are cached by ``(provider, model, temperature, kwargs)`` (see ``get_model``),
+    so repeated calls — e.g. once per ``browse_web`` tool call — return the same
+    object instead of building a new client, while callers asking for different
+    temperatures get separate instances. The outcome of the fallback in
+    steps 1-2 is memoized per ``LLM_MODEL`` value, so later calls skip the probe.
+
+    The persistent response cache from ``app/utils/llm_cache.py`` is opt-in per
+    call site: pass ``cache=True`` for one-shot deterministic calls (vision
+    analysis, self-query construction, ...) whose identical prompts may be
+    answered from disk. It is attached only when ``LLM_CACHE=1`` and
+    ``temperature == 0``, after the temperature has been put into the model
+    kwargs, so cached answers always come from temperature-0 calls and the
+    temperature is part of the cache's ``llm_string`` key. Interactive callers
+    such as the ``browse_web`` agent leave it off even at temperature 0, since
+    replaying a step decision from disk would ignore the live page state.
+
+    If ``LLM_ROUTES`` is set (comma-separated model strings), a
+    ``RoutingChatModel`` over those routes is returned instead: it reroutes on
+    errors/timeouts, skips routes whose circuit breaker is open and can hedge
+    slow calls (see ``app/utils/model_router.py``).
+
+    ``LLM_MODEL="fake:<name>"`` (or a ``fake:`` route) selects the offline
+    ``FakeChatModel`` from ``app/utils/offline.py``: scripted/replayed answers,
+    tool-call emission and streamed chunks with fixed per-token latency, for
+    load tests without any provider calls.
 
     This allows the application to work with either provider transparently
     and makes switching models as simple as setting a single environment
     variable.
     """
+    kwargs["temperature"] = temperature
 
-    # Helper to instantiate using the given model string with optional provider
-    def _make(model_str: str):
-        if ":" in model_str:
-            # provider specified (e.g. "google_genai:gemini-flash-latest")
-            return init_chat_model(model=model_str, **kwargs)
-        else:
-            # assume OpenAI if no provider prefix
-            return init_chat_model(model=model_str, model_provider="openai", **kwargs)
+    # 호출부가 요청(cache=True)했고 실제로 temperature=0으로 호출되는 모델에만 응답 캐시를 붙입니다.
+    if cache and kwargs["temperature"] == 0:
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            kwargs["cache"] = llm_cache
+
+    routes_env = os.environ.get("LLM_ROUTES")
+    if routes_env:
+        router = _create_router(routes_env, **kwargs)
+        if router is not None:
+            return router
 
-    # step 1: environment override
     env_model = os.environ.get("LLM_MODEL")
-    if env_model:
-        try:
-            m = _make(env_model)
-            print(f"[model_utils] using model from LLM_MODEL env: {env_model}")
-            return m
-        except Exception as e:
-            print(f"[model_utils] warning: failed to init env model {env_model}, will try defaults: {e}")
-            # fall back to normal flow
-            pass
-
-    # step 2: try default gpt-4o-mini
-    try:
-        model = _make("gpt-4o-mini")
-        print("[model_utils] using OpenAI gpt-4o-mini")
-        return model
-    except Exception as e:
-        # if openai failed, fall back to Gemini
-        print("[model_utils] failed to initialize gpt-4o-mini, falling back to Gemini:", e)
-        model = _make("google_genai:gemini-flash-latest")
-        print("[model_utils] using Google Gemini Flash")
-        return model
+
+    # 이전에 초기화에 성공한 모델이 있으면 probe 없이 바로 사용합니다.
+    resolved = _resolved_models.get(env_model)
+    if resolved is not None:
+        return get_model(resolved, **kwargs)
+
+    with _lock:
+        resolved = _resolved_models.get(env_model)
+        if resolved is not None:
+            return get_model(resolved, **kwargs)
+
+        # step 1: environment override
+        candidates = [env_model] if env_model else []
+        # step 2: try default gpt-4o-mini, then fall back to Gemini
+        candidates += [DEFAULT_OPENAI_MODEL, FALLBACK_MODEL]
+
+        for i, model_str in enumerate(candidates):
+            try:
+                model = get_model(model_str, **kwargs)
+            except Exception as e:
+                if i == len(candidates) - 1:
+                    raise
+                print(f"[model_utils] warning: failed to init {model_str}, trying {candidates[i + 1]}: {e}")
+                continue
+            _resolved_models[env_model] = model_str
+            print(f"[model_utils] using model: {model_str}")
+            return model
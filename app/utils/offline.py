@@ -0,0 +1,316 @@
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# 오프라인 모드에서는 외부 API(LLM, 검색, 임베딩, 브라우저)를 전혀 호출하지 않습니다.
+# 지연 시간은 모두 고정값(환경 변수)으로 흉내 내므로, 같은 입력이면 같은 응답과 같은 소요 시간이 나옵니다.
+FAKE_PROVIDER = "fake"
+_TOKEN_RE = re.compile(r"\S+\s*")
+
+
+def _env_ms(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default))) / 1000.0
+
+
+def is_fake_model(model_str: Optional[str]) -> bool:
+    return bool(model_str) and model_str.strip().lower().startswith(f"{FAKE_PROVIDER}:")
+
+
+def offline_model() -> Optional[str]:
+    """``LLM_MODEL`` 이 ``fake:`` 모델이면 그 값을, 아니면 None을 반환합니다."""
+    env_model = os.environ.get("LLM_MODEL")
+    return env_model if is_fake_model(env_model) else None
+
+
+def offline_tools_enabled() -> bool:
+    """
+    브라우저/검색/임베딩 도구를 로컬 대체 구현으로 바꿀지 여부.
+    ``OFFLINE_TOOLS`` 를 지정하지 않으면 ``LLM_MODEL`` 이 ``fake:`` 모델일 때 자동으로 켜집니다.
+    """
+    flag = os.environ.get("OFFLINE_TOOLS", "").strip().lower()
+    if flag:
+        return flag in ("1", "true", "yes", "on")
+    return offline_model() is not None
+
+
+def _stable_hash(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+
+
+# ==========================================
+# 1. 스크립트/리플레이 기반 Fake Chat Model
+# ==========================================
+def load_script(path: Optional[str]) -> List[Any]:
+    """
+    ``FAKE_LLM_SCRIPT`` 파일을 읽습니다. JSON 배열 또는 JSONL(한 줄에 항목 1개)을 지원합니다.
+
+    항목 형식:
+    - ``"응답 문자열"``: 규칙에 걸리지 않은 요청에 대해, 대화 내용의 해시로 하나를 골라 사용 (실행 순서와 무관하게 재현 가능)
+    - ``{"prompt": "...", "response": "..."}``: 마지막 사용자 메시지가 정확히 일치하면 사용 (녹화 응답 리플레이)
+    - ``{"match": "...", "response": "..."}``: 마지막 사용자 메시지에 부분 문자열이 포함되면 사용
+    """
+    if not path:
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    네트워크 없이 동작하는 결정적(deterministic) Chat Model입니다. 부하 테스트/오프라인 실행용.
+
+    - 첫 토큰까지 first_token_latency 초, 이후 토큰마다 token_latency 초를 대기합니다.
+      (스트리밍이면 토큰 단위 청크로 나누어 내보내고, 아니면 합계 시간만큼 대기 후 한 번에 반환)
+    - 도구가 바인딩되어 있으면 tool_calls 설정에 따라 도구 호출을 먼저 내보냅니다.
+      "first": 사용자 메시지마다 첫 번째 도구를 한 번 호출, "all": 모든 도구를 순서대로 한 번씩 호출, "none": 호출하지 않음
+    - 최종 답변은 script 규칙 -> script 문자열 -> 기본 echo 응답(response_tokens 토큰) 순으로 정합니다.
+    """
+
+    model_name: str = "default"
+    token_latency: float = 0.02
+    first_token_latency: float = 0.3
+    tool_calls: str = "first"
+    response_tokens: int = 40
+    script: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "tool_calls": self.tool_calls, "script": len(self.script)}
+
+    def bind_tools(self, tools, **kwargs):
+        formatted = [convert_to_openai_tool(t) for t in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    # --- 응답 결정 ---
+    @staticmethod
+    def _last_human(messages: List[BaseMessage]) -> int:
+        for i in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[i], HumanMessage):
+                return i
+        return -1
+
+    @staticmethod
+    def _tool_args(tool: dict, text: str) -> dict:
+        # 필수 인자만 스키마 타입에 맞는 고정값으로 채웁니다. (문자열 인자에는 사용자 메시지를 그대로 전달)
+        params = tool.get("function", {}).get("parameters", {}) or {}
+        props = params.get("properties", {}) or {}
+        args = {}
+        for name in params.get("required", []) or list(props)[:1]:
+            spec = props.get(name, {})
+            if "default" in spec:
+                args[name] = spec["default"]
+                continue
+            kind = spec.get("type", "string")
+            args[name] = {"integer": 1, "number": 1, "boolean": False, "array": [], "object": {}}.get(kind, text)
+        return args
+
+    def _next_tool_call(self, messages: List[BaseMessage], tools: List[dict]) -> Optional[dict]:
+        if not tools or self.tool_calls == "none":
+            return None
+        start = self._last_human(messages)
+        called = [
+            call["name"]
+            for msg in messages[start + 1:]
+            if isinstance(msg, AIMessage)
+            for call in (msg.tool_calls or [])
+        ]
+        if self.tool_calls == "first":
+            candidates = tools[:1] if not called else []
+        else:
+            candidates = [t for t in tools if t["function"]["name"] not in called]
+        if not candidates:
+            return None
+        tool = candidates[0]
+        text = messages[start].content if start >= 0 and isinstance(messages[start].content, str) else ""
+        name = tool["function"]["name"]
+        call_id = f"call_{_stable_hash(f'{len(messages)}:{text}:{name}') % 10**12:012d}"
+        return {"name": name, "args": self._tool_args(tool, text), "id": call_id}
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        start = self._last_human(messages)
+        human = messages[start].content if start >= 0 else ""
+        if not isinstance(human, str):
+            human = " ".join(p.get("text", "") for p in human if isinstance(p, dict))
+
+        replies = []
+        for entry in self.script:
+            if isinstance(entry, dict):
+                if "prompt" in entry and entry["prompt"] == human:
+                    return entry["response"]
+                if "match" in entry and entry["match"] in human:
+                    return entry["response"]
+            else:
+                replies.append(str(entry))
+        if replies:
+            transcript = "\n".join(str(m.content) for m in messages)
+            return replies[_stable_hash(transcript) % len(replies)]
+
+        head = f"[{self.model_name}] 요청을 처리했습니다: {human[:80]}"
+        filler = max(0, self.response_tokens - len(_TOKEN_RE.findall(head)))
+        return head + "".join(f" token{i}" for i in range(filler))
+
+    def _respond(self, messages: List[BaseMessage], kwargs: dict) -> AIMessage:
+        call = self._next_tool_call(messages, kwargs.get("tools") or [])
+        if call is not None:
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=self._answer(messages))
+
+    def _delay(self, message: AIMessage) -> float:
+        tokens = 1 if message.tool_calls else len(_TOKEN_RE.findall(message.content))
+        return self.first_token_latency + self.token_latency * max(0, tokens - 1)
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> Iterator[AIMessageChunk]:
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"name": call["name"], "args": json.dumps(call["args"], ensure_ascii=False),
+                                   "id": call["id"], "index": 0}],
+            )
+            return
+        for token in _TOKEN_RE.findall(message.content) or [""]:
+            yield AIMessageChunk(content=token)
+
+    # --- LangChain 인터페이스 ---
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages, kwargs)
+        time.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages, kwargs)
+        await asyncio.sleep(self._delay(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages, kwargs)
+        for i, chunk in enumerate(self._chunks(message)):
+            time.sleep(self.first_token_latency if i == 0 else self.token_latency)
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages, kwargs)
+        for i, chunk in enumerate(self._chunks(message)):
+            await asyncio.sleep(self.first_token_latency if i == 0 else self.token_latency)
+            if run_manager and chunk.content:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+
+def create_fake_chat_model(model: str = "default", **kwargs) -> FakeChatModel:
+    """
+    ``fake:<이름>`` 모델 문자열용 생성 함수. (model_utils.get_model에서 호출)
+
+    - ``FAKE_LLM_FIRST_TOKEN_MS``: 첫 토큰까지 지연 (기본 300)
+    - ``FAKE_LLM_TOKEN_LATENCY_MS``: 이후 토큰당 지연 (기본 20)
+    - ``FAKE_LLM_TOOL_CALLS``: first | all | none (기본 first)
+    - ``FAKE_LLM_RESPONSE_TOKENS``: 기본 echo 응답 길이(토큰 수) (기본 40)
+    - ``FAKE_LLM_SCRIPT``: 스크립트/리플레이 파일 경로 (``load_script`` 참고)
+    """
+    settings = {
+        "model_name": model,
+        "first_token_latency": _env_ms("FAKE_LLM_FIRST_TOKEN_MS", 300),
+        "token_latency": _env_ms("FAKE_LLM_TOKEN_LATENCY_MS", 20),
+        "tool_calls": os.environ.get("FAKE_LLM_TOOL_CALLS", "first").strip().lower(),
+        "response_tokens": int(os.environ.get("FAKE_LLM_RESPONSE_TOKENS", "40")),
+        "script": load_script(os.environ.get("FAKE_LLM_SCRIPT")),
+    }
+    # temperature 등 실제 provider용 인자는 무시하고, 모델 필드(cache 등)만 전달합니다.
+    settings.update({k: v for k, v in kwargs.items() if k in FakeChatModel.model_fields})
+    return FakeChatModel(**settings)
+
+
+# ==========================================
+# 2. 임베딩 대체: 해시 기반 (Feature Hashing)
+# ==========================================
+class HashEmbeddings(Embeddings):
+    """
+    단어를 해시하여 고정 차원 벡터에 누적한 뒤 정규화합니다.
+    외부 호출 없이 같은 텍스트는 항상 같은 벡터가 되고, 단어가 겹치는 문서끼리는 유사도가 높게 나옵니다.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in re.findall(r"\w+", text.lower()):
+            h = _stable_hash(token)
+            vector[h % self.size] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# ==========================================
+# 3. 검색/브라우저 도구 대체
+# ==========================================
+class FakeSearch:
+    """TavilySearch.invoke와 같은 형태({"results": [...]})의 고정 검색 결과를 반환합니다."""
+
+    def __init__(self, max_results: int = 5, latency: Optional[float] = None):
+        self.max_results = max_results
+        self.latency = _env_ms("FAKE_SEARCH_LATENCY_MS", 300) if latency is None else latency
+
+    def invoke(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = payload.get("query", "") if isinstance(payload, dict) else str(payload)
+        time.sleep(self.latency)
+        key = _stable_hash(query) % 10**8
+        results = []
+        for i in range(self.max_results):
+            body = f"{query}에 대한 오프라인 검색 결과 {i + 1}번 문서입니다. "
+            results.append({
+                "title": f"[offline] {query[:40]} #{i + 1}",
+                "url": f"https://offline.example/{key:08d}/{i + 1}",
+                "content": body,
+                "raw_content": body * 20,
+            })
+        return {"query": query, "results": results}
+
+
+async def fake_browse(instruction: str, return_url_only: bool = False) -> str:
+    """browse_web 대체. ``FAKE_BROWSER_LATENCY_MS`` (기본 2000) 만큼 대기 후 고정 결과를 반환합니다."""
+    await asyncio.sleep(_env_ms("FAKE_BROWSER_LATENCY_MS", 2000))
+    url = f"https://offline.example/{_stable_hash(instruction) % 10**8:08d}"
+    if return_url_only:
+        return url
+    return (
+        f"[offline browser] {url} 페이지를 탐색했습니다.\n"
+        f"- 지시사항: {instruction[:200]}\n"
+        "- 목록 영역: ul.items > li.item (제목: a.title, 가격: span.price)\n"
+        "- 페이지네이션: a.next (정적 HTML)"
+    )
@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from app.utils.metrics import metrics
+
+# 프로젝트 루트 기준 기본 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PAGE_SNAPSHOT_PATH = os.path.join(BASE_DIR, "data", "page_snapshots.sqlite")
+
+PAGE_SNAPSHOT_REQUESTS = metrics.counter(
+    "page_snapshot_requests_total",
+    "Page snapshot cache lookups by result (hit, miss, expired, shared).",
+    ("result",),
+)
+
+# navigator 도구들이 공유하는 기본 렌더링 옵션 (같은 옵션이어야 같은 스냅샷을 재사용합니다)
+DEFAULT_RENDER_WAIT_MS = 3000
+DEFAULT_RENDER_TIMEOUT_MS = 15000
+
+
+# ==========================================
+# 1. SQLite 기반 스냅샷 저장소 (압축 + TTL + 크기 제한)
+# ==========================================
+class PageSnapshotCache:
+    """
+    렌더링된 HTML과 최종 URL(리다이렉트 후)을 (URL, 렌더링 옵션) 키로 저장합니다.
+
+    - HTML 본문은 내용 해시(sha256)로 한 번만 저장하고 zlib으로 압축합니다. (같은 페이지를 다른 옵션/URL로 받아도 중복 없음)
+    - ttl_seconds가 지난 스냅샷은 조회 시 삭제하고 miss로 처리합니다.
+    - 압축 크기 합이 max_bytes를 넘으면 가장 오래 조회되지 않은 스냅샷부터 삭제합니다. (LRU)
+    """
+
+    def __init__(self, path: str = DEFAULT_PAGE_SNAPSHOT_PATH, max_bytes: int = 256 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS page_blobs (
+                content_hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS page_snapshots (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                options TEXT NOT NULL,
+                final_url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_snapshots_access ON page_snapshots (last_access);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(url: str, options: dict) -> str:
+        return hashlib.sha256(f"{url}\x00{json.dumps(options, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+    def get(self, url: str, options: dict) -> Optional[dict]:
+        """{"html", "final_url", "fetched_at"} 또는 None"""
+        key = self._key(url, options)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT s.final_url, s.created_at, b.data FROM page_snapshots s "
+                "JOIN page_blobs b ON b.content_hash = s.content_hash WHERE s.key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM page_snapshots WHERE key = ?", (key,))
+                self._delete_orphans()
+                self._conn.commit()
+                PAGE_SNAPSHOT_REQUESTS.inc(result="expired")
+                return None
+            if row is None:
+                PAGE_SNAPSHOT_REQUESTS.inc(result="miss")
+                return None
+            self._conn.execute("UPDATE page_snapshots SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        PAGE_SNAPSHOT_REQUESTS.inc(result="hit")
+        return {"html": zlib.decompress(row[2]).decode("utf-8"), "final_url": row[0], "fetched_at": row[1]}
+
+    def put(self, url: str, options: dict, html: str, final_url: Optional[str] = None) -> None:
+        raw = html.encode("utf-8")
+        content_hash = hashlib.sha256(raw).hexdigest()
+        data = zlib.compress(raw, 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO page_blobs (content_hash, data, size) VALUES (?, ?, ?)",
+                (content_hash, data, len(data)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_snapshots (key, url, options, final_url, content_hash, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(url, options), url, json.dumps(options, sort_keys=True), final_url or url,
+                 content_hash, now, now),
+            )
+            self._evict()
+            self._delete_orphans()
+            self._conn.commit()
+
+    def _delete_orphans(self):
+        self._conn.execute(
+            "DELETE FROM page_blobs WHERE content_hash NOT IN (SELECT content_hash FROM page_snapshots)"
+        )
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 크기 합이 max_bytes의 90% 이하가 될 때까지 LRU 순으로 삭제 (매 저장마다 정리하지 않도록 여유를 둠)
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        rows = self._conn.execute(
+            "SELECT s.key, b.size FROM page_snapshots s JOIN page_blobs b ON b.content_hash = s.content_hash "
+            "ORDER BY s.last_access"
+        )
+        for key, size in rows:
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM page_snapshots WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM page_snapshots")
+            self._conn.execute("DELETE FROM page_blobs")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM page_snapshots").fetchone()[0]
+            blobs, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_blobs").fetchone()
+        return {"entries": entries, "blobs": blobs, "bytes": size}
+
+
+# ==========================================
+# 2. 설정 기반 싱글톤
+# ==========================================
+_snapshot_cache: Optional[PageSnapshotCache] = None
+_snapshot_cache_lock = threading.Lock()
+
+
+def get_page_snapshot_cache() -> Optional[PageSnapshotCache]:
+    """
+    프로세스 공용 스냅샷 캐시. ``PAGE_SNAPSHOT_CACHE=0`` 이면 None (기본: 켜짐)
+
+    - ``PAGE_SNAPSHOT_CACHE_PATH``: SQLite 파일 경로 (기본 ``data/page_snapshots.sqlite``)
+    - ``PAGE_SNAPSHOT_MAX_MB``: 압축 후 최대 크기(MB) (기본 256)
+    - ``PAGE_SNAPSHOT_TTL_SECONDS``: 스냅샷 유효 시간(초). 0이면 무제한 (기본 900)
+    """
+    global _snapshot_cache
+    if os.environ.get("PAGE_SNAPSHOT_CACHE", "1").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _snapshot_cache is None:
+        with _snapshot_cache_lock:
+            if _snapshot_cache is None:
+                _snapshot_cache = PageSnapshotCache(
+                    path=os.environ.get("PAGE_SNAPSHOT_CACHE_PATH", DEFAULT_PAGE_SNAPSHOT_PATH),
+                    max_bytes=int(float(os.environ.get("PAGE_SNAPSHOT_MAX_MB", "256")) * 1024 * 1024),
+                    ttl_seconds=float(os.environ.get("PAGE_SNAPSHOT_TTL_SECONDS", "900")) or None,
+                )
+                print(f"[page_snapshots] enabled: {_snapshot_cache.path}")
+    return _snapshot_cache
+
+
+# ==========================================
+# 3. Read-through 페이지 가져오기
+# ==========================================
+# 같은 (URL, 옵션)을 동시에 요청하면 렌더링은 한 번만 하고 나머지는 그 결과를 기다립니다.
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+async def _render_browser(url: str, wait_ms: int, timeout_ms: int) -> dict:
+    from app.utils.browser_pool import get_browser_pool
+
+    async with get_browser_pool().lease() as lease:
+        page = await lease.new_page()
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+        await page.wait_for_timeout(wait_ms) # JS 렌더링 대기
+        return {"html": await page.content(), "final_url": page.url}
+
+
+async def _render_http(url: str, timeout_ms: int) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout_ms / 1000,
+                                 headers={"User-Agent": "Mozilla/5.0"}) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return {"html": response.text, "final_url": str(response.url)}
+
+
+async def fetch_page(url: str, render: str = "browser", wait_ms: int = DEFAULT_RENDER_WAIT_MS,
+                     timeout_ms: int = DEFAULT_RENDER_TIMEOUT_MS, refresh: bool = False) -> dict:
+    """
+    스냅샷 캐시를 거쳐 페이지 HTML을 가져옵니다. 반환값: {"html", "final_url", "fetched_at", "cached"}
+
+    - ``render="browser"``: 브라우저 풀에서 JS 렌더링 후 HTML (get_page_structure, verify_selectors_with_samples)
+    - ``render="http"``: 브라우저 없이 원본 HTML (Blueprint 캐시의 가벼운 재검증)
+    - ``refresh=True`` 면 캐시를 건너뛰고 새로 렌더링한 결과로 교체합니다.
+    실패하면 예외를 그대로 올립니다.
+    """
+    options = {"render": render, "wait_ms": wait_ms} if render == "browser" else {"render": render}
+    cache = get_page_snapshot_cache()
+    if cache is not None and not refresh:
+        snapshot = cache.get(url, options)
+        if snapshot is not None:
+            return {**snapshot, "cached": True}
+
+    key = PageSnapshotCache._key(url, options)
+    pending = _inflight.get(key)
+    if pending is not None:
+        PAGE_SNAPSHOT_REQUESTS.inc(result="shared")
+        return {**await asyncio.shield(pending), "cached": True}
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        if render == "browser":
+            result = await _render_browser(url, wait_ms, timeout_ms)
+        else:
+            result = await _render_http(url, timeout_ms)
+        result["fetched_at"] = time.time()
+        if cache is not None and result["html"]:
+            cache.put(url, options, result["html"], result["final_url"])
+        future.set_result(result)
+        return {**result, "cached": False}
+    except BaseException as e:
+        future.set_exception(e if isinstance(e, Exception) else RuntimeError("렌더링이 취소되었습니다."))
+        # 기다리는 쪽이 없으면 "exception was never retrieved" 경고가 나므로 여기서 한 번 꺼내 둡니다.
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
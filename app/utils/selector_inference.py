@@ -0,0 +1,418 @@
+import os
+import re
+import math
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.html_condenser import DROP_TAGS, UNSTABLE_CLASS_RE, UNSTABLE_ID_RE
+from app.utils.metrics import metrics
+
+SELECTOR_INFERENCE_RESULTS = metrics.counter(
+    "selector_inference_total",
+    "get_page_structure selector analyses by source (heuristic = LLM skipped, llm = low confidence fallback).",
+    ("result",),
+)
+
+# 목록 항목으로 볼 최소 반복 수
+MIN_ITEMS = 3
+# 항목 중 이 비율 이상에 있어야 필드 후보로 봅니다.
+MIN_FIELD_SUPPORT = 0.6
+
+# 셀렉터로 그대로 쓸 수 있는 class/id (이스케이프가 필요한 Tailwind "md:flex", "w-1/2" 등은 제외)
+_CSS_IDENT_RE = re.compile(r"^-?[A-Za-z_][\w-]*$")
+# 메뉴/탭/푸터처럼 반복되지만 본문 목록이 아닌 영역
+_NAV_HINT_RE = re.compile(r"(^|[-_])(nav|gnb|lnb|snb|menu|footer|header|breadcrumb|paging|pagination|tab|tabs)([-_]|$)", re.IGNORECASE)
+_NAV_TAGS = ("nav", "header", "footer", "aside")
+_DATE_RE = re.compile(r"(\d{4}[.\-/]\s?\d{1,2}[.\-/]\s?\d{1,2}|\d{1,2}[.\-/]\d{1,2}[.\-/]?\s|\d+\s?(분|시간|일|주)\s?전|\d{1,2}:\d{2}|"
+                      r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2})", re.IGNORECASE)
+_PRICE_RE = re.compile(r"(\d[\d,]*\s?(원|₩|달러|円|元)|[$€£₩¥]\s?\d[\d,.]*)")
+_NEXT_TEXTS = ("다음", "다음 페이지", "다음페이지", "next", "next page", "›", "»", ">", "더보기", "load more", "more")
+
+# 수집 목표 문장의 단어 -> 필드 이름 (여기 없는 필드를 요청하면 확신도를 낮춰 LLM으로 넘깁니다)
+GOAL_FIELDS = {
+    "title": ("제목", "헤드라인", "이름", "상품명", "title", "headline", "name"),
+    "url": ("링크", "주소", "url", "link", "href"),
+    "summary": ("요약", "본문", "내용", "설명", "summary", "content", "description", "body"),
+    "date": ("날짜", "일자", "시간", "작성일", "등록일", "date", "time"),
+    "price": ("가격", "금액", "price", "cost"),
+    "image": ("이미지", "썸네일", "사진", "image", "thumbnail", "img"),
+}
+
+
+# ==========================================
+# 1. CSS 셀렉터 만들기
+# ==========================================
+def _classes(tag) -> List[str]:
+    return [c for c in tag.get("class") or [] if _CSS_IDENT_RE.match(c) and not UNSTABLE_CLASS_RE.match(c)]
+
+
+def _simple_css(tag, use_id: bool = True) -> str:
+    """tag#id 또는 tag.class1.class2 (빌드마다 바뀌는 class/id는 제외)"""
+    tag_id = tag.get("id")
+    if use_id and isinstance(tag_id, str) and _CSS_IDENT_RE.match(tag_id) and not UNSTABLE_ID_RE.match(tag_id):
+        return f"{tag.name}#{tag_id}"
+    return tag.name + "".join(f".{c}" for c in _classes(tag))
+
+
+def _select(soup, selector: str, limit: int = 0) -> list:
+    try:
+        return soup.select(selector, limit=limit)
+    except Exception:
+        # soupsieve가 해석하지 못하는 선택자는 매칭 없음으로 취급
+        return []
+
+
+def _unique_css(soup, el, max_ancestors: int = 8) -> Optional[str]:
+    """페이지에서 el 하나만 가리키는 가장 짧은 셀렉터. class/id 없는 조상은 건너뜁니다."""
+    parts = [_simple_css(el)]
+    node = el
+    for _ in range(max_ancestors):
+        found = _select(soup, " ".join(parts), limit=2)
+        if len(found) == 1 and found[0] is el:
+            return " ".join(parts)
+        node = node.parent
+        if node is None or node.name in ("[document]", "html", "body"):
+            return None
+        css = _simple_css(node)
+        if css != node.name:
+            parts.insert(0, css)
+    return None
+
+
+def _group_css(soup, parent, items) -> Tuple[str, str, bool]:
+    """(반복 항목 전체를 가리키는 셀렉터, 목록을 감싸는 부모 셀렉터, 항목 셀렉터가 정확히 일치하는지 여부)"""
+    common = [c for c in _classes(items[0]) if all(c in (i.get("class") or []) for i in items[1:])]
+    item_css = items[0].name + "".join(f".{c}" for c in common)
+    candidates = [item_css, f"{_simple_css(parent)} > {item_css}"]
+    parent_css = _unique_css(soup, parent)
+    if parent_css:
+        candidates.append(f"{parent_css} > {item_css}")
+    container_css = parent_css or _simple_css(parent)
+    wanted = {id(i) for i in items}
+    for selector in candidates:
+        if {id(f) for f in _select(soup, selector)} == wanted:
+            return selector, container_css, True
+    return candidates[-1], container_css, False
+
+
+# ==========================================
+# 2. 반복 목록 찾기 (같은 class 경로의 형제 + 링크 밀도 + 텍스트 길이 통계)
+# ==========================================
+def _text(tag) -> str:
+    return " ".join(tag.get_text(" ", strip=True).split())
+
+
+def _is_nav_like(parent) -> bool:
+    node = parent
+    for _ in range(6):
+        if node is None or node.name in ("[document]", "body"):
+            return False
+        if node.name in _NAV_TAGS:
+            return True
+        names = _classes(node) + ([node["id"]] if isinstance(node.get("id"), str) else [])
+        if any(_NAV_HINT_RE.search(name) for name in names):
+            return True
+        node = node.parent
+    return False
+
+
+def _candidate_groups(soup) -> List[Tuple[object, list]]:
+    """(부모, 같은 tag+첫 class를 가진 자식들) 목록"""
+    groups = []
+    for parent in soup.find_all(True):
+        buckets: Dict[Tuple[str, str], list] = {}
+        for child in parent.find_all(True, recursive=False):
+            classes = _classes(child)
+            buckets.setdefault((child.name, classes[0] if classes else ""), []).append(child)
+        groups.extend((parent, items) for items in buckets.values() if len(items) >= MIN_ITEMS)
+    return groups
+
+
+def _field_keys(item) -> Dict[str, object]:
+    """항목 안 자손의 (tag+class) 키 -> 첫 번째 요소. 항목마다 다른 id는 쓰지 않습니다."""
+    keys = {}
+    for el in item.find_all(True):
+        keys.setdefault(_simple_css(el, use_id=False), el)
+    return keys
+
+
+def _score_group(parent, items, page_text_len: int) -> dict:
+    texts = [_text(item) for item in items]
+    lengths = [len(t) for t in texts]
+    mean_len = sum(lengths) / len(items)
+    if not mean_len:
+        return {"score": 0.0}
+    link_ratio = sum(1 for i in items if i.name == "a" and i.get("href") or i.find("a", href=True)) / len(items)
+    link_text = sum(len(_text(a)) for i in items for a in ([i] if i.name == "a" else i.find_all("a")))
+    link_density = min(1.0, link_text / max(sum(lengths), 1))
+
+    # 항목들이 같은 템플릿(자손 class 경로)으로 그려졌는지: 절반 이상의 항목에 있는 키를 얼마나 공유하는지
+    keys = [set(_field_keys(i)) for i in items]
+    counts: Dict[str, int] = {}
+    for ks in keys:
+        for k in ks:
+            counts[k] = counts.get(k, 0) + 1
+    template = {k for k, c in counts.items() if c >= len(items) / 2}
+    consistency = (sum(len(ks & template) / len(template) for ks in keys) / len(items)) if template else 0.5
+    # 텍스트 길이가 들쭉날쭉하면 같은 종류의 항목이 아닐 가능성이 큽니다. (변동계수)
+    spread = math.sqrt(sum((n - mean_len) ** 2 for n in lengths) / len(items)) / mean_len
+    coverage = sum(lengths) / max(page_text_len, 1)
+
+    score = (0.3 * consistency
+             + 0.25 * min(1.0, coverage / 0.25)
+             + 0.15 * min(1.0, mean_len / 30)
+             + 0.15 * min(1.0, (len(items) - 2) / 8)
+             + 0.15 * link_ratio) * (1 - 0.3 * min(1.0, spread / 2))
+    if _is_nav_like(parent):
+        score *= 0.4
+    # 텍스트 거의 전부가 링크이고 짧으면 메뉴/태그 목록
+    if link_density > 0.9 and mean_len < 12:
+        score *= 0.5
+    return {"score": score, "consistency": consistency, "coverage": coverage, "mean_len": mean_len,
+            "link_ratio": link_ratio, "link_density": link_density}
+
+
+# ==========================================
+# 3. 항목 안의 필드 분류
+# ==========================================
+def _first_values(items, key: str, attr: Optional[str] = None) -> List[str]:
+    values = []
+    for item in items:
+        el = item if not key else _field_keys(item).get(key)
+        if el is None:
+            continue
+        value = el.get(attr) if attr else _text(el)[:200]
+        value = " ".join(value) if isinstance(value, list) else value
+        if value:
+            values.append(value.strip())
+    return values
+
+
+def _infer_fields(soup, items, item_css: str) -> Tuple[Dict[str, str], Dict[str, list], Optional[str]]:
+    """(selectors, samples, 상세 페이지 링크 셀렉터)"""
+    n = len(items)
+    per_item = [_field_keys(item) for item in items]
+    support: Dict[str, int] = {}
+    for keys in per_item:
+        for k in keys:
+            support[k] = support.get(k, 0) + 1
+    stats = {}
+    for key, count in support.items():
+        if count / n < MIN_FIELD_SUPPORT:
+            continue
+        els = [keys[key] for keys in per_item if key in keys]
+        texts = [_text(el) for el in els]
+        stats[key] = {
+            "support": count / n,
+            "mean_len": sum(len(t) for t in texts) / len(texts),
+            "is_link": all(el.name == "a" and el.get("href") for el in els),
+            "date": sum(1 for t in texts if t and _DATE_RE.search(t)) / len(texts),
+            "price": sum(1 for t in texts if t and _PRICE_RE.search(t)) / len(texts),
+            "img": all(el.name == "img" and (el.get("src") or el.get("data-src")) for el in els),
+            "time": all(el.name == "time" for el in els),
+            "leaf": all(el.find(True) is None or el.name == "a" for el in els),
+        }
+    # 항목 자체가 링크인 목록 (<a class="card"> ...)
+    if all(i.name == "a" and i.get("href") for i in items):
+        texts = [_text(i) for i in items]
+        stats[""] = {"support": 1.0, "mean_len": sum(map(len, texts)) / n, "is_link": True, "date": 0, "price": 0,
+                     "img": False, "time": False, "leaf": False}
+
+    def absolute(key: str) -> str:
+        return f"{item_css} {key}" if key else item_css
+
+    selectors, samples, used = {}, {}, set()
+    links = [k for k, s in stats.items() if s["is_link"] and s["mean_len"] >= 5]
+    link_key = max(links, key=lambda k: (stats[k]["support"], stats[k]["mean_len"] if k else 0), default=None)
+    if link_key is None:
+        # 텍스트 없는 링크(이미지 링크 등)라도 있으면 상세 페이지 링크로 씁니다.
+        link_key = max((k for k, s in stats.items() if s["is_link"]), key=lambda k: stats[k]["support"], default=None)
+
+    title_key = link_key if link_key is not None and stats[link_key]["mean_len"] >= 5 else None
+    if title_key is None:
+        headings = [k for k, s in stats.items() if k and s["mean_len"] >= 5 and not s["date"] and not s["price"]
+                    and (k.split(".")[0] in ("h1", "h2", "h3", "h4", "h5", "strong", "b") or s["leaf"])]
+        title_key = min(headings, key=lambda k: (-stats[k]["support"], stats[k]["mean_len"]), default=None)
+    if title_key is not None:
+        selectors["title"] = absolute(title_key)
+        samples["title"] = _first_values(items, title_key)[:3]
+        used.add(title_key)
+    if link_key is not None:
+        selectors["url"] = absolute(link_key) + "::attr(href)"
+        samples["url"] = _first_values(items, link_key, "href")[:3]
+        used.add(link_key)
+
+    def pick(name: str, keys: List[str], attr: Optional[str] = None, order=None):
+        keys = [k for k in keys if k not in used and not any(k.startswith(u + " ") for u in used if u)]
+        if not keys:
+            return
+        key = max(keys, key=order or (lambda k: stats[k]["support"]))
+        selectors[name] = absolute(key) + (f"::attr({attr})" if attr else "")
+        samples[name] = _first_values(items, key, attr)[:3]
+        used.add(key)
+
+    # 값을 감싼 상위 요소보다 값만 가진 가장 안쪽 요소를 고릅니다.
+    innermost = lambda k: (stats[k]["leaf"], stats[k]["support"], -stats[k]["mean_len"])
+    pick("date", [k for k, s in stats.items() if s["time"] or (s["date"] >= 0.6 and s["mean_len"] <= 40)], order=innermost)
+    pick("price", [k for k, s in stats.items() if s["price"] >= 0.6 and s["mean_len"] <= 40], order=innermost)
+    pick("image", [k for k, s in stats.items() if s["img"]], attr="src")
+    title_len = stats[title_key]["mean_len"] if title_key is not None else 0
+    pick("summary", [k for k, s in stats.items() if not s["is_link"] and s["leaf"]
+                     and s["mean_len"] >= max(40, title_len * 1.5)], order=lambda k: stats[k]["mean_len"])
+    # 나머지 짧은 텍스트 필드(언론사, 작성자 등)는 class 이름으로 최대 2개까지 함께 제안합니다.
+    extras = sorted((k for k, s in stats.items() if k and k not in used and s["leaf"] and not s["is_link"]
+                     and s["support"] >= 0.8 and 1 <= s["mean_len"] <= 40 and "." in k),
+                    key=lambda k: -stats[k]["support"])
+    for key in extras[:2]:
+        name = re.split(r"[_-]", key.split(".")[-1])[-1] or key.split(".")[-1]
+        if name not in selectors:
+            pick(name, [key])
+
+    navigate = absolute(link_key) if link_key is not None else None
+    return selectors, samples, navigate
+
+
+def _find_next_page(soup, items) -> Tuple[Optional[str], Optional[str]]:
+    """(다음 페이지/더보기 셀렉터, 페이지네이션 방식)"""
+    inside = {id(el) for item in items for el in item.find_all(True)}
+    for el in soup.find_all(["a", "button"]):
+        if id(el) in inside:
+            continue
+        text = _text(el).lower()
+        hints = " ".join(_classes(el) + [str(el.get("aria-label") or ""), str(el.get("rel") or "")]).lower()
+        if text not in _NEXT_TEXTS and "next" not in hints and "다음" not in hints and "more" not in hints:
+            continue
+        selector = _unique_css(soup, el)
+        if selector is None:
+            continue
+        href = (el.get("href") or "").strip()
+        if el.name == "a" and href and not href.startswith(("#", "javascript")) and text not in ("더보기", "load more", "more"):
+            return selector, "URL파라미터"
+        return selector, "AJAX버튼"
+    return None, None
+
+
+# ==========================================
+# 4. 상세 페이지 (제목 + 본문 블록)
+# ==========================================
+def _infer_detail(soup) -> Tuple[float, Dict[str, str], Dict[str, list]]:
+    selectors, samples = {}, {}
+    h1 = next((h for h in soup.find_all("h1") if _text(h)), None)
+    title_css = _unique_css(soup, h1) if h1 is not None else None
+    if title_css:
+        selectors["title"], samples["title"] = title_css, [_text(h1)]
+
+    # 링크가 아닌 긴 텍스트 조각을 감싸는 블록에 점수를 몰아주고, 가장 큰 블록을 본문으로 봅니다.
+    credit: Dict[int, list] = {}
+    for string in soup.find_all(string=True):
+        value = " ".join(string.split())
+        parent = string.parent
+        if len(value) < 25 or parent is None or parent.find_parent("a") is not None or parent.name == "a":
+            continue
+        block = parent.parent if parent.name in ("p", "span", "b", "strong", "em", "br", "font") and parent.parent else parent
+        entry = credit.setdefault(id(block), [block, 0])
+        entry[1] += len(value)
+    content_score = 0.0
+    if credit:
+        block, chars = max(credit.values(), key=lambda e: e[1])
+        content_css = _unique_css(soup, block)
+        if content_css and chars >= 200:
+            selectors["content"] = content_css
+            samples["content"] = [_text(block)[:200]]
+            content_score = min(1.0, chars / 800)
+    time_el = soup.find("time") or next((el for el in soup.find_all(True) if el.find(True) is None
+                                         and any("date" in c.lower() for c in _classes(el)) and _DATE_RE.search(_text(el))), None)
+    if time_el is not None:
+        date_css = _unique_css(soup, time_el)
+        if date_css:
+            selectors["date"], samples["date"] = date_css, [time_el.get("datetime") or _text(time_el)]
+    score = 0.35 * bool(title_css) + 0.5 * content_score + 0.15 * ("date" in selectors)
+    return score, selectors, samples
+
+
+# ==========================================
+# 5. 공개 API
+# ==========================================
+def requested_fields(goal: str) -> List[str]:
+    goal = (goal or "").lower()
+    return [name for name, words in GOAL_FIELDS.items() if any(w in goal for w in words)]
+
+
+def infer_selectors(html: str, scraping_goal: str = "") -> dict:
+    """
+    LLM 없이 DOM 통계만으로 셀렉터를 추정합니다. 반환 형식은 get_page_structure의 LLM 분석 결과와 같고,
+    ``score`` (0~1)와 ``source="heuristic"`` 이 추가됩니다.
+
+    - ``container``: 목록 전체를 감싸는 부모, ``item``: 반복 항목 1개 (필드 셀렉터는 ``item`` 기준)
+    - ``next_page``: 다음 목록 페이지 링크/더보기 버튼, ``navigate_to_next``: 항목의 상세 페이지 링크
+
+    - 목록 페이지: 같은 tag+class로 반복되는 형제 묶음 중 템플릿 일관성, 본문 텍스트 비중, 텍스트 길이,
+      링크 비율이 높은 묶음을 고르고 그 안에서 title/url/date/price/image/summary 필드를 분류합니다.
+    - 상세 페이지: h1 제목과 링크가 아닌 텍스트가 가장 많이 모인 본문 블록을 고릅니다.
+    - 수집 목표에서 요청한 필드(GOAL_FIELDS)를 찾지 못하거나, 인식할 수 없는 목표면 점수를 낮춥니다.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html or "", "html.parser")
+    for tag in soup.find_all(DROP_TAGS):
+        tag.decompose()
+    root = soup.body or soup
+    page_text_len = len(_text(root))
+
+    best, best_stats = None, {"score": 0.0}
+    for parent, items in _candidate_groups(root):
+        group_stats = _score_group(parent, items, page_text_len)
+        if group_stats["score"] > best_stats["score"]:
+            best, best_stats = (parent, items), group_stats
+
+    empty = {"selectors": {}, "samples": {}, "container": None, "item": None, "navigate_to_next": None,
+             "pagination": None, "next_page": None}
+    result = dict(empty)
+    list_score, note = 0.0, ""
+    if best is not None:
+        parent, items = best
+        item_css, container_css, exact = _group_css(root, parent, items)
+        selectors, samples, navigate = _infer_fields(root, items, item_css)
+        next_page, pagination = _find_next_page(root, items)
+        list_score = best_stats["score"] * (1.0 if exact else 0.85)
+        result.update(selectors=selectors, samples=samples, container=container_css, item=item_css,
+                      navigate_to_next=navigate, pagination=pagination, next_page=next_page)
+        note = (f"반복 항목 {len(items)}개 (템플릿 일관성 {best_stats['consistency']:.2f}, "
+                f"본문 텍스트 비중 {best_stats['coverage']:.0%}, 링크 비율 {best_stats['link_ratio']:.0%})")
+
+    detail_score, detail_selectors, detail_samples = _infer_detail(root)
+    if detail_score > list_score:
+        result = {**empty, "selectors": detail_selectors, "samples": detail_samples}
+        note = "상세 페이지로 판단 (h1 제목 + 본문 블록)"
+        list_score = detail_score
+
+    # 요청한 필드를 얼마나 찾았는지 (상세 페이지의 content는 summary 요청으로 봅니다)
+    wanted = requested_fields(scraping_goal)
+    found = set(result["selectors"]) | ({"summary"} if "content" in result["selectors"] else set())
+    if wanted:
+        field_coverage = sum(1 for f in wanted if f in found) / len(wanted)
+        missing = [f for f in wanted if f not in found]
+        if missing:
+            note = f"{note}. 찾지 못한 필드: {missing}" if result["selectors"] else f"찾지 못한 필드: {missing}"
+    elif (scraping_goal or "").strip():
+        field_coverage = 0.25 # 목표를 해석하지 못했으면 LLM에 맡깁니다.
+    else:
+        field_coverage = 1.0 if {"title", "url"} <= found else 0.5
+    score = round(list_score * (0.6 + 0.4 * field_coverage), 3) if result["selectors"] else 0.0
+
+    result.update(
+        confidence="high" if score >= 0.75 else "medium" if score >= 0.5 else "low",
+        score=score,
+        source="heuristic",
+        note=note if result["selectors"] else "반복 목록이나 본문 블록을 찾지 못함",
+    )
+    return result
+
+
+def min_confidence_score() -> Optional[float]:
+    """
+    ``SELECTOR_INFERENCE_MIN_SCORE`` (기본 0.75): 휴리스틱 점수가 이 값 이상이면 LLM 분석을 생략합니다.
+    ``SELECTOR_INFERENCE=0`` 이면 None (항상 LLM)
+    """
+    if os.environ.get("SELECTOR_INFERENCE", "1").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    return float(os.environ.get("SELECTOR_INFERENCE_MIN_SCORE", "0.75"))
@@ -0,0 +1,198 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from itertools import islice
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.utils.metrics import RUNS_CANCELLED
+
+logger = logging.getLogger("LLMOps_Server")
+
+
+# ==========================================
+# 1. 스트림 실행 단위 (Run) + Ring Buffer
+# ==========================================
+class StreamRun:
+    """
+    /stream 요청 1건에 해당하는 에이전트 실행입니다.
+
+    에이전트 실행(Task)은 HTTP 응답과 분리되어 있으며, 생성된 SSE 프레임은
+    순번(seq)과 함께 최근 buffer_size 개까지 보관됩니다. 연결이 끊긴 클라이언트는
+    ``Last-Event-ID: {run_id}:{seq}`` 로 재접속하여 놓친 프레임만 다시 받을 수 있습니다.
+    구독자가 모두 떠난 뒤 resume_grace 초 안에 재접속하지 않으면 실행을 취소합니다.
+    """
+
+    def __init__(self, agent_name: str, buffer_size: int, resume_grace: float):
+        self.run_id = uuid.uuid4().hex
+        self.agent_name = agent_name
+        self.resume_grace = resume_grace
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.last_seq = 0
+        self.done = False
+        self.cancelled = False
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+        self._cancel_timer: Optional[asyncio.TimerHandle] = None
+
+    def _notify(self):
+        # 대기 중인 구독자를 깨우고, 다음 대기를 위해 새 Event로 교체합니다.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, frame: str):
+        self.last_seq += 1
+        self.buffer.append((self.last_seq, frame))
+        self._notify()
+
+    def finish(self):
+        self.done = True
+        self.finished_at = time.time()
+        self._clear_cancel_timer()
+        self._notify()
+
+    # --- 구독자 관리 / 이탈 시 취소 예약 ---
+    def attach(self):
+        self.subscribers += 1
+        self._clear_cancel_timer()
+
+    def detach(self):
+        self.subscribers -= 1
+        if self.subscribers <= 0 and not self.done:
+            self.schedule_cancel()
+
+    def schedule_cancel(self):
+        self._clear_cancel_timer()
+        if self.resume_grace <= 0:
+            self._cancel()
+        else:
+            self._cancel_timer = asyncio.get_running_loop().call_later(self.resume_grace, self._cancel)
+
+    def _clear_cancel_timer(self):
+        if self._cancel_timer is not None:
+            self._cancel_timer.cancel()
+            self._cancel_timer = None
+
+    def _cancel(self):
+        if self.task is not None and not self.task.done() and self.subscribers <= 0:
+            self.cancelled = True
+            self.task.cancel()
+
+    # --- 프레임 구독 ---
+    async def follow(self, after_seq: int, poll_interval: float) -> AsyncGenerator[Tuple[Optional[int], Optional[str]], None]:
+        """
+        after_seq 이후의 프레임을 (seq, frame) 순서대로 내보냅니다.
+        poll_interval 동안 새 프레임이 없으면 (None, None)을 내보내 호출자가 연결 상태를 확인할 수 있게 합니다.
+        버퍼에서 이미 밀려난 프레임이 있으면 replay_gap 프레임(seq=None)으로 알립니다.
+        """
+        seq = after_seq
+        while True:
+            changed = self._changed
+            if self.buffer:
+                first_seq = self.buffer[0][0]
+                if seq < first_seq - 1:
+                    missed = first_seq - 1 - seq
+                    yield None, f"data: {json.dumps({'type': 'replay_gap', 'missed': missed})}\n\n"
+                    seq = first_seq - 1
+                for frame_seq, frame in list(islice(self.buffer, seq - first_seq + 1, None)):
+                    yield frame_seq, frame
+                    seq = frame_seq
+
+            if self.done and seq >= self.last_seq:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                yield None, None
+
+
+# ==========================================
+# 2. 실행 레지스트리
+# ==========================================
+class StreamRunRegistry:
+    """
+    진행 중/최근 종료된 StreamRun을 run_id로 보관합니다.
+    종료된 실행은 retention 초가 지나면 정리되며, 전체 보관 개수는 max_runs로 제한됩니다.
+    """
+
+    def __init__(self, buffer_size: int = 2048, resume_grace: float = 15.0,
+                 retention: float = 300.0, max_runs: int = 1000):
+        self.buffer_size = buffer_size
+        self.resume_grace = resume_grace
+        self.retention = retention
+        self.max_runs = max_runs
+        self._runs: Dict[str, StreamRun] = {}
+
+    def start(self, agent_name: str, frames: AsyncGenerator[str, None],
+              on_finish: Callable[[], None] = None) -> StreamRun:
+        self._prune()
+        run = StreamRun(agent_name, self.buffer_size, self.resume_grace)
+        run.task = asyncio.create_task(self._pump(run, frames, on_finish))
+        self._runs[run.run_id] = run
+        # 응답이 시작되기 전에 클라이언트가 떠나도 실행이 남지 않도록 취소를 예약해 둡니다. (구독 시 해제)
+        if self.resume_grace > 0:
+            run.schedule_cancel()
+        return run
+
+    async def _pump(self, run: StreamRun, frames: AsyncGenerator[str, None], on_finish):
+        try:
+            async for frame in frames:
+                run.publish(frame)
+        except asyncio.CancelledError:
+            RUNS_CANCELLED.inc(agent=run.agent_name, reason="client_disconnect")
+            logger.info(f"No client attached to /{run.agent_name}/stream run {run.run_id}, agent run cancelled")
+            # 늦게 재접속한 클라이언트가 재시도를 반복하지 않도록 취소 사실과 종료 프레임을 남깁니다.
+            error = {"error": "Run cancelled: no client reconnected within the resume grace period.", "cancelled": True}
+            run.publish(f"data: {json.dumps(error)}\n\n")
+            run.publish("event: end\ndata: \n\n")
+        finally:
+            run.finish()
+            if on_finish is not None:
+                on_finish()
+
+    def resolve(self, last_event_id: str) -> Tuple[Optional[StreamRun], int]:
+        """``{run_id}:{seq}`` 형식의 Last-Event-ID를 (run, seq)로 변환합니다. 없으면 (None, 0)."""
+        run_id, _, seq = last_event_id.strip().partition(":")
+        run = self._runs.get(run_id)
+        if run is None:
+            return None, 0
+        return run, int(seq) if seq.isdigit() else 0
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            run_id for run_id, run in self._runs.items()
+            if run.done and now - run.finished_at > self.retention
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+
+        finished = sorted((run for run in self._runs.values() if run.done), key=lambda r: r.finished_at)
+        while len(self._runs) >= self.max_runs and finished:
+            del self._runs[finished.pop(0).run_id]
+
+    def stats(self) -> dict:
+        active = sum(1 for run in self._runs.values() if not run.done)
+        return {"active_runs": active, "retained_runs": len(self._runs) - active}
+
+
+async def follow_run(run: StreamRun, after_seq: int, poll_interval: float,
+                     is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncGenerator[str, None]:
+    """
+    StreamRun을 구독하여 ``id: {run_id}:{seq}`` 가 붙은 SSE 프레임을 내보냅니다.
+    새 프레임이 없는 동안 poll_interval마다 연결 상태를 확인하고, 끊기면 구독을 종료합니다.
+    """
+    run.attach()
+    try:
+        async for seq, frame in run.follow(after_seq, poll_interval):
+            if frame is None:
+                if await is_disconnected():
+                    return
+                continue
+            yield f"id: {run.run_id}:{seq}\n{frame}" if seq is not None else frame
+    finally:
+        run.detach()
@@ -2,6 +2,7 @@ import os
 import sys
 import json
 import re
+import asyncio
 from typing import Optional, Any
 from pydantic import BaseModel, Field, field_validator
 from dataclasses import dataclass
@@ -18,6 +19,14 @@ from browser_use import Agent, Browser, ChatGoogle
 # 초기 설정
 load_dotenv(override=True)
 
+# 프로젝트 루트의 app 패키지(LLM 응답 캐시 등)를 사용하기 위해 경로 추가
+sys.path.append(os.getenv("PROJECT_ROOT", os.getcwd()))
+from app.utils.llm_cache import get_llm_cache
+from app.utils.blueprint_cache import get_blueprint_cache
+from app.utils.page_snapshots import fetch_page
+from app.utils.html_condenser import condense_html, default_max_tokens
+from app.utils.selector_inference import infer_selectors, min_confidence_score, SELECTOR_INFERENCE_RESULTS
+
 # 작업 파일들이 모일 디렉토리
 ARTIFACT_DIR = os.path.join(os.getenv("PROJECT_ROOT", os.getcwd()), "code_artifacts")
 os.makedirs(ARTIFACT_DIR, exist_ok=True)
@@ -126,14 +135,14 @@ def save_blueprints(collection: NavigatorBlueprintCollection, prefix: str):
 # ==========================================
 @tool(parse_docstring=True)
 async def get_page_structure(url: str, scraping_goal: str) -> str:
-    """웹페이지 HTML을 내부 LLM이 직접 분석하여 CSS 셀렉터 결과만 반환합니다.
+    """웹페이지 HTML을 분석하여 CSS 셀렉터 결과만 반환합니다.
     Navigator는 HTML 원문을 볼 필요 없이 셀렉터 분석 결과만 받습니다.
+    뉴스 목록/상품 그리드/기사 본문처럼 전형적인 구조는 DOM 통계로 바로 분석하고("source": "heuristic"), 확신도가 낮을 때만 내부 LLM이 분석합니다.
 
     Args:
         url: 분석할 웹페이지 URL
         scraping_goal: 수집하려는 데이터 설명. 예) "기사 제목과 링크 URL", "상품명과 가격"
     """
-    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
     from langchain.chat_models import init_chat_model
     from langchain_core.messages import HumanMessage
     import re
@@ -141,41 +150,45 @@ async def get_page_structure(url: str, scraping_goal: str) -> str:
     print(f"\n📐 [get_page_structure] {url}")
     print(f"   🎯 분석 목표: {scraping_goal}")
 
-    browser_cfg = BrowserConfig(headless=True, java_script_enabled=True)
-    run_cfg = CrawlerRunConfig(
-        cache_mode=CacheMode.BYPASS,
-        page_timeout=15000,
-        delay_before_return_html=3.0,
-        wait_for_images=False,
-    )
-
+    # 렌더링된 HTML은 스냅샷 캐시를 거쳐 가져옵니다. (같은 URL의 verify_selectors_with_samples는 다시 렌더링하지 않음)
     try:
-        async with AsyncWebCrawler(config=browser_cfg) as crawler:
-            result = await crawler.arun(url=url, config=run_cfg)
+        raw_html = (await fetch_page(url))["html"]
     except Exception as e:
         return f"[Error] HTML 수집 실패: {e}\n→ browse_web을 사용하세요."
 
-    from bs4 import BeautifulSoup
-
-    raw_html = result.html or ""
-    soup = BeautifulSoup(raw_html, "html.parser")
-    
-    # CSS 셀렉터를 찾는 데 전혀 필요 없는 태그들(스크립트, 스타일, SVG 아이콘 등) 싹 제거
-    for tag in soup(["script", "style", "noscript", "svg", "path", "header", "footer"]):
-        tag.decompose()
-        
-    # HTML 구조와 class, id는 그대로 살아있는 깨끗한 뼈대 추출
-    structured_html = soup.prettify()
+    # 반복 항목/본문 블록을 DOM 통계로 먼저 추정하고, 점수가 SELECTOR_INFERENCE_MIN_SCORE 이상이면 LLM을 부르지 않습니다.
+    inferred = await asyncio.to_thread(infer_selectors, raw_html, scraping_goal)
+    min_score = min_confidence_score()
+    if min_score is not None and inferred["score"] >= min_score:
+        SELECTOR_INFERENCE_RESULTS.inc(result="heuristic")
+        print(f"   ⚡ 휴리스틱 셀렉터: {inferred['selectors']} / score={inferred['score']} (LLM 생략)")
+        return json.dumps(inferred, ensure_ascii=False, indent=2)
+    SELECTOR_INFERENCE_RESULTS.inc(result="llm")
+    print(f"   🤔 휴리스틱 확신도 낮음 (score={inferred['score']}) → LLM 분석")
+
+    # 반복 형제 접기 + 텍스트/속성 정리로 HTML을 토큰 예산(HTML_CONDENSE_MAX_TOKENS) 안에 맞춥니다.
+    structured_html, report = condense_html(raw_html, max_tokens=default_max_tokens())
+    print(f"   📉 HTML 축약: {report['original_tokens']:,} → {report['condensed_tokens']:,} tokens "
+          f"(x{report['ratio']}, 접힌 반복 그룹 {report['collapsed_groups']}개)")
 
     if not structured_html.strip():
         return "[Warning] HTML이 비어 있습니다. JS 렌더링 실패 가능성.\n→ browse_web을 사용하세요."
 
-    analysis_llm = init_chat_model("google_genai:gemini-flash-latest", temperature=0)
+    # 같은 페이지/목표의 재분석은 LLM_CACHE=1이면 디스크 캐시에서 즉시 반환됩니다.
+    analysis_llm = init_chat_model("google_genai:gemini-flash-latest", temperature=0, cache=get_llm_cache())
+
+    # 규칙 기반 후보가 있으면 참고용으로 함께 넘깁니다. (그대로 믿지 말고 HTML로 확인)
+    hint = ""
+    if inferred["selectors"]:
+        hint = (f"    [참고: 규칙 기반 후보 - 확신도 낮음({inferred['note']}), HTML로 확인 후 사용]\n"
+                f"    {json.dumps({k: inferred[k] for k in ('selectors', 'container', 'item', 'navigate_to_next', 'next_page')}, ensure_ascii=False)}\n")
 
     analysis_prompt = f"""아래 HTML에서 "{scraping_goal}"에 해당하는 요소의 CSS 셀렉터를 찾고 JSON으로만 응답하세요.
     [분석할 HTML]
+    (축약본입니다. "[×N more li.item]" 표시는 바로 앞 요소와 같은 tag+class 구조의 형제가 N개 더 있다는 뜻이니, 반복 목록의 셀렉터는 앞의 대표 요소 기준으로 작성하세요.
+    "…" 로 끝나는 텍스트/URL은 잘린 값입니다.)
     {structured_html}
-    [응답 형식 - JSON만, 다른 텍스트 없이]
+{hint}    [응답 형식 - JSON만, 다른 텍스트 없이]
     {{
     "selectors": {{
         "필드명": "CSS셀렉터"
@@ -184,8 +197,10 @@ async def get_page_structure(url: str, scraping_goal: str) -> str:
         "필드명": ["실제 텍스트 예시 1", "실제 텍스트 예시 2", "실제 텍스트 예시 3"]
     }},
     "container": "목록 전체를 감싸는 컨테이너 셀렉터 (없으면 null)",
+    "item": "컨테이너 안에서 반복되는 항목 1개의 셀렉터 (없으면 null)",
     "navigate_to_next": "다음 계층(상세 페이지)으로 이동하는 링크 셀렉터 (없으면 null)",
     "pagination": "페이지네이션 방식 (URL파라미터/AJAX버튼/무한스크롤/null)",
+    "next_page": "다음 목록 페이지로 가는 링크/더보기 버튼 셀렉터 (없으면 null)",
     "confidence": "high 또는 medium 또는 low",
     "note": "주의사항. 확인된 경우 '없음'"
     }}
@@ -225,16 +240,16 @@ async def get_page_structure(url: str, scraping_goal: str) -> str:
 # 도구 3: verify_selectors_with_samples
 # ==========================================
 @tool(parse_docstring=True)
-async def verify_selectors_with_samples(url: str, selectors_json: str) -> str:
-    """주어진 CSS 셀렉터들이 해당 URL의 웹페이지에서 실제로 어떤 데이터를 추출하는지 검증하고 (최대 5개 샘플 반환), 이를 통해 셀렉터의 정확성을 평가합니다. get_page_structure로 찾은 셀렉터 후보를 검증할 때 필수적으로 사용하세요.
+async def verify_selectors_with_samples(url: str, selectors_json: str, refresh: bool = False) -> str:
+    """주어진 CSS 셀렉터들을 해당 URL의 렌더링 스냅샷(get_page_structure가 렌더링한 HTML)에 적용해 어떤 데이터를 추출하는지 검증하고 (최대 5개 샘플 반환), 이를 통해 셀렉터의 정확성을 평가합니다. get_page_structure로 찾은 셀렉터 후보를 검증할 때 필수적으로 사용하세요.
 
     Args:
         url: 검증할 웹페이지 URL
-        selectors_json: 검증할 셀렉터 딕셔너리를 포함하는 유효한 JSON 문자열. 예) '{"title": "a.sa_text_title", "link": "a.sa_text_title::attr(href)"}'
+        selectors_json: 검증할 셀렉터 딕셔너리를 포함하는 유효한 JSON 문자열. CSS 셀렉터만 지원하며 XPath는 "unsupported selector"로 보고됩니다. 예) '{"title": "a.sa_text_title", "link": "a.sa_text_title::attr(href)"}'
+        refresh: True면 저장된 스냅샷 대신 페이지를 새로 렌더링해서 검증합니다. 셀렉터를 고친 뒤에도 결과가 이상하거나, 페이지 내용이 바뀌었을 수 있을 때 사용하세요.
     """
     import json
     import re
-    from playwright.async_api import async_playwright
     
     print(f"\n🔍 [verify_selectors] {url}")
     try:
@@ -244,47 +259,63 @@ async def verify_selectors_with_samples(url: str, selectors_json: str) -> str:
     
     print(f"   🎯 검증 대상 셀렉터: {selectors_dict}")
     results = {key: [] for key in selectors_dict.keys()}
-    
+    errors = {}
+
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            await page.wait_for_timeout(2000) # JS 렌더링 대기
-            
-            for key, selector in selectors_dict.items():
-                actual_selector = selector
-                attr_name = ""
-                is_attr = "::attr(" in selector
-                if is_attr:
-                    match = re.search(r'(.*?)::attr\((.*?)\)', selector)
-                    if match:
-                        actual_selector = match.group(1).strip()
-                        attr_name = match.group(2).strip()
-                
-                elements = await page.query_selector_all(actual_selector)
-                
-                for el in elements[:5]: # 상위 5개 요소만
-                    if is_attr and attr_name:
-                        val = await el.get_attribute(attr_name)
-                    else:
-                        val = await el.text_content()
-                    
-                    if val:
-                        results[key].append(val.strip())
-            
-            await browser.close()
-            
-            output = []
-            for k, v in results.items():
-                output.append(f"[{k}] 매칭 항목 수: {len(v)}개 | 추출된 샘플: {v}")
-            return "\n".join(output)
-            
+        # get_page_structure가 렌더링한 스냅샷을 그대로 재사용합니다. (없거나 refresh=True면 새로 렌더링)
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup((await fetch_page(url, refresh=refresh))["html"], "html.parser")
     except Exception as e:
-        return f"[Error] 브라우저 셀렉터 검증 중 오류 발생: {str(e)}"
+        return f"[Error] 페이지 스냅샷을 가져오지 못해 셀렉터를 검증할 수 없습니다: {str(e)}"
+
+    # 브라우저의 inner_text처럼 보이는 텍스트만 샘플로 쓰도록 스크립트/스타일과 숨김 요소를 뺍니다.
+    # (CSS 파일로 숨긴 요소는 스냅샷만으로 알 수 없으므로 그대로 남습니다.)
+    for tag in soup.find_all(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    for tag in soup.find_all(lambda t: t.has_attr("hidden") or t.get("aria-hidden") == "true"
+                             or re.search(r"display\s*:\s*none|visibility\s*:\s*hidden", t.get("style") or "")):
+        tag.decompose()
+
+    # 선택자마다 따로 검증하여, 잘못된 선택자 하나가 나머지 결과까지 막지 않도록 합니다.
+    for key, selector in selectors_dict.items():
+        selector = str(selector or "").strip()
+        if selector.startswith(("/", "(", "xpath=")):
+            errors[key] = "unsupported selector (XPath는 지원하지 않습니다. CSS 셀렉터로 바꾸세요)"
+            continue
+
+        actual_selector = re.sub(r'::text\s*$', '', selector)
+        attr_name = ""
+        is_attr = "::attr(" in selector
+        if is_attr:
+            match = re.search(r'(.*?)::attr\((.*?)\)', selector)
+            if match:
+                actual_selector = match.group(1).strip()
+                attr_name = match.group(2).strip()
+
+        try:
+            elements = soup.select(actual_selector, limit=5) # 상위 5개 요소만
+        except Exception as e:
+            errors[key] = f"unsupported selector ({e})"
+            continue
+
+        for el in elements:
+            if is_attr and attr_name:
+                val = el.get(attr_name)
+                val = " ".join(val) if isinstance(val, list) else val
+            else:
+                val = " ".join(el.get_text(" ").split())
+
+            if val:
+                results[key].append(val.strip())
+
+    output = []
+    for k, v in results.items():
+        if k in errors:
+            output.append(f"[{k}] {errors[k]}")
+        else:
+            output.append(f"[{k}] 매칭 항목 수: {len(v)}개 | 추출된 샘플: {v}")
+    return "\n".join(output)
 
 
 # ==========================================
@@ -356,10 +387,12 @@ NAVIGATOR_SYSTEM_PROMPT = """
 ■ get_page_structure(url, scraping_goal)
   - 가장 빠르고 토큰 비용이 저렴한 주력 분석 도구입니다.
   - 브라우저를 시각적으로 띄우지 않고 백그라운드에서 HTML 전체를 분석하여 CSS 셀렉터 후보를 찾아냅니다.
+  - 결과에 "source": "heuristic" 이 있으면 LLM 없이 반복 구조 통계로 찾은 셀렉터입니다. score/note와 samples를 보고 verify_selectors_with_samples로 검증하세요.
 
-■ verify_selectors_with_samples(url, selectors_json)
+■ verify_selectors_with_samples(url, selectors_json, refresh=False)
   - [필수 사용] get_page_structure가 찾아낸 셀렉터 후보가 실제로 유효한지 검증하는 강력한 도구입니다.
-  - 이 도구는 실제 브라우저를 띄워 입력받은 CSS 셀렉터를 즉시 적용해보고 최대 5개의 실제 추출된 리얼 데이터를 반환합니다.
+  - 이 도구는 get_page_structure가 렌더링해 둔 페이지 스냅샷(HTML)에 입력받은 CSS 셀렉터를 적용해보고 최대 5개의 실제 추출된 데이터를 반환합니다. (브라우저를 다시 띄우지 않음)
+  - 스냅샷은 일정 시간 재사용되므로, 셀렉터를 고친 뒤에도 결과가 이상하거나 페이지가 바뀌었을 수 있으면 refresh=True로 새로 렌더링해서 검증하세요.
   - 샘플 데이터 배열이 비어있거나([]), "None" 이거나, 잘못된 값이라면 그 셀렉터는 실패한 것입니다. 즉시 셀렉터를 수정하여 다시 검증하거나 다른 도구를 사용해야 합니다.
 
 ■ browse_web(runtime, url, instruction)
@@ -411,3 +444,29 @@ navigator_agent = create_agent(
     checkpointer=nav_checkpointer,
     response_format=ToolStrategy(NavigatorBlueprintCollection),
 )
+
+
+# ==========================================
+# Blueprint 캐시를 거치는 실행 헬퍼
+# ==========================================
+async def run_navigator_cached(url: str, scraping_goal: str, config: dict, context: NavigatorContext) -> NavigatorBlueprintCollection:
+    """
+    (URL 패턴, 수집 목표)로 캐시된 Blueprint 묶음이 있고 진입 페이지에서 셀렉터가 여전히 매칭되면
+    navigator_agent를 실행하지 않고 바로 반환합니다. 그 외에는 에이전트를 실행하고 결과를 캐시에 저장합니다.
+    """
+    cache = get_blueprint_cache()
+    if cache is not None:
+        cached = await cache.lookup(url, scraping_goal)
+        if cached is not None:
+            print(f"  ♻️ 캐시된 Blueprint 재사용: {url}")
+            return NavigatorBlueprintCollection.model_validate(cached)
+
+    response = await navigator_agent.ainvoke(
+        {"messages": [HumanMessage(f"{url} 에서 {scraping_goal}")]},
+        config=config,
+        context=context,
+    )
+    collection: NavigatorBlueprintCollection = response["structured_response"]
+    if cache is not None:
+        cache.store(url, scraping_goal, collection.model_dump())
+    return collection
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# 프로젝트 루트의 app 패키지를 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 테스트 중 만들어지는 SQLite 저장소가 저장소(data/)를 더럽히지 않도록 임시 디렉토리로 보냅니다.
+_TMP_DIR = tempfile.mkdtemp(prefix="llmops-tests-")
+for _name, _file in (
+    ("JOB_DB_PATH", "jobs.sqlite"),
+    ("LLM_CACHE_PATH", "llm_cache.sqlite"),
+    ("PAGE_SNAPSHOT_CACHE_PATH", "page_snapshots.sqlite"),
+    ("BLUEPRINT_CACHE_PATH", "blueprint_cache.sqlite"),
+):
+    os.environ.setdefault(_name, os.path.join(_TMP_DIR, _file))
@@ -0,0 +1,60 @@
+import os
+
+from app.utils.artifacts import CHART_EXTENSIONS, DATA_EXTENSIONS, ArtifactStore
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def test_put_text_is_content_addressed(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    first = store.put_text('{"a": 1}', "blueprint", ".json")
+    second = store.put_text('{"a": 1}', "blueprint", ".json")
+    other = store.put_text('{"a": 2}', "blueprint", ".json")
+
+    assert first["handle"] == second["handle"]
+    assert first["handle"] != other["handle"]
+    assert store.read_text(first["handle"]) == '{"a": 1}'
+
+
+def test_resolve_handles_in_text(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    artifact = store.put_text("본문", "blueprint", ".txt")
+    handle = artifact["handle"]
+
+    assert store.resolve_content(handle) == "본문"
+    assert store.resolve_paths(f"파일: {handle}") == f"파일: {store.get(handle)['path']}"
+    # 모르는 handle이나 일반 텍스트는 그대로 둡니다.
+    assert store.resolve_content("그냥 텍스트") == "그냥 텍스트"
+
+
+def test_collect_only_reads_given_directory(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    run_a = tmp_path / "runs" / "coder-a"
+    run_b = tmp_path / "runs" / "coder-b"
+    _write(str(run_a / "items.csv"), "a\n1\n")
+    _write(str(run_a / "crawler.py"), "print('x')")
+    _write(str(run_b / "items.csv"), "b\n2\n")
+    _write(str(tmp_path / "runs" / "stray.json"), "{}")
+
+    collected = store.collect(str(run_a), "data", DATA_EXTENSIONS)
+
+    assert [a["name"] for a in collected] == ["items.csv"]
+    assert store.read_text(collected[0]["handle"]) == "a\n1\n"
+    assert store.collect(str(run_a), "chart", CHART_EXTENSIONS) == []
+    assert store.collect(str(tmp_path / "missing"), "data", DATA_EXTENSIONS) == []
+
+
+def test_collect_since_skips_older_files(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    old = _write(str(tmp_path / "run" / "old.csv"), "old")
+    _write(str(tmp_path / "run" / "new.csv"), "new")
+    os.utime(old, (1000, 1000))
+
+    collected = store.collect(str(tmp_path / "run"), "data", DATA_EXTENSIONS, since=2000)
+
+    assert [a["name"] for a in collected] == ["new.csv"]
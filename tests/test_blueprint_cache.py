@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.utils import blueprint_cache as blueprint_cache_module
+from app.utils.blueprint_cache import BlueprintCache, normalize_goal
+
+URL = "https://shop.example.com/list/123"
+GOAL = "상품 이름 수집"
+BLUEPRINT = {"target_url": URL, "element_selectors": {"name": "li.item .name"}}
+
+STATIC_HTML = "<html><body><div id='app'></div></body></html>"
+RENDERED_HTML = "<ul><li class='item'><span class='name'>A</span></li></ul>"
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """render 모드별 샘플 HTML과 요청 기록"""
+    state = {"http": STATIC_HTML, "browser": RENDERED_HTML, "calls": []}
+
+    async def fake_fetch(url, timeout=10.0, render="http"):
+        state["calls"].append(render)
+        return state[render]
+
+    monkeypatch.setattr(blueprint_cache_module, "fetch_sample_html", fake_fetch)
+    return state
+
+
+def _cache(tmp_path):
+    cache = BlueprintCache(str(tmp_path / "blueprints.sqlite"))
+    cache.store(URL, GOAL, BLUEPRINT)
+    return cache
+
+
+def test_js_rendered_page_falls_back_to_browser(tmp_path, pages):
+    cache = _cache(tmp_path)
+
+    assert asyncio.run(cache.lookup(URL, GOAL)) == BLUEPRINT
+    assert pages["calls"] == ["http", "browser"]
+
+    # 브라우저로 통과한 항목은 다음 재검증부터 바로 브라우저를 씁니다.
+    pages["calls"].clear()
+    assert asyncio.run(cache.lookup(URL, GOAL)) == BLUEPRINT
+    assert pages["calls"] == ["browser"]
+
+
+def test_static_page_skips_browser(tmp_path, pages):
+    pages["http"] = RENDERED_HTML
+    cache = _cache(tmp_path)
+
+    assert asyncio.run(cache.lookup(URL, GOAL)) == BLUEPRINT
+    assert pages["calls"] == ["http"]
+
+
+def test_stale_after_browser_check_is_evicted(tmp_path, pages):
+    pages["browser"] = "<ul><li class='product'>A</li></ul>"
+    cache = _cache(tmp_path)
+
+    assert asyncio.run(cache.lookup(URL, GOAL)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_fetch_failure_keeps_entry(tmp_path, pages):
+    pages["http"] = None
+    cache = _cache(tmp_path)
+
+    assert asyncio.run(cache.lookup(URL, GOAL)) is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_goal_key_ignores_analysis_wording_and_phrasing():
+    same = [
+        f"{URL} 에서 상품명과 가격을 수집하고 차트로 시각화해줘",
+        f"{URL} 상품명, 가격 긁어와서 분석해줘",
+        f"{URL} 가격과 상품명을 수집해줘",
+    ]
+    assert {normalize_goal(text) for text in same} == {"가격 상품명"}
+    assert normalize_goal(f"{URL} 상품명과 리뷰 수를 수집") != normalize_goal(same[0])
+
+
+def test_reworded_request_hits_the_cache(tmp_path, pages):
+    pages["http"] = RENDERED_HTML
+    cache = BlueprintCache(str(tmp_path / "blueprints.sqlite"))
+    cache.store(URL, f"{URL} 상품 이름 수집하고 차트로 시각화해줘", BLUEPRINT)
+
+    assert asyncio.run(cache.lookup(URL, f"{URL} 상품 이름 긁어와서 분석해줘")) == BLUEPRINT
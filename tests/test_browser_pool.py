@@ -0,0 +1,111 @@
+import asyncio
+import subprocess
+import sys
+
+from app.utils import browser_pool as browser_pool_module
+from app.utils.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+
+class FakeBrowserUse:
+    def __init__(self):
+        self.killed = False
+
+    async def kill(self):
+        self.killed = True
+
+
+def _pool(size=1, **kwargs) -> BrowserPool:
+    """Chromium 대신 가짜 브라우저를 꽂은, 이미 시작된 풀"""
+    pool = BrowserPool(size=size, recycle_after_pages=0, **kwargs)
+    for slot in pool._slots:
+        slot.browser = FakeBrowser()
+        slot.cdp_url = f"http://127.0.0.1:{9200 + slot.index}"
+    pool._started = True
+    return pool
+
+
+def test_cdp_leases_get_exclusive_browsers():
+    async def scenario():
+        pool = _pool(size=1)
+        order = []
+
+        async def use(name, cdp):
+            async with pool.lease(cdp=cdp):
+                order.append(f"{name}:start")
+                await asyncio.sleep(0.05)
+                order.append(f"{name}:end")
+
+        await asyncio.gather(use("a", True), use("b", True), use("plain", False))
+        return order
+
+    order = asyncio.run(scenario())
+    # CDP 대여 둘은 겹치지 않고, 일반 context 대여는 그 사이에도 실행됩니다.
+    assert order.index("a:end") < order.index("b:start")
+    assert order.index("plain:start") < order.index("a:end")
+
+
+def test_cdp_lease_reclaims_idle_session_and_stops_browser_use():
+    async def scenario():
+        pool = _pool(size=1)
+        async with pool.lease(thread_id="t1", cdp=True) as lease:
+            browser_use = lease.state["browser_use"] = FakeBrowserUse()
+        async with pool.lease(cdp=True) as other:
+            assert other.thread_id is None
+        return pool, browser_use
+
+    pool, browser_use = asyncio.run(scenario())
+    assert browser_use.killed
+    assert pool.stats()["sessions"] == 0
+
+
+def test_expired_session_stops_browser_use():
+    async def scenario():
+        pool = _pool(size=1, session_idle_seconds=0)
+        async with pool.lease(thread_id="t1", cdp=True) as lease:
+            browser_use = lease.state["browser_use"] = FakeBrowserUse()
+        await asyncio.sleep(0.01)
+        async with pool.lease():
+            pass
+        return browser_use
+
+    assert asyncio.run(scenario()).killed
+
+
+def test_loop_change_kills_previous_pool(monkeypatch):
+    monkeypatch.setattr(browser_pool_module, "_pool", None)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        async def get_pool():
+            return browser_pool_module.get_browser_pool()
+
+        first = asyncio.run(get_pool())
+        first._slots[0].pid = child.pid
+        first._started = True
+
+        second = asyncio.run(get_pool())
+        assert second is not first
+        assert child.wait(timeout=5) != 0
+        assert not first._started
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,95 @@
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from app.utils import checkpointer as checkpointer_module
+from app.utils.checkpointer import BoundedMemorySaver, BoundedSqliteSaver
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _agent(saver):
+    def respond(state: MessagesState):
+        return {"messages": [AIMessage(content="ok")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("respond", respond)
+    graph.add_edge(START, "respond")
+    graph.add_edge("respond", END)
+    return graph.compile(checkpointer=saver)
+
+
+def _run(agent, thread_id):
+    agent.invoke({"messages": [("user", "hi")]}, {"configurable": {"thread_id": thread_id}})
+
+
+def _has_thread(saver, thread_id):
+    return saver.get_tuple({"configurable": {"thread_id": thread_id}}) is not None
+
+
+def test_memory_saver_evicts_least_recently_used_thread(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(checkpointer_module.time, "time", clock)
+    saver = BoundedMemorySaver(max_threads=2)
+    agent = _agent(saver)
+    for thread_id in ("t1", "t2"):
+        _run(agent, thread_id)
+        clock.now += 1
+    assert _has_thread(saver, "t1") # t1이 가장 최근 사용으로 바뀜
+    clock.now += 1
+    _run(agent, "t3")
+
+    assert not _has_thread(saver, "t2")
+    assert _has_thread(saver, "t1") and _has_thread(saver, "t3")
+
+
+def test_memory_saver_expires_threads_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(checkpointer_module.time, "time", clock)
+    saver = BoundedMemorySaver(max_threads=100, ttl_seconds=60)
+    agent = _agent(saver)
+    _run(agent, "old")
+    clock.now += 61
+    _run(agent, "new")
+
+    assert not _has_thread(saver, "old")
+    assert _has_thread(saver, "new")
+
+
+def test_sqlite_eviction_uses_access_times_shared_between_processes(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(checkpointer_module.time, "time", clock)
+    path = str(tmp_path / "agent.sqlite")
+    # 같은 DB 파일을 쓰는 두 워커 프로세스를 흉내 냅니다.
+    worker_a = BoundedSqliteSaver(path, max_threads=2)
+    worker_b = BoundedSqliteSaver(path, max_threads=2)
+    agent_a = _agent(worker_a)
+    for thread_id in ("t1", "t2"):
+        _run(agent_a, thread_id)
+        clock.now += 1
+    # 워커 B가 t1을 방금 사용 -> 워커 A의 퇴출 대상은 t1이 아니라 t2여야 합니다.
+    assert _has_thread(worker_b, "t1")
+    clock.now += 1
+    _run(agent_a, "t3")
+
+    assert not _has_thread(worker_b, "t2")
+    assert _has_thread(worker_b, "t1") and _has_thread(worker_b, "t3")
+    assert worker_a.evicted == 1
+
+
+def test_sqlite_saver_expires_threads_after_ttl(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(checkpointer_module.time, "time", clock)
+    saver = BoundedSqliteSaver(str(tmp_path / "agent.sqlite"), max_threads=100, ttl_seconds=60)
+    agent = _agent(saver)
+    _run(agent, "old")
+    clock.now += 61
+    _run(agent, "new")
+
+    assert not _has_thread(saver, "old")
+    assert _has_thread(saver, "new")
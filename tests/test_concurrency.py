@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.utils.concurrency import AdmissionRejected, AgentLimiter, parse_agent_limits
+
+DEFAULTS = {"navigator": 2, "coder": 2, "supervisor": 4}
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, DEFAULTS),
+    ("", DEFAULTS),
+    ("navigator=1", {"navigator": 1, "coder": 2, "supervisor": 4}),
+    ("*=8", {"navigator": 8, "coder": 8, "supervisor": 8}),
+    # 명시한 값이 와일드카드보다 우선하고, 순서는 상관없습니다.
+    ("navigator=1,*=8", {"navigator": 1, "coder": 8, "supervisor": 8}),
+    ("*=8, navigator = 1", {"navigator": 1, "coder": 8, "supervisor": 8}),
+    # defaults에 없는 에이전트도 추가됩니다.
+    ("analyst=3", {**DEFAULTS, "analyst": 3}),
+    # 형식이 틀린 항목은 무시합니다.
+    ("navigator, coder=x, supervisor=-1", DEFAULTS),
+])
+def test_parse_agent_limits(value, expected):
+    assert parse_agent_limits(value, DEFAULTS) == expected
+
+
+def test_parse_agent_limits_does_not_mutate_defaults():
+    defaults = dict(DEFAULTS)
+    parse_agent_limits("*=1", defaults)
+
+    assert defaults == DEFAULTS
+
+
+def test_limiter_rejects_when_queue_is_full_or_times_out():
+    async def scenario():
+        limiter = AgentLimiter("navigator", max_concurrency=1, max_queue=1, queue_timeout=0.05)
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as full:
+            await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as timeout:
+            await waiting
+        return limiter, full.value, timeout.value
+
+    limiter, full, timeout = asyncio.run(scenario())
+    assert full.status_code == 429 and full.retry_after >= 1
+    assert timeout.status_code == 503
+    stats = limiter.stats()
+    assert stats["in_flight"] == 1 and stats["queue_depth"] == 0
+    assert stats["rejected_queue_full"] == 1 and stats["rejected_timeout"] == 1
+
+
+def test_limiter_bounds_a_simultaneous_burst():
+    async def scenario():
+        limiter = AgentLimiter("navigator", max_concurrency=2, max_queue=4, queue_timeout=1.0)
+
+        async def call():
+            async with limiter.slot():
+                await asyncio.sleep(0.01)
+
+        return await asyncio.gather(*(call() for _ in range(20)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    rejected = [r for r in results if isinstance(r, AdmissionRejected)]
+    assert len(results) - len(rejected) == 6
+    assert {r.status_code for r in rejected} == {429}
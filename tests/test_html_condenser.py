@@ -0,0 +1,46 @@
+from app.utils.html_condenser import condense_html, estimate_tokens
+
+
+def _list_page(n: int = 20) -> str:
+    items = "".join(
+        f'<li class="item css-1a2b3c"><a class="title" href="/news/{i}?utm_source={"x" * 200}">기사 제목 {i}</a>'
+        f'<span class="date">2024-01-{i % 28 + 1:02d}</span><!-- 광고 --></li>'
+        for i in range(n)
+    )
+    return (
+        "<html><head><title>뉴스</title><style>.a{color:red}</style><script>var a = 1;</script></head>"
+        f'<body><div id="ember123" class="wrap"><ul class="list">{items}</ul>'
+        '<div class="empty"><span></span></div></div></body></html>'
+    )
+
+
+def test_collapses_repeated_siblings_and_strips_noise():
+    condensed, report = condense_html(_list_page(), max_tokens=6000)
+
+    assert condensed.count('<li class="item">') == 2
+    assert "[×18 more li.css-1a2b3c.item]" in condensed
+    # 스크립트/스타일/주석, 빌드마다 바뀌는 class/id, 빈 요소는 지웁니다.
+    assert "<script" not in condensed and "<style" not in condensed and "광고" not in condensed
+    assert "css-1a2b3c" not in condensed.replace("[×18 more li.css-1a2b3c.item]", "")
+    assert "ember123" not in condensed and "empty" not in condensed
+    # 긴 URL은 잘리고, 셀렉터에 필요한 class/href는 남습니다.
+    assert 'href="/news/0?utm_source=' in condensed and "…" in condensed
+    assert report["collapsed_groups"] == 1 and report["level"] == 0
+    assert report["condensed_chars"] < report["original_chars"]
+
+
+def test_escalates_levels_and_truncates_to_budget():
+    html = "<body>" + "".join(f'<div class="block{i}"><p>{"긴 본문 " * 50}</p></div>' for i in range(60)) + "</body>"
+
+    condensed, report = condense_html(html, max_tokens=300)
+
+    assert report["level"] == 3
+    assert condensed.endswith("<!-- truncated -->")
+    assert estimate_tokens(condensed) <= 320
+
+
+def test_empty_html():
+    condensed, report = condense_html("", max_tokens=100)
+
+    assert condensed == ""
+    assert report["collapsed_groups"] == 0
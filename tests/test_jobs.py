@@ -0,0 +1,112 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.utils.jobs import CANCELLED, FAILED, INTERRUPTED, QUEUED, RUNNING, SUCCEEDED, JobManager, JobStore
+
+
+async def _wait_for(store, job_id, statuses, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job stuck in {job['status']}"
+        await asyncio.sleep(0.01)
+
+
+def test_job_succeeds_and_records_progress(tmp_path):
+    async def runner(job, report_progress):
+        report_progress({"step": 1})
+        return f"done: {job['message']}"
+
+    async def scenario():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), runner)
+        job = await manager.submit("basic", "hello", thread_id="t1")
+        assert job["status"] == QUEUED and job["owner"] == manager.owner
+        return await _wait_for(manager.store, job["job_id"], (SUCCEEDED,))
+
+    job = asyncio.run(scenario())
+    assert job["result"] == "done: hello"
+    assert job["progress"] == {"step": 1}
+    assert job["thread_id"] == "t1"
+    assert job["started_at"] and job["finished_at"]
+
+
+def test_failed_and_cancelled_jobs(tmp_path):
+    release = None
+
+    async def runner(job, report_progress):
+        if job["message"] == "boom":
+            raise RuntimeError("exploded")
+        await release.wait()
+        return "never"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), runner)
+        failing = await manager.submit("basic", "boom")
+        slow = await manager.submit("basic", "slow")
+        failed = await _wait_for(manager.store, failing["job_id"], (FAILED,))
+        await _wait_for(manager.store, slow["job_id"], (RUNNING,))
+        await manager.cancel(slow["job_id"])
+        cancelled = await _wait_for(manager.store, slow["job_id"], (CANCELLED,))
+        return failed, cancelled
+
+    failed, cancelled = asyncio.run(scenario())
+    assert failed["error"] == "exploded"
+    assert cancelled["cancel_requested"] is True
+
+
+def test_startup_only_interrupts_jobs_of_stopped_workers(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+
+    async def runner(job, report_progress):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        # 워커 A: 작업 실행 중 / 비정상 종료된 워커: heartbeat 없이 남은 작업
+        worker_a = JobManager(JobStore(path), runner)
+        await worker_a.start()
+        live = await worker_a.submit("basic", "live")
+        await _wait_for(worker_a.store, live["job_id"], (RUNNING,))
+        orphan = worker_a.store.create("basic", "orphan", owner="dead-host:1:deadbeef")
+        legacy = worker_a.store.create("basic", "legacy") # owner 컬럼이 없던 시절의 작업
+
+        # 같은 DB를 쓰는 워커 B가 기동
+        worker_b = JobManager(JobStore(path), runner)
+        interrupted = await worker_b.start()
+        statuses = {name: worker_b.store.get(job["job_id"])["status"]
+                    for name, job in (("live", live), ("orphan", orphan), ("legacy", legacy))}
+        await worker_a.stop()
+        await worker_b.stop()
+        return interrupted, statuses
+
+    interrupted, statuses = asyncio.run(scenario())
+    assert interrupted == 2
+    assert statuses == {"live": RUNNING, "orphan": INTERRUPTED, "legacy": INTERRUPTED}
+
+
+def test_stale_heartbeat_marks_worker_jobs_interrupted(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    store.heartbeat("crashed")
+    job = store.create("basic", "m", owner="crashed")
+    store._conn.execute("UPDATE job_owners SET heartbeat = heartbeat - 100 WHERE owner = 'crashed'")
+    store._conn.commit()
+
+    assert store.mark_interrupted(owner_timeout=30) == 1
+    assert store.get(job["job_id"])["status"] == INTERRUPTED
+
+
+def test_importing_server_does_not_create_job_store(tmp_path):
+    db_path = tmp_path / "jobs.sqlite"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run(
+        [sys.executable, "-c", "import app.server"],
+        cwd=root, env={**os.environ, "JOB_DB_PATH": str(db_path)}, check=True, capture_output=True,
+    )
+
+    assert not db_path.exists()
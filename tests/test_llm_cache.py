@@ -0,0 +1,47 @@
+from langchain_core.outputs import Generation
+
+from app.utils import llm_cache as llm_cache_module
+from app.utils.llm_cache import PersistentLLMCache
+
+
+def _answer(text):
+    return [Generation(text=text)]
+
+
+def test_lookup_returns_stored_generations_per_llm_string(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"))
+    cache.update("prompt", "model-a temperature=0", _answer("A"))
+
+    assert cache.lookup("prompt", "model-a temperature=0")[0].text == "A"
+    assert cache.lookup("prompt", "model-a temperature=0.7") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now[0])
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.update("prompt", "llm", _answer("A"))
+    now[0] += 61
+
+    assert cache.lookup("prompt", "llm") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_entries_over_max_bytes(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now[0])
+    probe = PersistentLLMCache(str(tmp_path / "probe.sqlite"))
+    probe.update("p", "llm", _answer("x" * 100))
+    entry_size = probe.stats()["bytes"]
+    cache = PersistentLLMCache(str(tmp_path / "cache.sqlite"), max_bytes=int(entry_size * 2.5))
+
+    for prompt in ("p1", "p2"):
+        cache.update(prompt, "llm", _answer("x" * 100))
+        now[0] += 1
+    cache.lookup("p1", "llm") # p1을 최근 사용으로
+    now[0] += 1
+    cache.update("p3", "llm", _answer("x" * 100))
+
+    assert cache.lookup("p2", "llm") is None
+    assert cache.lookup("p1", "llm") is not None and cache.lookup("p3", "llm") is not None
@@ -0,0 +1,55 @@
+import pytest
+
+from app.utils import model_utils
+
+
+@pytest.fixture
+def init_calls(monkeypatch):
+    """init_chat_model 대신 호출 인자를 기록하고 새 객체를 돌려주는 가짜 생성 함수"""
+    calls = []
+
+    def fake_init_chat_model(model, model_provider, **kwargs):
+        calls.append({"model": model, "provider": model_provider, **kwargs})
+        return object()
+
+    monkeypatch.setattr(model_utils, "init_chat_model", fake_init_chat_model)
+    monkeypatch.setenv("LLM_MODEL", "openai:gpt-4o-mini")
+    monkeypatch.delenv("LLM_ROUTES", raising=False)
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+    model_utils.clear_model_cache()
+    yield calls
+    model_utils.clear_model_cache()
+
+
+def test_temperature_is_forwarded_and_part_of_the_cache_key(init_calls):
+    cold = model_utils.create_chat_model(temperature=0.2)
+    warm = model_utils.create_chat_model(temperature=0.2)
+    creative = model_utils.create_chat_model(temperature=0.7)
+
+    assert cold is warm
+    assert creative is not cold
+    assert [c["temperature"] for c in init_calls] == [0.2, 0.7]
+
+
+def test_get_model_reuses_instances_per_kwargs(init_calls):
+    first = model_utils.get_model("gpt-4o-mini", temperature=0)
+    assert model_utils.get_model("gpt-4o-mini", temperature=0) is first
+    assert model_utils.get_model("openai:gpt-4o-mini", temperature=0) is first
+    assert model_utils.get_model("gpt-4o-mini", temperature=0, max_tokens=10) is not first
+    assert init_calls[0] == {"model": "gpt-4o-mini", "provider": "openai", "temperature": 0}
+
+
+def test_llm_cache_is_opt_in_and_only_for_temperature_zero(init_calls, monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite"))
+    monkeypatch.setattr("app.utils.llm_cache._llm_cache", None)
+
+    model_utils.create_chat_model(temperature=0, cache=True)
+    model_utils.create_chat_model(temperature=0.2, cache=True)
+    # browse_web처럼 요청하지 않은 호출부는 temperature=0이어도 캐시하지 않습니다.
+    model_utils.create_chat_model(temperature=0.0, max_tokens=10)
+
+    deterministic, sampled, interactive = init_calls
+    assert deterministic["temperature"] == 0 and deterministic["cache"] is not None
+    assert sampled["temperature"] == 0.2 and "cache" not in sampled
+    assert interactive["temperature"] == 0 and "cache" not in interactive
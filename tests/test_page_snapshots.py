@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+from app.utils import page_snapshots as page_snapshots_module
+from app.utils.page_snapshots import PageSnapshotCache
+
+OPTIONS = {"render": "http"}
+
+
+def _page(seed: int, size: int = 4000) -> str:
+    # 압축해도 크기가 줄지 않도록 무작위 본문을 씁니다.
+    return f"<html>{seed}:{os.urandom(size).hex()}</html>"
+
+
+def test_same_html_is_stored_once(tmp_path):
+    cache = PageSnapshotCache(str(tmp_path / "snapshots.sqlite"))
+    html = _page(1)
+    cache.put("https://a.example.com", OPTIONS, html)
+    cache.put("https://a.example.com/?ref=x", OPTIONS, html, final_url="https://a.example.com")
+
+    assert cache.stats()["entries"] == 2 and cache.stats()["blobs"] == 1
+    snapshot = cache.get("https://a.example.com/?ref=x", OPTIONS)
+    assert snapshot["html"] == html and snapshot["final_url"] == "https://a.example.com"
+    assert cache.get("https://a.example.com", {"render": "browser", "wait_ms": 3000}) is None
+
+
+def test_snapshots_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_snapshots_module.time, "time", lambda: now[0])
+    cache = PageSnapshotCache(str(tmp_path / "snapshots.sqlite"), ttl_seconds=60)
+    cache.put("https://a.example.com", OPTIONS, _page(1))
+    now[0] += 61
+
+    assert cache.get("https://a.example.com", OPTIONS) is None
+    assert cache.stats() == {"entries": 0, "blobs": 0, "bytes": 0}
+
+
+def test_evicts_least_recently_used_over_max_bytes(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_snapshots_module.time, "time", lambda: now[0])
+    probe = PageSnapshotCache(str(tmp_path / "probe.sqlite"))
+    probe.put("https://probe", OPTIONS, _page(0))
+    page_size = probe.stats()["bytes"]
+    cache = PageSnapshotCache(str(tmp_path / "snapshots.sqlite"), max_bytes=int(page_size * 2.5))
+
+    for i in (1, 2):
+        cache.put(f"https://a.example.com/{i}", OPTIONS, _page(i))
+        now[0] += 1
+    assert cache.get("https://a.example.com/1", OPTIONS) is not None  # 1번을 최근 사용으로 갱신
+    now[0] += 1
+    cache.put("https://a.example.com/3", OPTIONS, _page(3))
+
+    assert cache.get("https://a.example.com/2", OPTIONS) is None
+    assert cache.get("https://a.example.com/1", OPTIONS) is not None
+    assert cache.get("https://a.example.com/3", OPTIONS) is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_fetch_page_renders_concurrent_requests_once(tmp_path, monkeypatch):
+    cache = PageSnapshotCache(str(tmp_path / "snapshots.sqlite"))
+    monkeypatch.setattr(page_snapshots_module, "get_page_snapshot_cache", lambda: cache)
+    calls = []
+
+    async def fake_render(url, timeout_ms):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return {"html": "<p>ok</p>", "final_url": url}
+
+    monkeypatch.setattr(page_snapshots_module, "_render_http", fake_render)
+
+    async def scenario():
+        first = await asyncio.gather(*(page_snapshots_module.fetch_page("https://a.example.com", render="http")
+                                       for _ in range(3)))
+        again = await page_snapshots_module.fetch_page("https://a.example.com", render="http")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert calls == ["https://a.example.com"]
+    assert {r["html"] for r in first} == {"<p>ok</p>"}
+    assert [r["cached"] for r in first].count(False) == 1
+    assert again["cached"] is True
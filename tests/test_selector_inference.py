@@ -0,0 +1,65 @@
+from app.utils.selector_inference import infer_selectors
+
+# get_page_structure의 LLM 응답 형식과 같은 키 (휴리스틱/LLM 어느 쪽 결과든 같은 키로 읽습니다)
+SCHEMA_KEYS = {"selectors", "samples", "container", "item", "navigate_to_next", "pagination", "next_page",
+               "confidence", "note"}
+
+
+def _list_page() -> str:
+    items = "".join(
+        f'<li class="news_item"><a class="news_title" href="/article/{i}">오늘의 주요 뉴스 제목 {i}번 기사</a>'
+        f'<span class="news_press">언론사{i % 3}</span><span class="news_date">2024.05.{i + 1:02d}</span></li>'
+        for i in range(8)
+    )
+    return (
+        '<html><body><nav class="gnb"><a href="/">홈</a><a href="/a">정치</a><a href="/b">경제</a><a href="/c">사회</a></nav>'
+        f'<div id="main"><ul class="news_list">{items}</ul>'
+        '<div class="paging"><a class="btn_next" href="?page=2">다음</a></div></div></body></html>'
+    )
+
+
+def test_list_page_separates_container_item_and_next_links():
+    result = infer_selectors(_list_page(), "뉴스 제목과 링크, 날짜 수집")
+
+    assert SCHEMA_KEYS <= set(result)
+    assert result["container"] == "ul.news_list"
+    assert result["item"] == "li.news_item"
+    assert result["selectors"]["title"] == "li.news_item a.news_title"
+    assert result["selectors"]["url"] == "li.news_item a.news_title::attr(href)"
+    assert result["selectors"]["date"] == "li.news_item span.news_date"
+    assert result["samples"]["url"][:2] == ["/article/0", "/article/1"]
+    # 상세 페이지 링크와 다음 목록 페이지 링크는 서로 다른 키입니다.
+    assert result["navigate_to_next"] == "li.news_item a.news_title"
+    assert result["next_page"] == "a.btn_next"
+    assert result["pagination"] == "URL파라미터"
+    assert result["source"] == "heuristic" and result["confidence"] == "high"
+
+
+def test_detail_page_has_no_list_keys():
+    body = "이 기사는 본문 내용입니다. " * 40
+    html = (f'<html><body><div class="article"><h1 class="headline">상세 기사 제목</h1>'
+            f'<div id="article_body"><p>{body}</p><p>{body}</p></div></div></body></html>')
+
+    result = infer_selectors(html, "기사 제목과 본문")
+
+    assert SCHEMA_KEYS <= set(result)
+    assert result["selectors"]["title"] == "h1.headline"
+    assert result["selectors"]["content"] == "div#article_body"
+    assert result["container"] is None and result["item"] is None and result["next_page"] is None
+
+
+def test_unrecognized_goal_or_missing_fields_lower_the_score():
+    html = _list_page()
+    known = infer_selectors(html, "뉴스 제목 수집")
+    missing = infer_selectors(html, "뉴스 제목과 가격 수집")
+    unknown = infer_selectors(html, "댓글 작성자 닉네임")
+
+    assert missing["score"] < known["score"]
+    assert "price" in missing["note"]
+    assert unknown["score"] < known["score"]
+
+
+def test_page_without_structure_scores_zero():
+    result = infer_selectors("<html><body><p>짧은 문장</p></body></html>", "제목 수집")
+
+    assert result["selectors"] == {} and result["score"] == 0.0 and result["confidence"] == "low"
@@ -0,0 +1,81 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from app.server import create_agent_router
+from app.utils.concurrency import AgentLimiter
+
+
+def _checkpointed_echo_agent():
+    """대화 길이를 함께 돌려주는 checkpointer 사용 에이전트 (thread_id 없이 실행하면 LangGraph가 거절)"""
+    def respond(state: MessagesState):
+        return {"messages": [AIMessage(content=f"{state['messages'][-1].content}|{len(state['messages'])}")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("respond", respond)
+    graph.add_edge(START, "respond")
+    graph.add_edge("respond", END)
+    return graph.compile(checkpointer=InMemorySaver())
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(create_agent_router(_checkpointed_echo_agent(), "/echo"))
+    return TestClient(app)
+
+
+def test_batch_without_thread_ids_runs_each_item_in_a_fresh_thread():
+    response = _client().post("/echo/batch", json={"items": [{"message": f"m{i}"} for i in range(5)]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status_code"] for r in results] == [200] * 5
+    # 새 thread마다 대화가 사용자 메시지 1개로 시작합니다.
+    assert [r["content"] for r in results] == [f"m{i}|1" for i in range(5)]
+
+
+def test_batch_keeps_explicit_thread_ids():
+    client = _client()
+    client.post("/echo/batch", json={"items": [{"message": "first", "thread_id": "t1"}]})
+    response = client.post("/echo/batch", json={"items": [{"message": "second", "thread_id": "t1"}]})
+
+    assert response.json()["results"][0]["content"] == "second|3"
+
+
+def test_batch_stream_results_returns_ndjson_lines():
+    response = _client().post(
+        "/echo/batch", json={"items": [{"message": "a"}, {"message": "b"}], "stream_results": True}
+    )
+
+    lines = [line for line in response.text.splitlines() if line]
+    assert sorted(line.split('"content":"')[1].split("|")[0] for line in lines) == ["a", "b"]
+
+
+def test_batch_items_wait_for_slots_instead_of_being_rejected():
+    running, peak = [0], [0]
+
+    async def respond(state: MessagesState):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.1)  # 대기열 타임아웃보다 긴 실행
+        running[0] -= 1
+        return {"messages": [AIMessage(content="ok")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("respond", respond)
+    graph.add_edge(START, "respond")
+    graph.add_edge("respond", END)
+    limiter = AgentLimiter("slow", max_concurrency=2, max_queue=0, queue_timeout=0.05)
+    app = FastAPI()
+    app.include_router(create_agent_router(graph.compile(), "/slow", limiter=limiter))
+
+    response = TestClient(app).post("/slow/batch", json={"items": [{"message": f"m{i}"} for i in range(6)],
+                                                         "concurrency": 6})
+
+    assert [r["status_code"] for r in response.json()["results"]] == [200] * 6
+    assert peak[0] <= 2
+    assert limiter.stats()["rejected_queue_full"] == 0 and limiter.stats()["rejected_timeout"] == 0
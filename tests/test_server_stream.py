@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+
+from app.server import create_agent_router
+
+
+class StallingAgent:
+    """토큰 두 개를 보낸 뒤 잠시 멈췄다가 마지막 토큰을 보내는 가짜 에이전트"""
+
+    async def astream_events(self, inputs, config=None, version="v2"):
+        for content, pause in (("a", 0), ("b", 0), ("c", 0.3)):
+            await asyncio.sleep(pause)
+            yield {"event": "on_chat_model_stream", "name": "model", "tags": [], "metadata": {},
+                   "data": {"chunk": AIMessageChunk(content=content)}}
+
+
+def _token_frames(body: str):
+    frames = []
+    for line in body.splitlines():
+        if line.startswith("data: {"):
+            frame = json.loads(line[len("data: "):])
+            if frame.get("type") == "token":
+                frames.append(frame["content"])
+    return frames
+
+
+def test_coalesced_tokens_are_flushed_while_the_model_stalls():
+    app = FastAPI()
+    app.include_router(create_agent_router(StallingAgent(), "/stall"))
+
+    response = TestClient(app).post("/stall/stream", json={"message": "hi", "coalesce_tokens": True,
+                                                           "flush_interval_ms": 50, "flush_bytes": 1024})
+
+    # 멈춘 동안 기한(50ms)이 지나 "ab"가 먼저 나가고, 늦게 온 "c"는 따로 나갑니다.
+    assert _token_frames(response.text) == ["ab", "c"]
+    assert response.text.rstrip().endswith("event: end\ndata:")
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.utils.stream_runs import StreamRunRegistry, follow_run
+
+
+async def _slow_frames(started: asyncio.Event):
+    yield "data: first\n\n"
+    started.set()
+    await asyncio.sleep(60)
+    yield "data: never\n\n"
+
+
+async def _collect(run, after_seq):
+    async def connected():
+        return False
+
+    return [frame async for frame in follow_run(run, after_seq, 0.01, connected)]
+
+
+def test_cancelled_run_ends_with_error_frame_for_late_clients():
+    async def scenario():
+        registry = StreamRunRegistry(resume_grace=0.05)
+        started = asyncio.Event()
+        finished = []
+        run = registry.start("echo", _slow_frames(started), on_finish=lambda: finished.append(True))
+        await started.wait()
+        # 아무도 구독하지 않은 채 유예 시간이 지나면 실행이 취소됩니다.
+        await asyncio.sleep(0.2)
+        late = await _collect(run, 1)
+        return run, finished, late
+
+    run, finished, late = asyncio.run(scenario())
+    assert run.cancelled and run.done and finished == [True]
+    assert '"cancelled": true' in late[0]
+    assert late[-1].endswith("event: end\ndata: \n\n")
+
+
+def test_reconnect_within_grace_resumes_after_last_seq():
+    async def frames():
+        for i in range(3):
+            yield f"data: {i}\n\n"
+
+    async def scenario():
+        registry = StreamRunRegistry(resume_grace=1.0)
+        run = registry.start("echo", frames())
+        await run.task
+        resolved, seq = registry.resolve(f"{run.run_id}:1")
+        return run, resolved, await _collect(resolved, seq)
+
+    run, resolved, frames_after = asyncio.run(scenario())
+    assert resolved is run and not run.cancelled
+    assert frames_after == [f"id: {run.run_id}:2\ndata: 1\n\n", f"id: {run.run_id}:3\ndata: 2\n\n"]